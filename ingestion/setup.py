@@ -34,6 +34,7 @@ VERSIONS = {
     "google-cloud-storage": "google-cloud-storage==1.43.0",
     "great-expectations": "great-expectations>=0.18.0,<0.18.14",
     "grpc-tools": "grpcio-tools>=1.47.2",
+    "httpx": "httpx>=0.24,<1",
     "lkml": "lkml~=1.3",
     "looker-sdk": "looker-sdk>=22.20.0",
     "lxml": "lxml==5.3.0",
@@ -43,6 +44,7 @@ VERSIONS = {
     "nltk": "nltk==3.9.1",
     "transformers": "transformers==4.46.3",
     "openpyxl": "openpyxl~=3.1.3",
+    "optimum": "optimum[onnxruntime]~=1.23",
     "packaging": "packaging==21.3",
     "pandas": "pandas~=2.0.0",
     "pyarrow": "pyarrow~=14.0",
@@ -248,6 +250,7 @@ plugins: Dict[str, Set[str]] = {
     "mssql-odbc": {VERSIONS["pyodbc"]},
     "mysql": {VERSIONS["pymysql"]},
     "nifi": {},  # uses requests
+    "ometa-async": {VERSIONS["httpx"]},
     "openlineage": {*COMMONS["kafka"]},
     "oracle": {"cx_Oracle>=8.3.0,<9", "oracledb~=1.2"},
     "pgspider": {"psycopg2-binary", "sqlalchemy-pgspider"},
@@ -280,6 +283,7 @@ plugins: Dict[str, Set[str]] = {
     "singlestore": {VERSIONS["pymysql"]},
     "sklearn": {VERSIONS["scikit-learn"]},
     "snowflake": {VERSIONS["snowflake"]},
+    "summarization-onnx": {VERSIONS["optimum"]},  # int8 ONNX summarization backend
     "superset": {},  # uses requests
     "tableau": {VERSIONS["tableau"], VERSIONS["validators"], VERSIONS["packaging"]},
     "trino": {VERSIONS["trino"]},
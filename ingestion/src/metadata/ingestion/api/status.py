@@ -38,6 +38,8 @@ class Status(BaseModel):
     warnings: List[Any] = Field(default_factory=list)
     filtered: List[Dict[str, str]] = Field(default_factory=list)
     failures: List[StackTraceError] = Field(default_factory=list)
+    # Performance figures of the step, e.g., throughput of a processing stage
+    metrics: Dict[str, Any] = Field(default_factory=dict)
 
     def __init__(self, **data):
         super().__init__(**data)
@@ -66,6 +68,9 @@ class Status(BaseModel):
     def filter(self, key: str, reason: str) -> None:
         self.filtered.append({key: reason})
 
+    def metric(self, key: str, value: Any) -> None:
+        self.metrics[key] = value
+
     def as_string(self) -> str:
         return pprint.pformat(self.__dict__, width=150)
 
@@ -11,10 +11,11 @@
 """
 Abstract definition of each step
 """
+import threading
 from abc import ABC, abstractmethod
-from typing import Any, Iterable, Optional
+from typing import Any, Callable, Iterable, List, Optional
 
-from metadata.ingestion.api.models import Entity
+from metadata.ingestion.api.models import Either, Entity
 from metadata.ingestion.api.step import BulkStep, IterStep, ReturnStep, StageStep
 from metadata.ingestion.ometa.ometa_api import OpenMetadata
 from metadata.utils.execution_time_tracker import (
@@ -43,10 +44,34 @@ class Source(IterStep, ABC):
     connection_obj: Any
     service_connection: Any
 
+    # Set by the workflow to write the records buffered in the sinks
+    _sink_flush: Optional[Callable[[], None]] = None
+    _sink_thread: Optional[int] = None
+
     @abstractmethod
     def prepare(self):
         pass
 
+    def set_sink_flush(self, flush: Callable[[], None]) -> None:
+        self._sink_flush = flush
+        self._sink_thread = threading.get_ident()
+
+    def flush_sink(self) -> None:
+        """
+        Write the records the sinks are still buffering, e.g., before
+        looking up by name the entities we have sent so far. Only the
+        thread running the workflow can flush: the records of other
+        threads are still waiting to reach the sink.
+        """
+        if self._sink_flush and threading.get_ident() == self._sink_thread:
+            self._sink_flush()
+
+    def sink_ack(self, record: Entity, result: Either) -> None:
+        """
+        Called with the result of the sink for each record it wrote. Buffered
+        records are acknowledged once they are flushed.
+        """
+
     @abstractmethod
     def test_connection(self) -> None:
         pass
@@ -67,10 +92,28 @@ class Sink(ReturnStep, ABC):
     def name(self) -> str:
         return "Sink"
 
+    def __init__(self):
+        super().__init__()
+        self._ack_listeners: List[Callable[[Entity, Either], None]] = []
+
     @calculate_execution_time(context="Sink")
     def run(self, record: Entity) -> Optional[Entity]:
         return super().run(record)
 
+    def flush(self) -> None:
+        """
+        Sinks buffering records should write them here.
+        Called by the workflow once the source is exhausted.
+        """
+
+    def add_ack_listener(self, listener: Callable[[Entity, Either], None]) -> None:
+        """Register a function to be called with each record written and its result"""
+        self._ack_listeners.append(listener)
+
+    def ack(self, record: Entity, result: Either) -> None:
+        for listener in self._ack_listeners:
+            listener(record, result)
+
 
 class Processor(ReturnStep, ABC):
     """All Processor must inherit this base class"""
@@ -87,6 +130,12 @@ class Stage(StageStep, ABC):
     def name(self) -> str:
         return "Stage"
 
+    def flush(self) -> None:
+        """
+        Stages keeping records in memory should write them here.
+        Called by the workflow once the source is exhausted.
+        """
+
 
 class BulkSink(BulkStep, ABC):
     """All Stages must inherit this base class."""
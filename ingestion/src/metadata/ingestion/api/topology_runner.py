@@ -13,12 +13,13 @@ Mixin to be used by service sources to dynamically
 generate the _run based on their topology.
 """
 import math
+import threading
 import time
 import traceback
 from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor
 from functools import singledispatchmethod
-from typing import Any, Generic, Iterable, List, Type, TypeVar
+from typing import Any, Dict, Generic, Iterable, List, Optional, Set, Type, TypeVar
 
 from pydantic import BaseModel
 
@@ -41,9 +42,10 @@ from metadata.ingestion.models.topology import (
 )
 from metadata.ingestion.ometa.ometa_api import OpenMetadata
 from metadata.ingestion.ometa.utils import model_str
+from metadata.utils import fqn
 from metadata.utils.execution_time_tracker import ExecutionTimeTrackerContextMap
 from metadata.utils.logger import ingestion_logger
-from metadata.utils.source_hash import generate_source_hash
+from metadata.utils.source_hash import generate_source_hash, source_hash_digest
 
 logger = ingestion_logger()
 
@@ -67,10 +69,20 @@ class TopologyRunnerMixin(Generic[C]):
     context: TopologyContextManager
     metadata: OpenMetadata
 
-    # The cache will have the shape {`child_stage.type_`: {`name`: `hash`}}
+    # The cache will have the shape {`child_stage.type_`: {`name`: `hash digest`}}
     cache = defaultdict(dict)
     queue = Queue()
 
+    # Page size and parallelism used when prefetching the source hashes of a service
+    prefetch_page_size: int = 1000
+    prefetch_threads: int = 8
+    _prefetch_lock = threading.Lock()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # (child type, service name) of the source hashes already prefetched
+        self._prefetched_scopes: Set[tuple] = set()
+
     def _multithread_process_node(
         self, node: TopologyNode, threads: int
     ) -> Iterable[Entity]:
@@ -90,6 +102,8 @@ class TopologyRunnerMixin(Generic[C]):
                 for i in range(0, node_entities_length, chunksize)
             ]
 
+            # Each thread needs its own keep-alive connection to the server
+            self.metadata.client.ensure_pool_size(threads)
             thread_pool = ThreadPoolExecutor(max_workers=threads)
 
             futures = [
@@ -246,10 +260,13 @@ class TopologyRunnerMixin(Generic[C]):
 
     def _run_node_post_process(self, node: TopologyNode) -> Iterable[Entity]:
         """
-        If the node has post_process steps, iterate over them and yield the result
+        If the node has post_process steps, iterate over them and yield the result.
+        They look up by name the entities we have sent, e.g., to draw the lineage,
+        so we make sure the sink is not buffering any of them first.
         """
         if node.post_process:
             logger.debug(f"Post processing node {node}")
+            self.flush_sink()
             for process in node.post_process:
                 try:
                     node_post_process = getattr(self, process)
@@ -277,11 +294,29 @@ class TopologyRunnerMixin(Generic[C]):
                         entity_name=self.context.get().__dict__[stage.context],
                     )
 
-                    self.get_fqn_source_hash_dict(
-                        parent_type=stage.type_,
-                        child_type=child_stage.type_,
-                        entity_fqn=entity_fqn,
-                    )
+                    if self._is_prefetch_enabled():
+                        self.prefetch_fqn_source_hash_dict(
+                            parent_type=stage.type_,
+                            child_type=child_stage.type_,
+                            entity_fqn=entity_fqn,
+                        )
+                    else:
+                        self.get_fqn_source_hash_dict(
+                            parent_type=stage.type_,
+                            child_type=child_stage.type_,
+                            entity_fqn=entity_fqn,
+                        )
+
+    @staticmethod
+    def _get_source_hash_param(
+        parent_type: Type[Entity], child_type: Type[Entity]
+    ) -> str:
+        """Query param to filter the children of the given parent"""
+        if parent_type in (Database, DatabaseSchema):
+            if child_type == StoredProcedure:
+                return "databaseSchema"
+            return "database"
+        return "service"
 
     def get_fqn_source_hash_dict(
         self, parent_type: Type[Entity], child_type: Type[Entity], entity_fqn: str
@@ -289,23 +324,123 @@ class TopologyRunnerMixin(Generic[C]):
         """
         Get all the entities and store them as fqn:sourceHash in a dict
         """
-        if parent_type in (Database, DatabaseSchema):
-            if child_type == StoredProcedure:
-                params = {"databaseSchema": entity_fqn}
-            else:
-                params = {"database": entity_fqn}
-        else:
-            params = {"service": entity_fqn}
+        params = {self._get_source_hash_param(parent_type, child_type): entity_fqn}
         entities_list = self.metadata.list_all_entities(
             entity=child_type,
             params=params,
             fields=["sourceHash"],
         )
         for entity in entities_list:
-            if entity.sourceHash:
-                self.cache[child_type][
-                    model_str(entity.fullyQualifiedName)
-                ] = entity.sourceHash
+            digest = source_hash_digest(entity.sourceHash)
+            if digest:
+                self.cache[child_type][model_str(entity.fullyQualifiedName)] = digest
+
+    def _is_prefetch_enabled(self) -> bool:
+        source_config = getattr(self, "source_config", None)
+        return bool(getattr(source_config, "prefetchSourceHashes", False))
+
+    def prefetch_fqn_source_hash_dict(
+        self, parent_type: Type[Entity], child_type: Type[Entity], entity_fqn: str
+    ) -> None:
+        """
+        Load the fqn:sourceHash of all the `child_type` entities of the service once,
+        instead of listing them for each parent. The following parents of the same service
+        reuse the loaded dict.
+
+        Children of databases are listed concurrently by database (or by schema for
+        the stored procedures), since the API pagination is cursor based and cannot
+        be split otherwise.
+        """
+        service_name = fqn.split(entity_fqn)[0]
+        param = self._get_source_hash_param(parent_type, child_type)
+
+        with self._prefetch_lock:
+            scope = (child_type, service_name)
+            if scope in self._prefetched_scopes:
+                return
+
+            start = time.perf_counter()
+            self.metadata.client.ensure_pool_size(self.prefetch_threads)
+            with ThreadPoolExecutor(max_workers=self.prefetch_threads) as executor:
+                partitions = self._get_prefetch_partitions(
+                    param, service_name, executor
+                )
+                for hashes in executor.map(
+                    lambda params: self._list_source_hashes(child_type, params),
+                    partitions,
+                ):
+                    self.cache[child_type].update(hashes)
+
+            self._prefetched_scopes.add(scope)
+            logger.debug(
+                f"Prefetched {len(self.cache[child_type])} {child_type.__name__} source hashes"
+                f" for service [{service_name}] in {time.perf_counter() - start:.2f}s"
+            )
+
+    def _get_prefetch_partitions(
+        self, param: str, service_name: str, executor: ThreadPoolExecutor
+    ) -> List[Dict[str, str]]:
+        """Query params listing all the children of the service, one page cursor each"""
+        if param == "service":
+            return [{param: service_name}]
+        database_fqns = [
+            entity["fullyQualifiedName"]
+            for entity in self._list_raw_entities(
+                entity=Database, params={"service": service_name}, fields=None
+            )
+        ]
+        if param == "database":
+            return [{param: database_fqn} for database_fqn in database_fqns]
+        return [
+            {param: schema["fullyQualifiedName"]}
+            for schemas in executor.map(
+                lambda database_fqn: list(
+                    self._list_raw_entities(
+                        entity=DatabaseSchema,
+                        params={"database": database_fqn},
+                        fields=None,
+                    )
+                ),
+                database_fqns,
+            )
+            for schema in schemas
+        ]
+
+    def _list_source_hashes(
+        self, child_type: Type[Entity], params: Dict[str, str]
+    ) -> Dict[str, bytes]:
+        """List the {fqn: source hash digest} of the entities matching the params"""
+        return {
+            entity["fullyQualifiedName"]: source_hash_digest(entity["sourceHash"])
+            for entity in self._list_raw_entities(
+                entity=child_type, params=params, fields=["sourceHash"]
+            )
+            if entity.get("sourceHash")
+        }
+
+    def _list_raw_entities(
+        self,
+        entity: Type[Entity],
+        params: Dict[str, str],
+        fields: Optional[List[str]],
+    ) -> Iterable[dict]:
+        """
+        Page over the raw JSON of the entities. We skip the pydantic models since we only
+        need a couple of keys, and that is most of the listing time for large services.
+        """
+        suffix = self.metadata.get_suffix(entity)
+        url_fields = f"&fields={','.join(fields)}" if fields else ""
+        after = None
+        while True:
+            url_after = f"&after={after}" if after else ""
+            resp = self.metadata.client.get(
+                path=f"{suffix}?limit={self.prefetch_page_size}{url_fields}{url_after}",
+                data=params,
+            )
+            yield from (resp or {}).get("data") or []
+            after = ((resp or {}).get("paging") or {}).get("after")
+            if not after:
+                break
 
     def _iter(self) -> Iterable[Either]:
         """
@@ -375,7 +510,7 @@ class TopologyRunnerMixin(Generic[C]):
             entity_source_hash = self.cache[stage.type_].get(entity_fqn)
             if entity_source_hash:
                 # if the source hash is present, compare it with new hash
-                if entity_source_hash != create_entity_request_hash:
+                if entity_source_hash != source_hash_digest(create_entity_request_hash):
                     # the entity has changed, get the entity from server and make a patch request
                     entity = self.metadata.get_by_name(
                         entity=stage.type_,
@@ -14,20 +14,28 @@ BulkSink class used for Usage workflows.
 It sends Table queries and usage counts to Entities,
 as well as populating JOIN information.
 
-It picks up the information from reading the files
+It picks up the information by merging the sorted runs
 produced by the stage. At the end, the path is removed.
 """
-import json
 import os
 import shutil
+import time
 import traceback
+from concurrent.futures import (
+    ALL_COMPLETED,
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 from pydantic import ValidationError
 
 from metadata.config.common import ConfigModel
+from metadata.generated.schema.api.data.createQuery import CreateQueryRequest
 from metadata.generated.schema.entity.data.database import Database
 from metadata.generated.schema.entity.data.table import (
     ColumnJoins,
@@ -47,10 +55,11 @@ from metadata.ingestion.lineage.sql_lineage import (
     get_column_fqn,
     get_table_entities_from_query,
 )
+from metadata.ingestion.lineage.table_index import TableIndex, load_table_index
 from metadata.ingestion.ometa.client import APIError
 from metadata.ingestion.ometa.ometa_api import OpenMetadata
+from metadata.ingestion.stage.usage_runs import read_usage
 from metadata.utils import fqn
-from metadata.utils.constants import UTF_8
 from metadata.utils.life_cycle_utils import get_query_type
 from metadata.utils.logger import ingestion_logger
 from metadata.utils.time_utils import convert_timestamp
@@ -58,10 +67,43 @@ from metadata.utils.time_utils import convert_timestamp
 logger = ingestion_logger()
 
 LRU_CACHE_SIZE = 4096
+# Requests waiting for a thread, per thread
+PENDING_REQUESTS_PER_THREAD = 4
+# Usage records between two progress logs
+PROGRESS_INTERVAL = 1000
 
 
 class MetadataUsageSinkConfig(ConfigModel):
     filename: str
+    # Load the tables of the service once instead of searching each one in ES
+    preloadTableIndex: bool = True
+    # Number of requests sent to the server at the same time
+    publishThreads: int = 4
+
+
+def _union(values: Optional[list], others: Optional[list]) -> Optional[list]:
+    result = list(values or [])
+    for value in others or []:
+        if value not in result:
+            result.append(value)
+    return result or None
+
+
+def group_queries(queries: List[CreateQueryRequest]) -> List[CreateQueryRequest]:
+    """
+    One request per query text, with the users of all its runs: the server
+    gets or creates each query once and adds its usage and users once.
+    """
+    grouped: Dict[Tuple[str, Optional[bool]], CreateQueryRequest] = {}
+    for query in queries:
+        key = (query.query.__root__, query.exclude_usage)
+        first = grouped.get(key)
+        if first is None:
+            grouped[key] = query.copy()
+        else:
+            first.users = _union(first.users, query.users)
+            first.usedBy = _union(first.usedBy, query.usedBy)
+    return list(grouped.values())
 
 
 class MetadataUsageBulkSink(BulkSink):
@@ -86,7 +128,15 @@ class MetadataUsageBulkSink(BulkSink):
         self.metadata = metadata
         self.table_join_dict = {}
         self.table_usage_map = {}
+        self.table_index: Optional[TableIndex] = None
         self.today = datetime.today().strftime("%Y-%m-%d")
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pending: Dict[Future, Tuple[str, str, Optional[str]]] = {}
+        # Table and latest query of each type, by table id
+        self._life_cycle_queries: Dict[
+            str, Tuple[Table, Dict[str, CreateQueryRequest]]
+        ] = {}
+        self.published = 0
 
     @property
     def name(self) -> str:
@@ -122,12 +172,65 @@ class MetadataUsageBulkSink(BulkSink):
                 "usage_count"
             ] += table_usage.count
 
+    def _submit(
+        self,
+        name: str,
+        error: str,
+        func: Callable,
+        *args,
+        scanned: Optional[str] = None,
+    ) -> None:
+        """
+        Send the request in the pool of threads, waiting for some to finish
+        if there are too many pending. Outside of `run`, send it right away.
+        """
+        if self._pool is None:
+            future = Future()
+            try:
+                future.set_result(func(*args))
+            except Exception as exc:
+                future.set_exception(exc)
+        else:
+            max_pending = self.config.publishThreads * PENDING_REQUESTS_PER_THREAD
+            if len(self._pending) >= max_pending:
+                self._wait(FIRST_COMPLETED)
+            future = self._pool.submit(func, *args)
+        self._pending[future] = (name, error, scanned)
+        if self._pool is None:
+            self._wait(ALL_COMPLETED)
+
+    def _wait(self, return_when: str = ALL_COMPLETED) -> None:
+        """Update the status with the requests that are done"""
+        if not self._pending:
+            return
+        done, _ = wait(list(self._pending), return_when=return_when)
+        for future in done:
+            name, error, scanned = self._pending.pop(future)
+            self.published += 1
+            exc = future.exception()
+            if exc is None:
+                if scanned:
+                    logger.info(f"Successfully published {scanned}")
+                    self.status.scanned(scanned)
+                continue
+            stack_trace = "".join(
+                traceback.format_exception(type(exc), exc, exc.__traceback__)
+            )
+            logger.debug(stack_trace)
+            logger.warning(f"{error}: {exc}")
+            self.status.failed(
+                StackTraceError(
+                    name=name, error=f"{error}: {exc}", stackTrace=stack_trace
+                )
+            )
+
     def __publish_usage_records(self) -> None:
         """
         Method to publish SQL Queries, Table Usage
         """
         for _, value_dict in self.table_usage_map.items():
             table_usage_request = None
+            name = value_dict["table_entity"].fullyQualifiedName.__root__
             try:
                 table_usage_request = UsageRequest(
                     date=datetime.fromtimestamp(
@@ -135,79 +238,91 @@ class MetadataUsageBulkSink(BulkSink):
                     ).strftime("%Y-%m-%d"),
                     count=value_dict["usage_count"],
                 )
-                self.metadata.publish_table_usage(
-                    value_dict["table_entity"], table_usage_request
-                )
-                logger.info(
-                    f"Successfully table usage published for {value_dict['table_entity'].fullyQualifiedName.__root__}"
-                )
-                self.status.scanned(
-                    f"Table: {value_dict['table_entity'].fullyQualifiedName.__root__}"
-                )
             except ValidationError as err:
                 logger.debug(traceback.format_exc())
                 logger.warning(
                     f"Cannot construct UsageRequest from {value_dict['table_entity']}: {err}"
                 )
-            except Exception as exc:
-                name = value_dict["table_entity"].fullyQualifiedName.__root__
-                error = f"Failed to update usage for {name} :{exc}"
-                logger.debug(traceback.format_exc())
-                logger.warning(error)
-                self.status.failed(
-                    StackTraceError(
-                        name=value_dict["table_entity"].fullyQualifiedName.__root__,
-                        error=f"Failed to update usage for {name} :{exc}",
-                        stackTrace=traceback.format_exc(),
-                    )
-                )
+                continue
+            self._submit(
+                name,
+                f"Failed to update usage for {name}",
+                self.metadata.publish_table_usage,
+                value_dict["table_entity"],
+                table_usage_request,
+                scanned=f"Table: {name}",
+            )
 
-    def iterate_files(self):
+    def iterate_usage(self) -> Iterable[Iterable[TableUsageCount]]:
         """
-        Iterate through files in the given directory
+        Iterate through the usage of each service and date in the given
+        directory, merging the sorted runs written by the stage
         """
-        check_dir = os.path.isdir(self.config.filename)
-        if check_dir:
-            for filename in os.listdir(self.config.filename):
-                full_file_name = os.path.join(self.config.filename, filename)
-                if not os.path.isfile(full_file_name):
-                    continue
-                with open(full_file_name, encoding=UTF_8) as file:
-                    yield file
+        if os.path.isdir(self.config.filename):
+            for filename in sorted(os.listdir(self.config.filename)):
+                yield read_usage(os.path.join(self.config.filename, filename))
 
     # Check here how to properly pick up ES and/or table query data
     def run(self) -> None:
-        for file_handler in self.iterate_files():
-            self.table_usage_map = {}
-            for usage_record in file_handler.readlines():
-                record = json.loads(usage_record)
-                table_usage = TableUsageCount(**json.loads(record))
-
-                self.service_name = table_usage.serviceName
-                table_entities = None
-                try:
-                    table_entities = get_table_entities_from_query(
-                        metadata=self.metadata,
-                        service_name=self.service_name,
-                        database_name=table_usage.databaseName,
-                        database_schema=table_usage.databaseSchema,
-                        table_name=table_usage.table,
-                    )
-                except Exception as exc:
-                    logger.debug(traceback.format_exc())
-                    logger.warning(
-                        f"Cannot get table entities from query table {table_usage.table}: {exc}"
-                    )
-
-                if not table_entities:
-                    logger.warning(
-                        f"Could not fetch table {table_usage.databaseName}.{table_usage.table}"
-                    )
-                    continue
+        start = time.perf_counter()
+        records = 0
+        with ThreadPoolExecutor(max_workers=self.config.publishThreads) as pool:
+            self._pool = pool
+            try:
+                for usage_records in self.iterate_usage():
+                    self.table_usage_map = {}
+                    for table_usage in usage_records:
+                        self._process_usage_record(table_usage)
+                        records += 1
+                        if records % PROGRESS_INTERVAL == 0:
+                            logger.info(
+                                f"Processed {records} usage records"
+                                f" ({records / (time.perf_counter() - start):.1f}/s),"
+                                f" published {self.published} requests"
+                            )
+                    self.__publish_usage_records()
+                    # The server adds up the usage of a table over the days:
+                    # send a date only once the previous one is published
+                    self._wait(ALL_COMPLETED)
+                self.__publish_life_cycle_data()
+                self._wait(ALL_COMPLETED)
+            finally:
+                self._pool = None
+
+        elapsed = time.perf_counter() - start
+        self.status.metric("Usage records", records)
+        self.status.metric("Usage records/sec", round(records / elapsed, 1))
+        self.status.metric("Published requests", self.published)
+        self.status.metric("Requests/sec", round(self.published / elapsed, 1))
+        if self.table_index:
+            self.table_index.report(self.status)
+
+    def _process_usage_record(self, table_usage: TableUsageCount) -> None:
+        self.service_name = table_usage.serviceName
+        if self.config.preloadTableIndex:
+            self.table_index = load_table_index(self.metadata, self.service_name)
+        table_entities = None
+        try:
+            table_entities = get_table_entities_from_query(
+                metadata=self.metadata,
+                service_name=self.service_name,
+                database_name=table_usage.databaseName,
+                database_schema=table_usage.databaseSchema,
+                table_name=table_usage.table,
+            )
+        except Exception as exc:
+            logger.debug(traceback.format_exc())
+            logger.warning(
+                f"Cannot get table entities from query table {table_usage.table}: {exc}"
+            )
 
-                self.get_table_usage_and_joins(table_entities, table_usage)
+        if not table_entities:
+            logger.warning(
+                f"Could not fetch table {table_usage.databaseName}.{table_usage.table}"
+            )
+            return
 
-            self.__publish_usage_records()
+        self.get_table_usage_and_joins(table_entities, table_usage)
 
     def get_table_usage_and_joins(
         self, table_entities: List[Table], table_usage: TableUsageCount
@@ -232,28 +347,23 @@ class MetadataUsageBulkSink(BulkSink):
                         table_join_request is not None
                         and len(table_join_request.columnJoins) > 0
                     ):
-                        self.metadata.publish_frequently_joined_with(
-                            table_entity, table_join_request
+                        self._submit(
+                            table_usage.table,
+                            f"Failed to update query join for {table_usage.table}",
+                            self.metadata.publish_frequently_joined_with,
+                            table_entity,
+                            table_join_request,
                         )
 
                     if table_usage.sqlQueries:
-                        self.metadata.ingest_entity_queries_data(
-                            entity=table_entity, queries=table_usage.sqlQueries
-                        )
-                        self._get_table_life_cycle_data(
-                            table_entity=table_entity, table_usage=table_usage
+                        self._submit(
+                            table_usage.table,
+                            f"Failed to update the queries of {table_usage.table}",
+                            self.metadata.ingest_entity_queries_data,
+                            table_entity,
+                            group_queries(table_usage.sqlQueries),
                         )
-                except APIError as err:
-                    error = f"Failed to update query join for {table_usage}: {err}"
-                    logger.debug(traceback.format_exc())
-                    logger.warning(error)
-                    self.status.failed(
-                        StackTraceError(
-                            name=table_usage.table,
-                            error=error,
-                            stackTrace=traceback.format_exc(),
-                        )
-                    )
+                        self._collect_life_cycle_data(table_entity, table_usage)
                 except Exception as exc:
                     name = table_entity.name.__root__
                     error = (
@@ -346,53 +456,69 @@ class MetadataUsageBulkSink(BulkSink):
         for table_entity in table_entities:
             return get_column_fqn(table_entity=table_entity, column=table_column.column)
 
-    def _get_table_life_cycle_data(
+    def _collect_life_cycle_data(
         self, table_entity: Table, table_usage: TableUsageCount
+    ) -> None:
+        """
+        Keep the latest query of each type of the table, across all the
+        usage files. The life cycle of each table is patched once at the
+        end, so the patches of different dates cannot overwrite each other.
+        """
+        _, latest = self._life_cycle_queries.setdefault(
+            str(table_entity.id.__root__), (table_entity, {})
+        )
+        for create_query in table_usage.sqlQueries:
+            query_type = get_query_type(create_query=create_query)
+            if query_type and (
+                query_type not in latest
+                or latest[query_type].queryDate.__root__
+                < create_query.queryDate.__root__
+            ):
+                latest[query_type] = create_query
+
+    def _get_table_life_cycle_data(
+        self, table_entity: Table, latest: Dict[str, CreateQueryRequest]
     ):
         """
-        Method to call the lifeCycle API to store the data.
-        We iterate over all the queries of a table entity and pick the life cycle
-        data according to the query.
-        The life cycle data will only be added if the current lifecycle datetime is less the datetime of
-        the query being processed.
+        Method to call the lifeCycle API to store the data
+        of the latest query of each type of the table
         """
-        try:
-            life_cycle = LifeCycle()
-            for create_query in table_usage.sqlQueries:
-                user = None
-                process_user = None
-                if create_query.users:
-                    user = self.metadata.get_entity_reference(
-                        entity=User, fqn=create_query.users[0]
-                    )
-                elif create_query.usedBy:
-                    process_user = create_query.usedBy[0]
-                query_type = get_query_type(create_query=create_query)
-                if query_type:
-                    access_details = AccessDetails(
-                        timestamp=create_query.queryDate.__root__,
-                        accessedBy=user,
-                        accessedByAProcess=process_user,
-                    )
-                    life_cycle_attr = getattr(life_cycle, query_type)
-                    if (
-                        not life_cycle_attr
-                        or life_cycle_attr.timestamp.__root__
-                        < access_details.timestamp.__root__
-                    ):
-                        setattr(life_cycle, query_type, access_details)
+        # Only the users of the latest queries are looked up
+        life_cycle = LifeCycle()
+        for query_type, create_query in latest.items():
+            user = None
+            process_user = None
+            if create_query.users:
+                user = self.metadata.get_entity_reference(
+                    entity=User, fqn=create_query.users[0]
+                )
+            elif create_query.usedBy:
+                process_user = create_query.usedBy[0]
+            setattr(
+                life_cycle,
+                query_type,
+                AccessDetails(
+                    timestamp=create_query.queryDate.__root__,
+                    accessedBy=user,
+                    accessedByAProcess=process_user,
+                ),
+            )
 
-            self.metadata.patch_life_cycle(entity=table_entity, life_cycle=life_cycle)
+        self.metadata.patch_life_cycle(entity=table_entity, life_cycle=life_cycle)
 
-        except Exception as err:
-            error = f"Unable to get life cycle data for table {table_entity.fullyQualifiedName}: {err}"
-            self.status.failed(
-                StackTraceError(
-                    name=table_usage.table,
-                    error=error,
-                    stackTrace=traceback.format_exc(),
-                )
+    def __publish_life_cycle_data(self) -> None:
+        for table_entity, latest in self._life_cycle_queries.values():
+            if not latest:
+                continue
+            name = table_entity.fullyQualifiedName.__root__
+            self._submit(
+                name,
+                f"Unable to get life cycle data for table {name}",
+                self._get_table_life_cycle_data,
+                table_entity,
+                latest,
             )
+        self._life_cycle_queries = {}
 
     def close(self):
         if Path(self.config.filename).exists():
@@ -11,11 +11,12 @@
 """
 Lineage Parser configuration
 """
+import functools
 import traceback
 from collections import defaultdict
 from copy import deepcopy
 from logging.config import DictConfigurator
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import sqlparse
 from cached_property import cached_property
@@ -27,6 +28,10 @@ from sqlparse.sql import Comparison, Identifier, Parenthesis, Statement
 
 from metadata.generated.schema.type.tableUsageCount import TableColumn, TableColumnJoin
 from metadata.ingestion.lineage.models import Dialect
+from metadata.ingestion.lineage.parser_cache import (
+    get_lineage_parser_cache,
+    query_fingerprint,
+)
 from metadata.utils.helpers import (
     find_in_iter,
     get_formatted_entity_name,
@@ -51,12 +56,29 @@ logger = ingestion_logger()
 LINEAGE_PARSING_TIMEOUT = 10
 
 
+def cached_result(func: Callable) -> Callable:
+    """
+    Add the result of the parser property to the cache entry of its query
+    once it is computed. The queries with the same fingerprint get it from
+    there, and only parse the query for the properties not cached yet.
+    """
+
+    @functools.wraps(func)
+    def wrapper(self: "LineageParser"):
+        result = func(self)
+        self._cache_result(  # pylint: disable=protected-access
+            func.__name__, result
+        )
+        return result
+
+    return wrapper
+
+
 class LineageParser:
     """
     Class that acts like a wrapper for the LineageRunner library usage
     """
 
-    parser: LineageRunner
     query: str
     _clean_query: str
 
@@ -70,10 +92,46 @@ class LineageParser:
         self.query_parsing_success = True
         self.query_parsing_failure_reason = None
         self._clean_query = self.clean_raw_query(query)
+        self._dialect = dialect
+        self._timeout_seconds = timeout_seconds
+
+        self._cache = get_lineage_parser_cache()
+        self._cache_key = (
+            query_fingerprint(self._clean_query, dialect)
+            if self._clean_query and self._cache.enabled
+            else None
+        )
+        self._cached_results = (
+            self._cache.get(self._cache_key) if self._cache_key else None
+        ) or {}
+        if self._cached_results:
+            # Fill the cached properties, we only parse the query if one is missing
+            self.__dict__.update(self._cached_results)
+            return
+
         self.parser = self._evaluate_best_parser(
             self._clean_query, dialect=dialect, timeout_seconds=timeout_seconds
         )
 
+    @cached_property
+    def parser(self) -> Optional[LineageRunner]:
+        """
+        Parser of the query, only evaluated here when the cache entry
+        of the query misses some of the properties we need
+        """
+        return self._evaluate_best_parser(
+            self._clean_query,
+            dialect=self._dialect,
+            timeout_seconds=self._timeout_seconds,
+        )
+
+    def _cache_result(self, name: str, result: Any) -> None:
+        # Failures, such as timeouts under load, may not happen in the next run
+        if not self._cache_key or not self.query_parsing_success:
+            return
+        self._cached_results[name] = result
+        self._cache.put(self._cache_key, self._cached_results)
+
     @cached_property
     def involved_tables(self) -> Optional[List[Table]]:
         """
@@ -96,6 +154,7 @@ class LineageParser:
             return None
 
     @cached_property
+    @cached_result
     def intermediate_tables(self) -> List[Table]:
         """
         Get a list of intermediate tables
@@ -106,6 +165,7 @@ class LineageParser:
         return []
 
     @cached_property
+    @cached_result
     def source_tables(self) -> List[Table]:
         """
         Get a list of source tables
@@ -116,6 +176,7 @@ class LineageParser:
         return []
 
     @cached_property
+    @cached_result
     def target_tables(self) -> List[Table]:
         """
         Get a list of target tables
@@ -127,6 +188,7 @@ class LineageParser:
 
     # pylint: disable=protected-access
     @cached_property
+    @cached_result
     def column_lineage(self) -> List[Tuple[Column, Column]]:
         """
         Get a list of tuples of column lineage
@@ -349,6 +411,7 @@ class LineageParser:
                 logger.debug(traceback.format_exc())
 
     @cached_property
+    @cached_result
     def table_joins(self) -> Dict[str, List[TableColumnJoin]]:
         """
         For each table involved in the query, find its joins against any
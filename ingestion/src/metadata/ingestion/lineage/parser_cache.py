@@ -0,0 +1,236 @@
+#  Copyright 2021 Collate
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""
+Cache of the LineageParser results.
+
+Query logs are mostly the same statements with different literals, which
+have the same tables, joins and column lineage. Results are keyed by the
+fingerprint of the query, where literals are replaced by placeholders and
+comments and whitespace are normalized, and by the dialect.
+
+Entries live in an in-memory LRU of `LINEAGE_PARSER_CACHE_SIZE` entries
+(0 disables it) and, if `LINEAGE_PARSER_CACHE_PATH` is set, in a SQLite
+file kept across runs. The file holds pickles: only point it to a trusted
+location.
+"""
+import hashlib
+import os
+import pickle
+import re
+import sqlite3
+import threading
+import traceback
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from metadata.ingestion.api.status import Status
+from metadata.ingestion.lineage.models import Dialect
+from metadata.utils.logger import ingestion_logger
+
+logger = ingestion_logger()
+
+LINEAGE_PARSER_CACHE_PATH_ENV = "LINEAGE_PARSER_CACHE_PATH"
+LINEAGE_PARSER_CACHE_SIZE_ENV = "LINEAGE_PARSER_CACHE_SIZE"
+DEFAULT_MAX_ENTRIES = 10000
+
+_TOKENS = re.compile(
+    r"(?P<string>'(?:[^'\\]|\\.|'')*')"
+    r"|(?P<identifier>\"(?:[^\"]|\"\")*\"|`[^`]*`)"
+    r"|(?P<block_comment>/\*.*?\*/)"
+    r"|(?P<line_comment>--[^\n]*)"
+    r"|(?P<number>(?<![\w.$])\d+(?:\.\d+)?(?:[eE][-+]?\d+)?(?!\w))"
+    r"|(?P<space>\s+)",
+    re.DOTALL,
+)
+_PLACEHOLDERS = {
+    "string": "?",
+    "block_comment": "/**/",
+    "line_comment": "--",
+    "number": "?",
+    "space": " ",
+}
+# IN lists and VALUES rows of any length
+_PLACEHOLDER_LIST = re.compile(r"\( ?\?(?: ?, ?\?)* ?\)")
+_PLACEHOLDER_ROWS = re.compile(r"\(\?\)(?: ?, ?\(\?\))+")
+
+
+def normalize_query(query: str) -> str:
+    """Replace the literals of the query, keeping the quoted identifiers"""
+    normalized = _TOKENS.sub(
+        lambda match: _PLACEHOLDERS.get(match.lastgroup, match.group()), query
+    )
+    normalized = _PLACEHOLDER_LIST.sub("(?)", normalized)
+    return _PLACEHOLDER_ROWS.sub("(?)", normalized).strip()
+
+
+def query_fingerprint(query: str, dialect: Dialect) -> str:
+    """Key of the parsing results of the query"""
+    return hashlib.sha256(
+        f"{dialect.value}\n{normalize_query(query)}".encode("utf-8")
+    ).hexdigest()
+
+
+class LineageParserCache:
+    """
+    LRU of pickled parser results, backed by an optional SQLite file
+    """
+
+    def __init__(
+        self, max_entries: int = DEFAULT_MAX_ENTRIES, path: Optional[str] = None
+    ):
+        self.max_entries = max_entries
+        self.path = path
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 or bool(self.path)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def _database(self) -> Optional[sqlite3.Connection]:
+        if not self.path:
+            return None
+        # SQLite connections must not be shared with forked processes
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = sqlite3.connect(
+                self.path, timeout=30, check_same_thread=False, isolation_level=None
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS parser_results "
+                "(key TEXT PRIMARY KEY, value BLOB)"
+            )
+            self._pid = os.getpid()
+        return self._connection
+
+    def _read(self, key: str) -> Optional[bytes]:
+        try:
+            database = self._database()
+            if database is None:
+                return None
+            row = database.execute(
+                "SELECT value FROM parser_results WHERE key = ?", (key,)
+            ).fetchone()
+            return row[0] if row else None
+        except sqlite3.Error as exc:
+            logger.debug(f"Could not read the lineage parser cache: {exc}")
+            return None
+
+    def _remember(self, key: str, data: bytes) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = data
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Results of the query with this fingerprint, if we parsed it already"""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            else:
+                data = self._read(key)
+                if data is not None:
+                    self.persistent_hits += 1
+                    self._remember(key, data)
+            if data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        try:
+            # Every parser gets its own copy of the results
+            return pickle.loads(data)
+        except Exception as exc:
+            logger.debug(f"Ignoring the lineage parser cache entry [{key}]: {exc}")
+            return None
+
+    def put(self, key: str, results: Dict[str, Any]) -> None:
+        try:
+            data = pickle.dumps(results)
+        except Exception as exc:
+            logger.debug(f"Cannot cache the lineage parser results: {exc}")
+            return
+        with self._lock:
+            self._remember(key, data)
+            try:
+                database = self._database()
+                if database is not None:
+                    database.execute(
+                        "INSERT OR REPLACE INTO parser_results VALUES (?, ?)",
+                        (key, data),
+                    )
+            except sqlite3.Error as exc:
+                logger.debug(traceback.format_exc())
+                logger.warning(f"Could not write the lineage parser cache: {exc}")
+
+    def take_stats(self) -> Dict[str, int]:
+        """Counters since the last call, e.g., to send them from a worker process"""
+        with self._lock:
+            stats = {
+                "hits": self.hits,
+                "persistent_hits": self.persistent_hits,
+                "misses": self.misses,
+            }
+            self.hits = self.persistent_hits = self.misses = 0
+        return stats
+
+    def add_stats(self, stats: Dict[str, int]) -> None:
+        """Add the counters of another process"""
+        with self._lock:
+            self.hits += stats.get("hits", 0)
+            self.persistent_hits += stats.get("persistent_hits", 0)
+            self.misses += stats.get("misses", 0)
+
+    def report(self, status: Status) -> None:
+        """Add the hit rates to the status of a step"""
+        if not self.hits + self.misses:
+            return
+        status.metric("Lineage parser cache hits", self.hits)
+        status.metric("Lineage parser cache persistent hits", self.persistent_hits)
+        status.metric("Lineage parser cache misses", self.misses)
+        status.metric("Lineage parser cache hit rate", f"{self.hit_rate:.1%}")
+
+
+_cache: Optional[LineageParserCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_lineage_parser_cache() -> LineageParserCache:
+    """Cache of the process, configured from the environment"""
+    global _cache  # pylint: disable=global-statement
+    max_entries = int(
+        os.environ.get(LINEAGE_PARSER_CACHE_SIZE_ENV, DEFAULT_MAX_ENTRIES)
+    )
+    path = os.environ.get(LINEAGE_PARSER_CACHE_PATH_ENV) or None
+    with _cache_lock:
+        if (
+            _cache is None
+            or _cache.max_entries != max_entries
+            or _cache.path != path
+        ):
+            _cache = LineageParserCache(max_entries, path)
+        return _cache
+
+
+def take_lineage_parser_cache_stats() -> Dict[str, int]:
+    """Counters of the cache of the process since the last call"""
+    return get_lineage_parser_cache().take_stats()
@@ -33,6 +33,7 @@ from metadata.ingestion.lineage.models import (
     QueryParsingFailures,
 )
 from metadata.ingestion.lineage.parser import LINEAGE_PARSING_TIMEOUT, LineageParser
+from metadata.ingestion.lineage.table_index import get_table_index
 from metadata.ingestion.ometa.ometa_api import OpenMetadata
 from metadata.utils import fqn
 from metadata.utils.fqn import build_es_fqn_search_string
@@ -69,6 +70,9 @@ def search_table_entities(
     """
     Method to get table entity from database, database_schema & table name.
 
+    If the tables of the service were indexed with `load_table_index`, it looks
+    them up there first.
+
     It will try to search first in ES and doing an extra call to get Table entities
     with the needed fields like columns for column lineage.
 
@@ -88,6 +92,11 @@ def search_table_entities(
     search_tuple = (service_name, database, database_schema, table)
     if search_tuple in search_cache:
         return search_cache.get(search_tuple)
+    table_index = get_table_index(service_name)
+    if table_index:
+        table_entities = table_index.search(database, database_schema, table)
+        if table_entities:
+            return table_entities
     try:
         table_entities: Optional[List[Table]] = []
         # search on ES first
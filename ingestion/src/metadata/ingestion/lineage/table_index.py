@@ -0,0 +1,132 @@
+#  Copyright 2021 Collate
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""
+In-memory index of the tables of a service.
+
+Lineage and usage workflows resolve the tables of hundreds of thousands of
+queries. Once the tables of the service are loaded, they are found here by
+`database.schema.table`, `schema.table` or `table`, case insensitively, and
+only the names we do not know go to Elasticsearch.
+"""
+import threading
+import traceback
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from metadata.generated.schema.entity.data.table import Table
+from metadata.ingestion.api.status import Status
+from metadata.ingestion.ometa.ometa_api import OpenMetadata
+from metadata.utils import fqn
+from metadata.utils.logger import ingestion_logger
+
+logger = ingestion_logger()
+
+IndexKey = Tuple[Optional[str], Optional[str], str]
+
+
+def _index_key(
+    database: Optional[str], schema: Optional[str], table: str
+) -> IndexKey:
+    return (
+        database.lower() if database else None,
+        schema.lower() if schema else None,
+        table.lower(),
+    )
+
+
+class TableIndex:
+    """
+    Tables of a service (with their columns), by any qualification of their name
+    """
+
+    def __init__(self, service_name: str, tables: Iterable[Table] = ()):
+        self.service_name = service_name
+        self.hits = 0
+        self.misses = 0
+        self._tables: Dict[IndexKey, List[Table]] = defaultdict(list)
+        self._size = 0
+        for table in tables:
+            self.add(table)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, table: Table) -> None:
+        database, schema, name = [
+            fqn.unquote_name(part)
+            for part in fqn.split(table.fullyQualifiedName.__root__)
+        ][-3:]
+        for key in (
+            _index_key(database, schema, name),
+            _index_key(None, schema, name),
+            _index_key(database, None, name),
+            _index_key(None, None, name),
+        ):
+            self._tables[key].append(table)
+        self._size += 1
+
+    def search(
+        self, database: Optional[str], schema: Optional[str], table: str
+    ) -> Optional[List[Table]]:
+        """Tables matching the given names, as the ES search with `*` for the missing ones"""
+        tables = self._tables.get(_index_key(database, schema, table))
+        if tables:
+            self.hits += 1
+            return list(tables)
+        self.misses += 1
+        return None
+
+    @classmethod
+    def load(cls, metadata: OpenMetadata, service_name: str) -> "TableIndex":
+        table_index = cls(
+            service_name,
+            metadata.list_all_entities(
+                entity=Table, fields=["columns"], params={"service": service_name}
+            ),
+        )
+        logger.info(
+            f"Indexed {len(table_index)} tables of the service [{service_name}]"
+        )
+        return table_index
+
+    def report(self, status: Status) -> None:
+        """Add the lookups to the status of a step"""
+        status.metric(f"Table index [{self.service_name}] tables", len(self))
+        status.metric(f"Table index [{self.service_name}] hits", self.hits)
+        status.metric(f"Table index [{self.service_name}] misses", self.misses)
+
+
+# None for the services we could not index, so we do not try again
+_table_indexes: Dict[str, Optional[TableIndex]] = {}
+_table_indexes_lock = threading.Lock()
+
+
+def load_table_index(
+    metadata: OpenMetadata, service_name: str
+) -> Optional[TableIndex]:
+    """Index the tables of the service once per process"""
+    with _table_indexes_lock:
+        if service_name not in _table_indexes:
+            try:
+                _table_indexes[service_name] = TableIndex.load(metadata, service_name)
+            except Exception as exc:
+                logger.debug(traceback.format_exc())
+                logger.warning(
+                    f"Cannot index the tables of the service [{service_name}],"
+                    f" they will be searched in Elasticsearch: {exc}"
+                )
+                _table_indexes[service_name] = None
+        return _table_indexes[service_name]
+
+
+def get_table_index(service_name: Optional[str]) -> Optional[TableIndex]:
+    """Index of the service, if it was loaded"""
+    return _table_indexes.get(service_name) if service_name else None
@@ -0,0 +1,152 @@
+#  Copyright 2021 Collate
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""
+Async REST client backed by httpx.
+
+It shares the auth, headers, retry configuration and write listeners
+of the sync REST client and exposes the same get/post/put/patch/delete
+methods as coroutines, so that many requests can be in flight
+over a single pool of keep-alive connections.
+"""
+import asyncio
+import traceback
+
+from metadata.ingestion.ometa.client import REST, APIError, ClientConfig
+from metadata.ingestion.ometa.credentials import URL
+from metadata.utils.logger import ometa_logger
+
+logger = ometa_logger()
+
+
+class AsyncREST(REST):
+    """
+    REST client wrapper running the requests with an httpx.AsyncClient.
+
+    Requires the `httpx` package: pip install "openmetadata-ingestion[ometa-async]"
+    """
+
+    def __init__(self, config: ClientConfig):
+        super().__init__(config)
+        try:
+            import httpx  # pylint: disable=import-outside-toplevel
+        except ModuleNotFoundError as err:
+            logger.debug(traceback.format_exc())
+            logger.error(
+                "Cannot import httpx, please install the ometa-async plugin: "
+                "pip install openmetadata-ingestion[ometa-async], %s",
+                err,
+            )
+            raise err
+
+        self._httpx = httpx
+        self._async_client = httpx.AsyncClient(
+            verify=self._verify if self._verify is not None else True,
+            limits=httpx.Limits(
+                max_connections=self.config.pool_maxsize,
+                max_keepalive_connections=self.config.pool_maxsize,
+                keepalive_expiry=self.config.keep_alive_expiry,
+            ),
+        )
+
+    async def _async_request(
+        self,
+        method,
+        path,
+        data=None,
+        headers: dict = None,
+    ):
+        url, opts = self._prepare_request(
+            method=method, path=path, data=data, headers=headers
+        )
+
+        total_retries = self._retry if self._retry > 0 else 0
+        retry = total_retries
+        while retry >= 0:
+            resp = await self._async_client.request(
+                method,
+                url,
+                headers=opts["headers"],
+                params=opts.get("params"),
+                content=opts.get("data"),
+                follow_redirects=opts["allow_redirects"],
+            )
+            if resp.status_code in self._retry_codes and retry > 0:
+                retry_wait = self._retry_wait * (total_retries - retry + 1)
+                logger.warning(
+                    "sleep %s seconds and retrying %s %s more time(s)...",
+                    retry_wait,
+                    url,
+                    retry,
+                )
+                await asyncio.sleep(retry_wait)
+                retry -= 1
+                continue
+
+            return self._handle_response(resp, url, method)
+
+        return None
+
+    def _handle_response(self, resp, url: URL, method: str):
+        """Mirror the sync client: return the JSON body or raise an APIError"""
+        try:
+            resp.raise_for_status()
+        except self._httpx.HTTPStatusError as http_error:
+            if "code" in resp.text:
+                error = resp.json()
+                if "code" in error:
+                    raise APIError(error, http_error) from http_error
+            raise
+
+        if resp.text != "":
+            try:
+                return resp.json()
+            except Exception as exc:
+                logger.debug(traceback.format_exc())
+                logger.warning(
+                    f"Unexpected error while returning response from [{method} {url}] in json format - {exc}"
+                )
+        return None
+
+    async def get(self, path, data=None):  # pylint: disable=invalid-overridden-method
+        """GET method"""
+        return await self._async_request("GET", path, data)
+
+    async def post(self, path, data=None):  # pylint: disable=invalid-overridden-method
+        """POST method"""
+        return await self._async_request("POST", path, data)
+
+    async def put(self, path, data=None):  # pylint: disable=invalid-overridden-method
+        """PUT method"""
+        return await self._async_request("PUT", path, data)
+
+    async def patch(self, path, data=None):  # pylint: disable=invalid-overridden-method
+        """PATCH method"""
+        return await self._async_request(
+            "PATCH",
+            path,
+            data,
+            headers={"Content-type": "application/json-patch+json"},
+        )
+
+    async def delete(self, path, data=None):  # pylint: disable=invalid-overridden-method
+        """DELETE method"""
+        return await self._async_request("DELETE", path, data)
+
+    async def aclose(self):
+        """Close the async connection pool and the sync session"""
+        await self._async_client.aclose()
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
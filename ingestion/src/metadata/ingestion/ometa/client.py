@@ -12,12 +12,15 @@
 Python API REST wrapper and helpers
 """
 import datetime
+import socket
 import time
 import traceback
-from typing import Callable, Dict, List, Optional, Union
+from typing import Callable, Dict, List, Optional, Tuple, Union
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import HTTPError
+from urllib3.connection import HTTPConnection
 
 from metadata.config.common import ConfigModel
 from metadata.ingestion.ometa.credentials import URL, get_api_version
@@ -91,6 +94,13 @@ class ClientConfig(ConfigModel):
     """
     :param raw_data: should we return api response raw or wrap it with
                          Entity objects.
+    :param pool_connections: number of per-host connection pools to cache
+    :param pool_maxsize: max number of connections kept open per host. It
+                         should be at least the number of threads using the client.
+    :param pool_block: wait for a free connection instead of opening
+                         a throwaway one when the pool is exhausted
+    :param keep_alive: enable TCP keep-alive on the pooled connections
+    :param keep_alive_expiry: seconds an idle connection is kept by the async backend
     """
 
     base_url: str
@@ -107,6 +117,29 @@ class ClientConfig(ConfigModel):
     allow_redirects: Optional[bool] = False
     auth_token_mode: Optional[str] = "Bearer"
     verify: Optional[Union[bool, str]] = None
+    pool_connections: int = 10
+    pool_maxsize: int = 10
+    pool_block: bool = False
+    keep_alive: bool = True
+    keep_alive_expiry: float = 60.0
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """
+    HTTP Adapter enabling TCP keep-alive on the pooled connections
+    so that idle sockets are not silently dropped between requests.
+    """
+
+    def __init__(self, keep_alive: bool = True, **kwargs):
+        self._keep_alive = keep_alive
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self._keep_alive:
+            kwargs["socket_options"] = HTTPConnection.default_socket_options + [
+                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            ]
+        super().init_poolmanager(*args, **kwargs)
 
 
 class REST:
@@ -120,6 +153,7 @@ class REST:
         self._base_url: URL = URL(self.config.base_url)
         self._api_version = get_api_version(self.config.api_version)
         self._session = requests.Session()
+        self._mount_adapters(self.config.pool_maxsize)
         self._use_raw_data = self.config.raw_data
         self._retry = self.config.retry
         self._retry_wait = self.config.retry_wait
@@ -127,8 +161,45 @@ class REST:
         self._auth_token = self.config.auth_token
         self._auth_token_mode = self.config.auth_token_mode
         self._verify = self.config.verify
+        self._write_listeners: List[Callable[[str], None]] = []
 
-    def _request(
+    def add_write_listener(self, listener: Callable[[str], None]) -> None:
+        """
+        Register a function to be called with the request path
+        before any non-GET request, e.g., to invalidate cached data.
+        """
+        self._write_listeners.append(listener)
+
+    def _mount_adapters(self, pool_maxsize: int) -> None:
+        """Mount the pooled adapters in the session, closing the ones they replace"""
+        for prefix in ("http://", "https://"):
+            previous = self._session.adapters.get(prefix)
+            if previous is not None:
+                previous.close()
+            self._session.mount(
+                prefix,
+                PooledHTTPAdapter(
+                    keep_alive=self.config.keep_alive,
+                    pool_connections=self.config.pool_connections,
+                    pool_maxsize=pool_maxsize,
+                    pool_block=self.config.pool_block,
+                ),
+            )
+
+    def ensure_pool_size(self, pool_maxsize: int) -> None:
+        """
+        Make sure the connection pool can hold `pool_maxsize` connections per host,
+        e.g., one per thread sharing this client. Otherwise, the extra connections
+        get opened and discarded on every request.
+
+        This should be called before the threads start using the client.
+        """
+        if pool_maxsize > self.config.pool_maxsize:
+            logger.debug(f"Resizing the connection pool to {pool_maxsize}")
+            self.config.pool_maxsize = pool_maxsize
+            self._mount_adapters(pool_maxsize)
+
+    def _prepare_request(
         self,
         method,
         path,
@@ -136,8 +207,16 @@ class REST:
         base_url: URL = None,
         api_version: str = None,
         headers: dict = None,
-    ):
+    ) -> Tuple[URL, dict]:
+        """
+        Build the URL and the request options, refreshing the auth token if needed.
+        The write listeners are called here so that every backend notifies them.
+        """
         # pylint: disable=too-many-locals
+        if method.upper() != "GET":
+            for listener in self._write_listeners:
+                listener(path)
+
         if not headers:
             headers = {"Content-type": "application/json"}
         base_url = base_url or self._base_url
@@ -186,6 +265,26 @@ class REST:
         method_key = "params" if method.upper() == "GET" else "data"
         opts[method_key] = data
 
+        return url, opts
+
+    def _request(
+        self,
+        method,
+        path,
+        data=None,
+        base_url: URL = None,
+        api_version: str = None,
+        headers: dict = None,
+    ):
+        url, opts = self._prepare_request(
+            method=method,
+            path=path,
+            data=data,
+            base_url=base_url,
+            api_version=api_version,
+            headers=headers,
+        )
+
         total_retries = self._retry if self._retry > 0 else 0
         retry = total_retries
         while retry >= 0:
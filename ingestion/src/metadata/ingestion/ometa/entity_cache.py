@@ -0,0 +1,274 @@
+#  Copyright 2021 Collate
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""
+Entity cache for the OpenMetadata client GET by name / id calls.
+
+It has two tiers:
+- An in-memory LRU holding the raw JSON responses.
+- An optional SQLite file to keep the responses across runs. When the
+  cache is opened, the change events registered in the server since the
+  last run are used to drop the entities that have been updated or deleted.
+
+Entries are keyed by entity type + path (name/<fqn> or <id>) + fields,
+and are invalidated whenever the client writes to an entity. Responses
+carrying credentials are never written to the SQLite file.
+"""
+import json
+import sqlite3
+import threading
+import traceback
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Type
+from urllib.parse import unquote
+
+from pydantic import BaseModel
+
+from metadata.generated.schema.entity.services.connections.metadata.openMetadataConnection import (
+    EntityCacheConfig,
+)
+from metadata.utils.helpers import datetime_to_ts
+from metadata.utils.logger import ometa_logger
+from metadata.utils.lru_cache import LRUCache
+
+logger = ometa_logger()
+
+KEY_SEPARATOR = "|"
+# Change events fetched in a single call when syncing the on-disk tier
+EVENTS_LIMIT = 10000
+# Fields holding secrets, e.g., the connection of a service
+SECRET_FIELDS = {"connection", "authenticationMechanism"}
+
+
+class EntityCacheStats:
+    """Hit / miss counters"""
+
+    def __init__(self):
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return round(self.hits * 100 / total, 2) if total else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.hits} hits ({self.disk_hits} from disk), {self.misses} misses,"
+            f" {self.invalidations} invalidations, {self.hit_ratio}% hit ratio"
+        )
+
+
+class EntityCache:
+    """
+    Two-tier cache of the entities returned by the API
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        entity_types: Iterable[str],
+        cache_path: Optional[str] = None,
+    ):
+        self.entity_types: Set[str] = set(entity_types)
+        self.stats = EntityCacheStats()
+
+        self._memory = LRUCache(max_size)
+        # {"id:<uuid>" or "fqn:<fqn>": {cache keys}} to invalidate every fields combination
+        self._refs: Dict[str, Set[str]] = {}
+        # Last entity version seen by id
+        self._versions: Dict[str, float] = {}
+        self._lock = threading.RLock()
+
+        self._disk: Optional[sqlite3.Connection] = None
+        if cache_path:
+            self._disk = sqlite3.connect(cache_path, check_same_thread=False)
+            self._disk.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS entities (
+                    cache_key TEXT PRIMARY KEY,
+                    entity_id TEXT,
+                    fqn TEXT,
+                    payload TEXT
+                );
+                CREATE INDEX IF NOT EXISTS entities_id ON entities (entity_id);
+                CREATE INDEX IF NOT EXISTS entities_fqn ON entities (fqn);
+                CREATE TABLE IF NOT EXISTS sync (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    last_sync INTEGER
+                );
+                """
+            )
+
+    @classmethod
+    def create(cls, config: EntityCacheConfig) -> "EntityCache":
+        return cls(
+            max_size=config.maxSize,
+            entity_types=config.entityTypes,
+            cache_path=config.cachePath,
+        )
+
+    def is_cacheable(self, entity: Type[BaseModel]) -> bool:
+        return entity.__name__ in self.entity_types
+
+    @staticmethod
+    def build_key(
+        entity: Type[BaseModel], path: str, fields: Optional[List[str]] = None
+    ) -> str:
+        return KEY_SEPARATOR.join(
+            (entity.__name__, path, ",".join(sorted(fields or [])))
+        )
+
+    def get(
+        self, entity: Type[BaseModel], path: str, fields: Optional[List[str]] = None
+    ) -> Optional[dict]:
+        """Return the cached JSON response, if any"""
+        key = self.build_key(entity, path, fields)
+        with self._lock:
+            if key in self._memory:
+                self.stats.hits += 1
+                return self._memory.get(key)
+
+            if self._disk is not None:
+                row = self._disk.execute(
+                    "SELECT payload FROM entities WHERE cache_key = ?", (key,)
+                ).fetchone()
+                if row:
+                    payload = json.loads(row[0])
+                    self._put_memory(key, payload)
+                    self.stats.hits += 1
+                    self.stats.disk_hits += 1
+                    return payload
+
+            self.stats.misses += 1
+            return None
+
+    def put(
+        self,
+        entity: Type[BaseModel],
+        path: str,
+        fields: Optional[List[str]],
+        payload: dict,
+    ) -> None:
+        """Store the JSON response"""
+        key = self.build_key(entity, path, fields)
+        entity_id = payload.get("id")
+        with self._lock:
+            # A newer version makes the entries with other fields stale
+            version = payload.get("version")
+            if entity_id and version is not None:
+                if version > self._versions.get(entity_id, version):
+                    self._invalidate_refs([f"id:{entity_id}"])
+                self._versions[entity_id] = version
+
+            self._put_memory(key, payload)
+            if self._disk is not None and not SECRET_FIELDS.intersection(payload):
+                self._disk.execute(
+                    "INSERT OR REPLACE INTO entities VALUES (?, ?, ?, ?)",
+                    (key, entity_id, payload.get("fullyQualifiedName"), json.dumps(payload)),
+                )
+                self._disk.commit()
+
+    def _put_memory(self, key: str, payload: dict) -> None:
+        self._memory.put(key, payload)
+        for ref in self._payload_refs(payload):
+            self._refs.setdefault(ref, set()).add(key)
+
+    @staticmethod
+    def _payload_refs(payload: dict) -> List[str]:
+        refs = []
+        if payload.get("id"):
+            refs.append(f"id:{payload['id']}")
+        if payload.get("fullyQualifiedName"):
+            refs.append(f"fqn:{payload['fullyQualifiedName']}")
+        return refs
+
+    def invalidate(self, payload: dict) -> None:
+        """Drop the cached entries of the given entity JSON"""
+        with self._lock:
+            self._invalidate_refs(self._payload_refs(payload))
+
+    def invalidate_path(self, path: str) -> None:
+        """
+        Drop the entries of the entity we are writing to, based on the request path, e.g.,
+        /containers/<id>/sampleData or /tables/name/<fqn>/tableProfile
+        """
+        parts = path.split("?")[0].strip("/").split("/")
+        if len(parts) < 2:
+            return
+        if parts[1] == "name" and len(parts) > 2:
+            ref = f"fqn:{unquote(parts[2])}"
+        else:
+            ref = f"id:{parts[1]}"
+        with self._lock:
+            self._invalidate_refs([ref])
+
+    def _invalidate_refs(self, refs: List[str]) -> None:
+        for ref in refs:
+            keys = self._refs.pop(ref, set())
+            for key in keys:
+                if self._memory.pop(key):
+                    self.stats.invalidations += 1
+
+            if self._disk is not None:
+                kind, value = ref.split(":", 1)
+                column = "entity_id" if kind == "id" else "fqn"
+                self._disk.execute(f"DELETE FROM entities WHERE {column} = ?", (value,))
+        if self._disk is not None:
+            self._disk.commit()
+
+    def sync(self, client) -> None:
+        """
+        Drop the on-disk entries of the entities that changed in the server since the
+        last run. If we cannot get the change events, we start from an empty cache.
+        """
+        if self._disk is None:
+            return
+
+        now = datetime_to_ts(datetime.now())
+        row = self._disk.execute("SELECT last_sync FROM sync WHERE id = 0").fetchone()
+        if row and row[0]:
+            try:
+                resp = client.get(
+                    "/events",
+                    data={
+                        "entityUpdated": "*",
+                        "entityDeleted": "*",
+                        "entityRestored": "*",
+                        "timestamp": row[0],
+                        "limit": EVENTS_LIMIT,
+                    },
+                )
+                events = (resp or {}).get("data") or []
+                if len(events) >= EVENTS_LIMIT:
+                    raise ValueError(f"Too many change events since {row[0]}")
+                with self._lock:
+                    refs = []
+                    for event in events:
+                        if event.get("entityId"):
+                            refs.append(f"id:{event['entityId']}")
+                        if event.get("entityFullyQualifiedName"):
+                            refs.append(f"fqn:{event['entityFullyQualifiedName']}")
+                    self._invalidate_refs(refs)
+                logger.debug(f"Entity cache synced with {len(events)} change events")
+            except Exception as exc:
+                logger.debug(traceback.format_exc())
+                logger.warning(f"Could not sync the entity cache, clearing it: {exc}")
+                self._disk.execute("DELETE FROM entities")
+
+        self._disk.execute("INSERT OR REPLACE INTO sync VALUES (0, ?)", (now,))
+        self._disk.commit()
+
+    def close(self) -> None:
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
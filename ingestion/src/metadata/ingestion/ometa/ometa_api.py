@@ -15,7 +15,17 @@ models from the JSON schemas and provides a typed approach to
 working with OpenMetadata entities.
 """
 import traceback
-from typing import Dict, Generic, Iterable, List, Optional, Type, TypeVar, Union
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Type,
+    TypeVar,
+    Union,
+)
 
 from pydantic import BaseModel
 from requests.compat import quote
@@ -24,6 +34,7 @@ from metadata.generated.schema.api.services.ingestionPipelines.createIngestionPi
     CreateIngestionPipelineRequest,
 )
 from metadata.generated.schema.entity.services.connections.metadata.openMetadataConnection import (
+    ConnectionPoolConfig,
     OpenMetadataConnection,
 )
 from metadata.generated.schema.type import basic
@@ -33,6 +44,7 @@ from metadata.generated.schema.type.entityReference import EntityReference
 from metadata.ingestion.models.encoders import show_secrets_encoder
 from metadata.ingestion.ometa.auth_provider import OpenMetadataAuthenticationProvider
 from metadata.ingestion.ometa.client import REST, APIError, ClientConfig
+from metadata.ingestion.ometa.entity_cache import EntityCache
 from metadata.ingestion.ometa.mixins.container_mixin import OMetaContainerMixin
 from metadata.ingestion.ometa.mixins.custom_property_mixin import (
     OMetaCustomPropertyMixin,
@@ -65,6 +77,9 @@ from metadata.utils.logger import ometa_logger
 from metadata.utils.secrets.secrets_manager_factory import SecretsManagerFactory
 from metadata.utils.ssl_registry import get_verify_ssl_fn
 
+if TYPE_CHECKING:
+    from metadata.ingestion.ometa.async_client import AsyncREST
+
 # from urllib.parse import (
 #     quote
 # )
@@ -154,6 +169,7 @@ class OpenMetadata(
 
         get_verify_ssl = get_verify_ssl_fn(self.config.verifySSL)
 
+        pool_config = self.config.connectionPool or ConnectionPoolConfig()
         client_config: ClientConfig = ClientConfig(
             base_url=self.config.hostPort,
             api_version=self.config.apiVersion,
@@ -161,9 +177,20 @@ class OpenMetadata(
             extra_headers=self.config.extraHeaders,
             auth_token=self._auth_provider.get_access_token,
             verify=get_verify_ssl(self.config.sslConfig),
+            pool_connections=pool_config.poolConnections,
+            pool_maxsize=pool_config.poolMaxsize,
+            pool_block=pool_config.poolBlock,
+            keep_alive=pool_config.keepAlive,
         )
         self.client = REST(client_config)
         self._use_raw_data = raw_data
+
+        self.entity_cache: Optional[EntityCache] = None
+        if self.config.entityCache and self.config.entityCache.enabled:
+            self.entity_cache = EntityCache.create(self.config.entityCache)
+            self.client.add_write_listener(self.entity_cache.invalidate_path)
+            self.entity_cache.sync(self.client)
+
         if self.config.enableVersionValidation:
             self.validate_versions()
 
@@ -277,6 +304,8 @@ class OpenMetadata(
             raise EmptyPayloadException(
                 f"Got an empty response when trying to PUT to {self.get_suffix(entity)}, {data.json()}"
             )
+        if self.entity_cache:
+            self.entity_cache.invalidate(resp)
         return entity_class(**resp)
 
     def create_or_update(self, data: C) -> T:
@@ -287,6 +316,46 @@ class OpenMetadata(
         """Run a POST requesting via create request C"""
         return self._create(data=data, method="post")
 
+    def create_or_update_bulk(self, data: List[C]) -> List[Optional[T]]:
+        """
+        Run a single PUT request against the `/bulk` endpoint with a list
+        of create requests C of the same type.
+
+        The server answers with the list of processed entities, in the same
+        order as the requests, with `null` for the requests it could not process.
+        :param data: list of create requests of the same type
+        :return: list of Entities (or None) matching the requests by position
+        """
+        if not data:
+            return []
+
+        create_class = data[0].__class__
+        if any(not isinstance(request, create_class) for request in data):
+            raise InvalidEntityException(
+                f"Bulk PUT operations need requests of a single type, got {create_class} and others"
+            )
+        if "create" not in create_class.__name__.lower():
+            raise InvalidEntityException(
+                f"PUT operations need a CreateEntity, not {create_class}"
+            )
+        entity_class = self.get_entity_from_create(create_class)
+
+        payload = "[" + ",".join(
+            request.json(encoder=show_secrets_encoder) for request in data
+        ) + "]"
+        resp = self.client.put(f"{self.get_suffix(create_class)}/bulk", data=payload)
+        if resp is None:
+            raise EmptyPayloadException(
+                f"Got an empty response when trying to PUT to {self.get_suffix(create_class)}/bulk"
+            )
+
+        entities = resp["data"] if isinstance(resp, dict) else resp
+        if self.entity_cache:
+            for entity in entities:
+                if entity:
+                    self.entity_cache.invalidate(entity)
+        return [entity_class(**entity) if entity else None for entity in entities]
+
     def get_by_name(
             self,
             entity: Type[T],
@@ -335,6 +404,16 @@ class OpenMetadata(
         :param path: URL suffix by FQN or ID
         :param fields: List of fields to return
         """
+        cache = (
+            self.entity_cache
+            if self.entity_cache and self.entity_cache.is_cacheable(entity)
+            else None
+        )
+        if cache:
+            cached = cache.get(entity, path, fields)
+            if cached:
+                return entity(**cached)
+
         fields_str = "?fields=" + ",".join(fields) if fields else ""
         try:
             resp = self.client.get(f"{self.get_suffix(entity)}/{path}{fields_str}")
@@ -342,6 +421,8 @@ class OpenMetadata(
                 raise EmptyPayloadException(
                     f"Got an empty response when trying to GET from {self.get_suffix(entity)}/{path}{fields_str}"
                 )
+            if cache:
+                cache.put(entity, path, fields, resp)
             return entity(**resp)
         except APIError as err:
             # We can expect some GET calls to return us a None and manage it in following steps.
@@ -532,6 +613,20 @@ class OpenMetadata(
         raw_version = self.client.get("/system/version")["version"]
         return raw_version is not None
 
+    def get_async_client(self) -> "AsyncREST":
+        """
+        Return an async client with the configuration of the sync one.
+        Its writes invalidate the entity cache as well.
+        Requires the ometa-async plugin.
+        """
+        # pylint: disable=import-outside-toplevel
+        from metadata.ingestion.ometa.async_client import AsyncREST
+
+        async_client = AsyncREST(self.client.config)
+        if self.entity_cache:
+            async_client.add_write_listener(self.entity_cache.invalidate_path)
+        return async_client
+
     def close(self):
         """
         Closing connection
@@ -539,4 +634,6 @@ class OpenMetadata(
         Returns
             None
         """
+        if self.entity_cache:
+            self.entity_cache.close()
         self.client.close()
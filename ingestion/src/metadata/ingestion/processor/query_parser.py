@@ -14,7 +14,8 @@ Query parser implementation
 
 import datetime
 import traceback
-from typing import Optional
+from functools import partial
+from typing import Iterable, Optional
 
 from metadata.config.common import ConfigModel
 from metadata.generated.schema.type.basic import DateTime
@@ -24,8 +25,13 @@ from metadata.ingestion.api.models import Either
 from metadata.ingestion.api.steps import Processor
 from metadata.ingestion.lineage.models import ConnectionTypeDialectMapper, Dialect
 from metadata.ingestion.lineage.parser import LineageParser
+from metadata.ingestion.lineage.parser_cache import (
+    get_lineage_parser_cache,
+    take_lineage_parser_cache_stats,
+)
 from metadata.ingestion.ometa.ometa_api import OpenMetadata
 from metadata.utils.logger import ingestion_logger
+from metadata.utils.process_pool import TaskResult, TimeoutProcessPool
 from metadata.utils.time_utils import convert_timestamp_to_milliseconds
 
 logger = ingestion_logger()
@@ -68,14 +74,26 @@ def parse_sql_statement(record: TableQuery, dialect: Dialect) -> Optional[Parsed
     )
 
 
+class QueryParserConfig(ConfigModel):
+    """Query parser processor configuration"""
+
+    # Number of processes parsing the queries. With 1, they are parsed in the
+    # workflow process, one after the other
+    parsingProcesses: int = 1
+    # Seconds a query can be parsed for before its process is restarted
+    parsingTimeout: int = 60
+    # Number of queries sent to a process at once
+    parsingChunkSize: int = 50
+
+
 class QueryParserProcessor(Processor):
     """Extension of the `Processor` class"""
 
-    config: ConfigModel
+    config: QueryParserConfig
 
     def __init__(
         self,
-        config: ConfigModel,
+        config: QueryParserConfig,
         metadata: OpenMetadata,
         connection_type: str,
     ):
@@ -83,6 +101,8 @@ class QueryParserProcessor(Processor):
         self.config = config
         self.metadata = metadata
         self.connection_type = connection_type
+        self.dialect = ConnectionTypeDialectMapper.dialect_of(connection_type)
+        self._pool: Optional[TimeoutProcessPool] = None
 
     @property
     def name(self) -> str:
@@ -96,7 +116,7 @@ class QueryParserProcessor(Processor):
         pipeline_name: Optional[str] = None,
         **kwargs,
     ):
-        config = ConfigModel.parse_obj(config_dict)
+        config = QueryParserConfig.parse_obj(config_dict)
         connection_type = kwargs.pop("connection_type", "")
         return cls(config, metadata, connection_type)
 
@@ -109,19 +129,16 @@ class QueryParserProcessor(Processor):
         failed_cnt = 0
         total_cnt = len(record.queries)
 
-        for table_query in record.queries:
-            try:
-                parsed_sql = parse_sql_statement(
-                    table_query,
-                    ConnectionTypeDialectMapper.dialect_of(self.connection_type),
-                )
-                if parsed_sql:
-                    data.append(parsed_sql)
+        for table_query, result in zip(record.queries, self._parse(record.queries)):
+            if result.error is None:
+                if result.value:
+                    data.append(result.value)
                 success_cnt += 1
-            except Exception as exc:
+            else:
                 failed_cnt += 1
-                logger.debug(traceback.format_exc())
-                logger.warning(f"Error processing query [{table_query.query}]: {exc}")
+                logger.warning(
+                    f"Error processing query [{table_query.query}]: {result.error}"
+                )
             cur_total_cnt = success_cnt + failed_cnt
             if cur_total_cnt % 1000 == 0 or cur_total_cnt == total_cnt:
                 logger.info(
@@ -129,7 +146,38 @@ class QueryParserProcessor(Processor):
                     f" Current success count: {success_cnt}."
                     f" Current failed count: {failed_cnt}."
                 )
+        cache = get_lineage_parser_cache()
+        if self._pool is not None:
+            # The queries were parsed with the caches of the worker processes
+            cache.add_stats(self._pool.take_stats())
+        cache.report(self.status)
         return Either(right=QueryParserData(parsedData=data))
 
+    def _parse(self, queries: Iterable[TableQuery]) -> Iterable[TaskResult]:
+        """
+        Parse the queries in order. The SIGALRM timeout of the lineage parser only
+        works in the main thread, so parallel parsing happens in processes.
+        """
+        if self.config.parsingProcesses > 1:
+            if self._pool is None:
+                self._pool = TimeoutProcessPool(
+                    partial(parse_sql_statement, dialect=self.dialect),
+                    processes=self.config.parsingProcesses,
+                    timeout_seconds=self.config.parsingTimeout,
+                    chunk_size=self.config.parsingChunkSize,
+                    worker_stats=take_lineage_parser_cache_stats,
+                )
+            yield from self._pool.map(queries)
+            return
+
+        for table_query in queries:
+            try:
+                yield TaskResult(value=parse_sql_statement(table_query, self.dialect))
+            except Exception as exc:
+                logger.debug(traceback.format_exc())
+                yield TaskResult(error=str(exc))
+
     def close(self):
-        """Nothing to close"""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
@@ -13,9 +13,11 @@ This is the main used sink for all OM Workflows.
 It picks up the generated Entities and send them
 to the OM API.
 """
+import time
 import traceback
+from collections import defaultdict
 from functools import singledispatchmethod
-from typing import Any, Dict, Optional, TypeVar, Union
+from typing import Any, Dict, List, Optional, Type, TypeVar, Union
 
 from pydantic import BaseModel
 from requests.exceptions import HTTPError
@@ -24,6 +26,8 @@ from metadata.config.common import ConfigModel
 from metadata.data_insight.source.metadata import DataInsightRecord
 from metadata.data_quality.api.models import TestCaseResultResponse, TestCaseResults
 from metadata.generated.schema.analytics.reportData import ReportData
+from metadata.generated.schema.api.data.createContainer import CreateContainerRequest
+from metadata.generated.schema.api.data.createTable import CreateTableRequest
 from metadata.generated.schema.api.lineage.addLineage import AddLineageRequest
 from metadata.generated.schema.api.teams.createRole import CreateRoleRequest
 from metadata.generated.schema.api.teams.createTeam import CreateTeamRequest
@@ -93,8 +97,22 @@ logger = ingestion_logger()
 T = TypeVar("T", bound=BaseModel)
 
 
+# Create requests that can be buffered and sent through the `/bulk` endpoints
+BULK_CREATE_REQUESTS = (CreateTableRequest, CreateContainerRequest)
+
+
 class MetadataRestSinkConfig(ConfigModel):
+    """
+    - bulk_size: number of create requests buffered per entity type
+      before sending them in a single bulk request. Values lower than 2
+      keep the default one request per record behavior.
+    - bulk_flush_interval: maximum seconds a buffered request waits
+      before the buffer is flushed.
+    """
+
     api_endpoint: Optional[str] = None
+    bulk_size: int = 0
+    bulk_flush_interval: float = 10.0
 
 
 class MetadataRestSink(Sink):  # pylint: disable=too-many-public-methods
@@ -117,6 +135,10 @@ class MetadataRestSink(Sink):  # pylint: disable=too-many-public-methods
         self.role_entities = {}
         self.team_entities = {}
 
+        self.bulk_enabled = self.config.bulk_size > 1
+        self._bulk_buffer: Dict[Type[BaseModel], List[BaseModel]] = defaultdict(list)
+        self._bulk_buffer_start: Optional[float] = None
+
     @classmethod
     def create(
         cls,
@@ -143,21 +165,28 @@ class MetadataRestSink(Sink):  # pylint: disable=too-many-public-methods
         """
         log = get_log_name(record)
         try:
-            return self._run_dispatch(record)
+            # Keep the source order: anything we won't buffer goes after the pending requests
+            if self._bulk_buffer and not self._is_bulk_request(record):
+                self.flush()
+            result = self._run_dispatch(record)
         except (APIError, HTTPError) as err:
             error = f"Failed to ingest {log} due to api request failure: {err}"
-            return Either(
+            result = Either(
                 left=StackTraceError(
                     name=log, error=error, stackTrace=traceback.format_exc()
                 )
             )
         except Exception as exc:
             error = f"Failed to ingest {log}: {exc}"
-            return Either(
+            result = Either(
                 left=StackTraceError(
                     name=log, error=error, stackTrace=traceback.format_exc()
                 )
             )
+        # Buffered records are acknowledged when flushed
+        if result and (result.left is not None or result.right is not None):
+            self.ack(record, result)
+        return result
 
     def write_create_request(self, entity_request) -> Either[Entity]:
         """
@@ -175,6 +204,121 @@ class MetadataRestSink(Sink):  # pylint: disable=too-many-public-methods
             )
         )
 
+    def _is_bulk_request(self, record: Entity) -> bool:
+        """
+        Only leaf entities are buffered. Buckets and directories are Containers
+        without file formats, and sources look them up by name right after
+        sending them to build their children, so they need to be written through.
+        """
+        if not self.bulk_enabled or not isinstance(record, BULK_CREATE_REQUESTS):
+            return False
+        if isinstance(record, CreateContainerRequest):
+            return bool(record.fileFormats)
+        return True
+
+    @_run_dispatch.register
+    def write_table_request(self, record: CreateTableRequest) -> Either[Table]:
+        """Buffer the table request if bulk is enabled. Otherwise, PUT it as is"""
+        if self._is_bulk_request(record):
+            return self._buffer_create_request(record)
+        return self.write_create_request(record)
+
+    @_run_dispatch.register
+    def write_container_request(
+        self, record: CreateContainerRequest
+    ) -> Either[Container]:
+        """Buffer the container request if bulk is enabled. Otherwise, PUT it as is"""
+        if self._is_bulk_request(record):
+            return self._buffer_create_request(record)
+        return self.write_create_request(record)
+
+    def _buffer_create_request(self, entity_request: BaseModel) -> Either[Entity]:
+        """
+        Store the request until we reach the bulk size or the flush interval.
+        We return an empty Either: the status of each record is
+        updated, and the record acknowledged, when the buffer is flushed.
+        """
+        if self._bulk_buffer_start is None:
+            self._bulk_buffer_start = time.time()
+
+        requests_buffer = self._bulk_buffer[type(entity_request)]
+        requests_buffer.append(entity_request)
+
+        if (
+            len(requests_buffer) >= self.config.bulk_size
+            or time.time() - self._bulk_buffer_start >= self.config.bulk_flush_interval
+        ):
+            self.flush()
+
+        return Either()
+
+    def flush(self) -> None:
+        """Send all the buffered create requests"""
+        buffer = self._bulk_buffer
+        self._bulk_buffer = defaultdict(list)
+        self._bulk_buffer_start = None
+
+        for entity_requests in buffer.values():
+            self._write_bulk_create_requests(entity_requests)
+
+    def _write_bulk_create_requests(self, entity_requests: List[BaseModel]) -> None:
+        """
+        PUT the requests in a single call and update the status of each record.
+        If the bulk request fails, we fall back to one request per record.
+        """
+        try:
+            entities = self.metadata.create_or_update_bulk(entity_requests)
+        except Exception as exc:
+            logger.debug(traceback.format_exc())
+            if isinstance(exc, APIError) and exc.status_code in (404, 405):
+                logger.warning(
+                    "The server does not support bulk requests. Disabling bulk mode in the sink."
+                )
+                self.bulk_enabled = False
+            else:
+                logger.warning(
+                    f"Failed to ingest {len(entity_requests)} records in bulk: {exc}. "
+                    "Retrying them one by one."
+                )
+            for entity_request in entity_requests:
+                self._write_single_create_request(entity_request)
+            return
+
+        for position, entity_request in enumerate(entity_requests):
+            entity = entities[position] if position < len(entities) else None
+            if entity is not None:
+                self.status.scanned(entity)
+                self.ack(entity_request, Either(right=entity))
+            else:
+                log = get_log_name(entity_request)
+                error = StackTraceError(
+                    name=log,
+                    error=f"Failed to ingest {log} in bulk",
+                    stackTrace=None,
+                )
+                self.status.failed(error)
+                self.ack(entity_request, Either(left=error))
+
+    def _write_single_create_request(self, entity_request: BaseModel) -> None:
+        """PUT the request on its own, updating the status"""
+        log = get_log_name(entity_request)
+        try:
+            result = self.write_create_request(entity_request)
+        except Exception as exc:
+            result = Either(
+                left=StackTraceError(
+                    name=log,
+                    error=f"Failed to ingest {log}: {exc}",
+                    stackTrace=traceback.format_exc(),
+                )
+            )
+
+        if result.left is not None:
+            self.status.failed(result.left)
+        elif result.right is not None:
+            self.status.scanned(result.right)
+        self.ack(entity_request, result)
+
     @_run_dispatch.register
     def patch_entity(self, record: PatchRequest) -> Either[Entity]:
         """
@@ -663,5 +807,7 @@ class MetadataRestSink(Sink):  # pylint: disable=too-many-public-methods
 
     def close(self):
         """
-        We don't have anything to close since we are using the given metadata client
+        We don't have anything to close since we are using the given metadata client,
+        but we make sure no buffered request is left behind
         """
+        self.flush()
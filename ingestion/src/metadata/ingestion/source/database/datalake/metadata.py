@@ -419,9 +419,11 @@ class DatalakeSource(DatabaseServiceSource):
                 ),
                 fetch_raw_data=True,
             )
-            if data_frame:
+            # We only need the first chunk to parse the columns
+            data_frame = next(iter(data_frame), None) if data_frame else None
+            if data_frame is not None:
                 column_parser = DataFrameColumnParser.create(
-                    data_frame[0], table_extension, raw_data=raw_data
+                    data_frame, table_extension, raw_data=raw_data
                 )
                 columns = column_parser.get_columns()
             else:
@@ -22,7 +22,9 @@ from metadata.generated.schema.type.basic import FullyQualifiedEntityName, SqlQu
 from metadata.generated.schema.type.tableQuery import TableQuery
 from metadata.ingestion.api.models import Either
 from metadata.ingestion.lineage.models import ConnectionTypeDialectMapper
+from metadata.ingestion.lineage.parser_cache import get_lineage_parser_cache
 from metadata.ingestion.lineage.sql_lineage import get_lineage_by_query
+from metadata.ingestion.lineage.table_index import load_table_index
 from metadata.ingestion.source.database.query_parser_source import QueryParserSource
 from metadata.utils import fqn
 from metadata.utils.logger import ingestion_logger
@@ -124,6 +126,11 @@ class LineageSource(QueryParserSource, ABC):
         """
         connection_type = str(self.service_connection.type.value)
         dialect = ConnectionTypeDialectMapper.dialect_of(connection_type)
+        table_index = (
+            load_table_index(self.metadata, self.config.serviceName)
+            if getattr(self.source_config, "preloadTableIndex", True)
+            else None
+        )
         for table_query in self.get_table_query():
             if not self._query_already_processed(table_query):
                 lineages: Iterable[Either[AddLineageRequest]] = get_lineage_by_query(
@@ -152,3 +159,6 @@ class LineageSource(QueryParserSource, ABC):
                                 ),
                             )
                         )
+        get_lineage_parser_cache().report(self.status)
+        if table_index:
+            table_index.report(self.status)
@@ -0,0 +1,110 @@
+#  Copyright 2021 Collate
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""
+Batched summarization of the documents of the unstructured containers.
+
+The object workers only extract the metadata and the text of the documents.
+The containers wait here until we have a full batch, which is summarized
+at once, and are then released with their `Summary` RDF.
+"""
+import traceback
+from typing import Any, Iterable, List, Optional, Tuple
+
+from metadata.generated.schema.entity.data.container import Rdf
+from metadata.ingestion.api.status import Status
+from metadata.ingestion.source.storage.storage_service import SUMMARY_RDF_NAME
+from metadata.ml.summarization import Summarization
+from metadata.utils.logger import ingestion_logger
+from metadata.utils.word.document_cache import DocumentCache, text_key
+
+logger = ingestion_logger()
+
+
+class DocumentSummaryStage:
+    """
+    Containers waiting for the summary of their document, in arrival order.
+    Each container must have a `rdfs` list and the text in `summary_text`.
+    Anything passed as `context` is given back with its container.
+    """
+
+    def __init__(
+        self,
+        summarizer: Summarization,
+        batch_size: int,
+        status: Status,
+        cache: Optional[DocumentCache] = None,
+    ):
+        self.summarizer = summarizer
+        self.batch_size = batch_size
+        self.status = status
+        # Summaries of the texts we already summarized, in this run or a previous one
+        self.cache = cache
+        self._pending: List[Tuple[Any, Any]] = []
+
+    def add(self, container: Any, context: Any = None) -> None:
+        self._pending.append((container, context))
+
+    def is_full(self) -> bool:
+        return len(self._pending) >= self.batch_size
+
+    def flush(self) -> Iterable[Tuple[Any, Any]]:
+        """
+        Summarize the pending documents and give back their containers.
+        If the summarization fails, the containers are given back without summary.
+        """
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+
+        texts = [container.summary_text for container, _ in pending]
+        summaries: List[Optional[str]] = [None] * len(texts)
+        missing = []
+        for index, text in enumerate(texts):
+            entry = self.cache.get(text_key(text)) if self.cache else None
+            if entry and "summary" in entry:
+                summaries[index] = entry["summary"]
+            else:
+                missing.append(index)
+
+        if missing:
+            try:
+                results = self.summarizer.summarize_many([texts[index] for index in missing])
+                for index, summary in zip(missing, results):
+                    summaries[index] = summary
+                    if self.cache:
+                        self.cache.update(text_key(texts[index]), summary=summary)
+            except Exception as exc:
+                logger.debug(traceback.format_exc())
+                logger.warning(f"Could not summarize {len(missing)} documents: {exc}")
+                self.status.warning("summarization", f"{len(missing)} documents: {exc}")
+
+        for (container, context), summary in zip(pending, summaries):
+            if summary:
+                container.rdfs = (container.rdfs or []) + [
+                    Rdf(name=SUMMARY_RDF_NAME, object=summary)
+                ]
+            container.summary_text = None
+            yield container, context
+
+        self._update_metrics()
+
+    def _update_metrics(self) -> None:
+        seconds = self.summarizer.seconds
+        self.status.metric("Summarized documents", self.summarizer.documents)
+        self.status.metric("Summarization seconds", round(seconds, 2))
+        if seconds > 0:
+            self.status.metric(
+                "Summarization docs/sec", round(self.summarizer.documents / seconds, 2)
+            )
+            self.status.metric(
+                "Summarization tokens/sec",
+                round(self.summarizer.input_tokens / seconds, 2),
+            )
@@ -0,0 +1,168 @@
+#  Copyright 2021 Collate
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""
+State of the incremental storage ingestion.
+
+We keep, for every ingested object, its ETag and last modified time
+along with the FQN of its container. In the next run, unchanged objects
+are skipped, and the objects that are no longer listed give us the
+containers to delete without listing every container of the service.
+"""
+import json
+import os
+import threading
+import traceback
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+from metadata.utils.logger import ingestion_logger
+
+logger = ingestion_logger()
+
+
+class IncrementalState:
+    """
+    Object versions by `bucket/key`, loaded from and saved to a JSON file
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.previous: Dict[str, dict] = {}
+        self.current: Dict[str, dict] = {}
+        # Whether we had a state to compare with
+        self.loaded = False
+        self._listed_keys: Set[str] = set()
+        self._listed_buckets: Set[str] = set()
+        # All the buckets of the service, when we could list them
+        self._existing_buckets: Optional[Set[str]] = None
+        # Containers the sink could not write: their objects are retried next run
+        self._failed_fqns: Set[str] = set()
+        self._lock = threading.Lock()
+
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as file:
+                    self.previous = json.load(file)
+                self.loaded = True
+            except (OSError, ValueError) as exc:
+                logger.debug(traceback.format_exc())
+                logger.warning(
+                    f"Ignoring the incremental state file [{path}], running a full ingestion: {exc}"
+                )
+
+    @staticmethod
+    def _key(bucket_name: str, key: str) -> str:
+        return f"{bucket_name}/{key}"
+
+    @staticmethod
+    def _version(etag: Optional[str], last_modified: Optional[datetime]) -> dict:
+        return {
+            "etag": etag,
+            "lastModified": last_modified.isoformat() if last_modified else None,
+        }
+
+    def list_bucket(self, bucket_name: str) -> None:
+        """Flag the bucket as fully listed in this run"""
+        self._listed_buckets.add(bucket_name)
+
+    def set_existing_buckets(self, bucket_names: Iterable[str]) -> None:
+        """Every bucket of the service, filtered or not"""
+        self._existing_buckets = set(bucket_names)
+
+    def _is_listed(self, state_key: str) -> bool:
+        """Whether the bucket of the entry was fully listed or is gone"""
+        bucket_name = state_key.split("/", 1)[0]
+        return bucket_name in self._listed_buckets or (
+            self._existing_buckets is not None
+            and bucket_name not in self._existing_buckets
+        )
+
+    def list_object(self, bucket_name: str, key: str) -> None:
+        """Flag the object as listed in this run"""
+        self._listed_keys.add(self._key(bucket_name, key))
+
+    def get_unchanged_fqn(
+        self,
+        bucket_name: str,
+        key: str,
+        etag: Optional[str],
+        last_modified: Optional[datetime],
+    ) -> Optional[str]:
+        """
+        Container FQN of the object if it did not change since the last run.
+        The object is then carried over to the new state.
+        """
+        state_key = self._key(bucket_name, key)
+        entry = self.previous.get(state_key)
+        if not entry or (etag is None and last_modified is None):
+            return None
+        if {k: entry.get(k) for k in ("etag", "lastModified")} != self._version(
+            etag, last_modified
+        ):
+            return None
+        with self._lock:
+            self.current[state_key] = entry
+        return entry["fqn"]
+
+    def record(
+        self,
+        bucket_name: str,
+        key: str,
+        etag: Optional[str],
+        last_modified: Optional[datetime],
+        container_fqn: str,
+    ) -> None:
+        """Store the version of an ingested object"""
+        with self._lock:
+            self.current[self._key(bucket_name, key)] = {
+                **self._version(etag, last_modified),
+                "fqn": container_fqn,
+            }
+
+    def discard(self, container_fqn: str) -> None:
+        """
+        Do not keep the object of a container the sink failed to write,
+        whether its result comes before or after the object is recorded
+        """
+        with self._lock:
+            self._failed_fqns.add(container_fqn)
+
+    def get_deleted_fqns(self) -> List[str]:
+        """
+        Containers of the objects ingested in the last run that are
+        gone, from the fully listed buckets and the removed ones
+        """
+        return [
+            entry["fqn"]
+            for state_key, entry in self.previous.items()
+            if self._is_listed(state_key) and state_key not in self._listed_keys
+        ]
+
+    def save(self) -> None:
+        """
+        Write the new state. We keep the previous entries of the buckets
+        that were not listed in this run, or whose listing failed.
+        """
+        state = {
+            state_key: entry
+            for state_key, entry in self.previous.items()
+            if not self._is_listed(state_key)
+        }
+        state.update(
+            (state_key, entry)
+            for state_key, entry in self.current.items()
+            if entry["fqn"] not in self._failed_fqns
+        )
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump(state, file)
@@ -13,7 +13,7 @@ import os
 import traceback
 import urllib.parse
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from metadata.generated.schema.type.tagLabel import TagLabel, LabelType, State, TagSource, TagFQN
 
@@ -21,6 +21,7 @@ from metadata.generated.schema.entity.classification.tag import Tag
 from pydantic import ValidationError
 
 from metadata.generated.schema.api.data.createContainer import CreateContainerRequest
+from metadata.generated.schema.entity.data.table import Column
 from metadata.generated.schema.entity.data.container import (
     Container,
     FileFormat,
@@ -43,28 +44,45 @@ from metadata.generated.schema.type.entityReference import EntityReference
 from metadata.ingestion.api.models import Either
 from metadata.ingestion.api.steps import InvalidSourceException
 from metadata.ingestion.ometa.ometa_api import OpenMetadata
+from metadata.ingestion.source.storage.document_summary import DocumentSummaryStage
 from metadata.ingestion.source.storage.minio.models import (
     MinioBucketResponse,
     MinioContainerDetails,
+    MinioObjectInfo,
 )
+from metadata.ingestion.source.storage.minio.prefix_tree import PrefixTree
 from metadata.ingestion.source.storage.storage_service import (
     KEY_SEPARATOR,
     Metric,
     StorageServiceSource,
 )
+from metadata.ml.summarization import Summarization
 from metadata.readers.dataframe.dsv import (
     CSV_SEPARATOR,
     TSV_SEPARATOR
 )
+from metadata.readers.dataframe.reader_factory import SupportedTypes
+from metadata.readers.dataframe.schema import (
+    DEFAULT_SCHEMA_SAMPLE_SIZE,
+    ObjectSchemaReader,
+    SchemaCache,
+)
+from metadata.readers.models import ConfigSource
 from metadata.utils import fqn
 from metadata.utils.filters import filter_by_container, filter_by_bucket
 from metadata.utils.logger import ingestion_logger
 from metadata.utils.s3_utils import list_s3_objects
+from metadata.utils.word.document_cache import get_document_cache
 
 logger = ingestion_logger()
 
 S3_CLIENT_ROOT_RESPONSE = "Contents"
 
+STRUCTURED_FORMATS = [
+    FileFormat.csv.value, FileFormat.tsv.value, FileFormat.xls.value, FileFormat.xlsx.value, FileFormat.parquet.value
+]
+UNSTRUCTURED_FORMATS = [FileFormat.doc.value, FileFormat.docx.value, FileFormat.hwp.value, FileFormat.hwpx.value]
+
 
 def get_file_format(file_name: str) -> (str, str):
     """
@@ -93,6 +111,33 @@ class MinioSource(StorageServiceSource):
         # self._bucket_cache: Dict[str, Container] = {}
         self._dir_cache: Dict[str, List[str]] = {}
         self._metadata_cache: Dict[str, MetadataEntry] = {}
+        # Listing info (ETag, Size, ...) of the objects of the current bucket
+        self._object_cache: Dict[str, MinioObjectInfo] = {}
+        # Directories of the current bucket, with their objects and stats
+        self._prefix_tree = PrefixTree()
+
+        sample_size = getattr(self.source_config, "schemaSampleSize", None)
+        self.schema_reader = ObjectSchemaReader(
+            client=self.minio_client,
+            sample_size=(
+                DEFAULT_SCHEMA_SAMPLE_SIZE if sample_size is None else sample_size
+            ),
+            cache=SchemaCache(getattr(self.source_config, "schemaCachePath", None)),
+        )
+
+        # With summaryBatchSize > 1, the documents are summarized in batches
+        # on the main thread instead of one by one in the object workers
+        summary_batch_size = getattr(self.source_config, "summaryBatchSize", None) or 1
+        self.summary_stage: Optional[DocumentSummaryStage] = (
+            DocumentSummaryStage(
+                summarizer=Summarization(max_batch_size=summary_batch_size),
+                batch_size=summary_batch_size,
+                status=self.status,
+                cache=get_document_cache(),
+            )
+            if summary_batch_size > 1
+            else None
+        )
 
     @classmethod
     def create(
@@ -131,7 +176,13 @@ class MinioSource(StorageServiceSource):
                     for bucket_name in self.service_connection.bucketNames
                 ]
             # No pagination required, as there is a hard 1000 limit on nr of buckets per account
-            for bucket in self.minio_client.list_buckets().get("Buckets") or []:
+            buckets = self.minio_client.list_buckets().get("Buckets") or []
+            if self.incremental_state:
+                # The objects of the removed buckets are deleted as well
+                self.incremental_state.set_existing_buckets(
+                    bucket["Name"] for bucket in buckets
+                )
+            for bucket in buckets:
                 # if there is a filter pattern(in metadata ingestion setting), check if the bucket name matches it
                 if filter_by_bucket(self.source_config.bucketFilterPattern, bucket["Name"]):
                     self.status.filter(bucket["Name"], "Bucket Filtered Out")
@@ -147,6 +198,8 @@ class MinioSource(StorageServiceSource):
     ) -> MinioContainerDetails:
 
         self._metadata_cache.clear()
+        self._object_cache.clear()
+        self._prefix_tree = PrefixTree()
         self._dir_cache.clear()
         total_count, total_size = self._set_bucket_obj_info(bucket_name=bucket_response.name)
 
@@ -170,6 +223,10 @@ class MinioSource(StorageServiceSource):
                 total_count += 1
                 decoded_key = urllib.parse.unquote_plus(obj['Key'])
                 total_size += obj['Size']
+                self._object_cache[decoded_key] = MinioObjectInfo.from_response(obj)
+                self._prefix_tree.add(decoded_key, obj['Size'])
+                if self.incremental_state:
+                    self.incremental_state.list_object(bucket_name, decoded_key)
                 file_format, separator = get_file_format(decoded_key)
                 self._metadata_cache[decoded_key] = MetadataEntry(
                     dataPath=f"{decoded_key}",
@@ -179,42 +236,35 @@ class MinioSource(StorageServiceSource):
                 )
                 logger.debug(
                     f"key : {decoded_key}, format : {file_format}, size : {obj['Size']}")
+            # Only a complete listing tells which objects are gone
+            if self.incremental_state:
+                self.incremental_state.list_bucket(bucket_name)
         except Exception as exc:
             logger.debug(traceback.format_exc())
             logger.error(f"Unable to list objects in bucket: {bucket_name} - {exc}")
         return total_count, total_size
 
     def get_directories(self):
-        directory = []
         bucket_container = self.get_bucket_entity()
         bucket_name = bucket_container.name.__root__
 
         service = self.context.get().objectstore_service
         self._dir_cache[bucket_name] = [service, bucket_name]
-        for file_name, entity in self._metadata_cache.items():
-            # 촤상위 디렉토리에 대한 처리
-            if '/' not in file_name:
-                if '/' not in directory:
-                    directory.append('/')
-                    self._dir_cache[bucket_name].append('/')
-                    yield self._generate_directory_container(bucket_name, ['/'], bucket_container)
-                    self._dir_cache[bucket_name].remove('/')
-            else:
-                dir_path = os.path.dirname(file_name)
-                path_parts = dir_path.split('/')
-                # 디렉토리 -> 디렉토리 -> 컨테이너 구조를 처리하기 위해 '/' 를 구분자로 부모 자식 관계를 만들고,
-                # 최하위 노드(컨테이너)를 처리할 수 있도록 구조 변경
-                for i in range(1, len(path_parts) + 1):
-                    prefix = '/'.join(path_parts[:i])
-                    if prefix not in directory:
-                        directory.append(prefix)
-                        parent_entity = self.get_parent_entity(path_parts[:i - 1])
-                        # 디렉토리 하위의 컨테이너에서 FQN 생성을 위해 상위 개체 정보를 저장한다.
-                        self._dir_cache[bucket_name].extend(path_parts[:i])
-                        yield self._generate_directory_container(bucket_name, path_parts[:i], parent_entity)
-                        # 다른 디렉토리를 위해 현재 디렉토리 정보를 삭제한다.
-                        self._dir_cache[bucket_name] = [item for item in self._dir_cache[bucket_name] if
-                                                        item not in path_parts[:i]]
+        # 촤상위 디렉토리에 대한 처리
+        if self._prefix_tree.root.files:
+            self._dir_cache[bucket_name].append('/')
+            yield self._generate_directory_container(bucket_name, ['/'], bucket_container)
+            self._dir_cache[bucket_name].remove('/')
+
+        # 디렉토리 -> 디렉토리 -> 컨테이너 구조를 처리하기 위해 부모 디렉토리를 자식보다 먼저 생성한다.
+        for node in self._prefix_tree.directories():
+            path_parts = node.parts
+            parent_entity = self.get_parent_entity(path_parts[:-1])
+            # 디렉토리 하위의 컨테이너에서 FQN 생성을 위해 상위 개체 정보를 저장한다.
+            self._dir_cache[bucket_name].extend(path_parts)
+            yield self._generate_directory_container(bucket_name, path_parts, parent_entity)
+            # 다른 디렉토리를 위해 현재 디렉토리 정보를 삭제한다.
+            self._dir_cache[bucket_name] = [service, bucket_name]
 
     def get_bucket_entity(self) -> Container:
         container_fqn = fqn._build(  # pylint: disable=protected-access
@@ -275,26 +325,12 @@ class MinioSource(StorageServiceSource):
             return dir_container
 
     def get_directory_info(self, bucket_name: str, dir_path: str):
-        total_count = 0
-        total_size = 0
-        try:
-            dir_path_parts = dir_path.split('/')
-            for entry in self._metadata_cache.values():
-                entry_dir_path_parts = os.path.dirname(entry.dataPath).split('/')
-                include_entry = True
-                for i in range(0, len(dir_path_parts)):
-                    if i >= len(entry_dir_path_parts):
-                        break
-                    if entry_dir_path_parts[i] != dir_path_parts[i]:
-                        include_entry = False
-                        break
-                if include_entry:
-                    total_count += 1
-                    total_size += entry.contentSize
-        except Exception as exc:
-            logger.debug(traceback.format_exc())
-            logger.error(f"Unable to list objects in bucket: {bucket_name} - {exc}")
-        return total_count, total_size
+        """Number of objects and total size under the directory"""
+        node = self._prefix_tree.get(dir_path)
+        if node is None:
+            logger.warning(f"Directory {dir_path} not found in bucket: {bucket_name}")
+            return 0, 0
+        return node.count, node.size
 
     def yield_create_directory_requests(self, container_details: MinioContainerDetails) -> (
             Iterable)[Either[CreateContainerRequest]]:
@@ -336,16 +372,88 @@ class MinioSource(StorageServiceSource):
                 error=f"Validation error while get parent Container from bucket/directory - {service}/{bucket}/{directory}",
             ))
 
-        for abs_file_name, metadata_entry in self._metadata_cache.items():
+        parent = EntityReference(id=parent_container.id, type="container",
+                                 fullyQualifiedName=parent_container_fqn)
+        # 다운로드와 메타데이터 추출은 objectThreads 개의 스레드에서 처리하고, 결과는 파일 순서대로 반환한다.
+        for (metadata_entry, container_fqn), result in self.run_object_workers(
+                self._get_directory_entries(parent_container_fqn),
+                lambda item: self._generate_object_container(bucket, item[0], parent),
+        ):
+            file_name = Path(metadata_entry.dataPath).name
             try:
-                if directory is None:
-                    if '/' in abs_file_name:
-                        continue
+                container: Optional[MinioContainerDetails] = result.result()
+                if container and container.summary_text and self.summary_stage:
+                    self.summary_stage.add(container, (metadata_entry, container_fqn))
+                    if self.summary_stage.is_full():
+                        yield from self._flush_summary_stage(bucket)
+                elif container:
+                    yield from self._yield_container(bucket, container, metadata_entry, container_fqn)
+                elif metadata_entry.structureFormat in STRUCTURED_FORMATS:
+                    logger.warn(f"Failed To Generated Structured Container Metadata: {file_name}")
+                    self.status.warnings.append(f"failed to generate structured container metadata: {file_name}")
                 else:
-                    directory = '/'.join(self._dir_cache[bucket][2:])
-                    if directory not in abs_file_name or directory != os.path.dirname(abs_file_name):
-                        continue
+                    logger.warn(f"Failed To Generated Unstructured Container Metadata: {file_name}")
+                    self.status.warnings.append(f"failed to generate unstructured container metadata: {file_name}")
+            except ValidationError as err:
+                self.status.failed(
+                    StackTraceError(
+                        name=bucket,
+                        error=f"Validation error while creating Container from bucket details - {err}",
+                        stackTrace=traceback.format_exc(),
+                    )
+                )
+            except Exception as err:
+                self.status.failed(
+                    StackTraceError(
+                        name=bucket,
+                        error=f"Wild error while creating Container from bucket details - {err}",
+                        stackTrace=traceback.format_exc(),
+                    )
+                )
+
+        # The documents of the directory still waiting for a full batch
+        if self.summary_stage:
+            yield from self._flush_summary_stage(bucket)
+
+    def _yield_container(
+            self,
+            bucket_name: str,
+            container: MinioContainerDetails,
+            metadata_entry: MetadataEntry,
+            container_fqn: str,
+    ) -> Iterable[MinioContainerDetails]:
+        """Send the container and record the object in the incremental state"""
+        yield container
+        if self.incremental_state:
+            obj = self._object_cache.get(metadata_entry.dataPath)
+            self.incremental_state.record(
+                bucket_name=bucket_name,
+                key=metadata_entry.dataPath,
+                etag=obj.etag if obj else None,
+                last_modified=obj.last_modified if obj else None,
+                container_fqn=container_fqn,
+            )
+
+    def _flush_summary_stage(self, bucket_name: str) -> Iterable[MinioContainerDetails]:
+        """Summarize the pending documents and send their containers"""
+        for container, (metadata_entry, container_fqn) in self.summary_stage.flush():
+            yield from self._yield_container(bucket_name, container, metadata_entry, container_fqn)
+
+    def _get_directory_entries(self, parent_container_fqn: str) -> Iterable[Tuple[MetadataEntry, str]]:
+        """
+        Supported objects directly under the current directory that pass the container filter,
+        with the FQN of their container. In incremental mode, we skip the unchanged objects.
+        """
+        service = self.context.get().objectstore_service
+        bucket = self.context.get().bucket
+        if self.context.get().directory is None:
+            directory_node = self._prefix_tree.root
+        else:
+            directory_node = self._prefix_tree.get('/'.join(self._dir_cache[bucket][2:]))
 
+        for abs_file_name in directory_node.files if directory_node else []:
+            metadata_entry = self._metadata_cache[abs_file_name]
+            try:
                 # file_name 은 Path/File 형태이다. 순수한 file_name을 가져온다.
                 file_name = Path(abs_file_name).name
 
@@ -366,51 +474,15 @@ class MinioSource(StorageServiceSource):
                     self.status.filter(abs_file_name, "Container Name pattern not allowed")
                     continue
 
-                if (metadata_entry.structureFormat in
-                        [FileFormat.csv.value, FileFormat.tsv.value, FileFormat.xls.value, FileFormat.xlsx.value]):
-                    logger.info(f"Structured Data Metadata Ingestion From : {file_name}")
-                    structured_container: Optional[MinioContainerDetails] = (
-                        self._generate_container_details(
-                            bucket_name=bucket,
-                            metadata_entry=metadata_entry,
-                            parent=EntityReference(id=parent_container.id, type="container",
-                                                   fullyQualifiedName=parent_container_fqn),
-                        ))
-                    # if structured_container:
-                    #     for col in structured_container.data_model.columns:
-                    #         logger.debug(f"Column: {col.name.__root__}")
-                    if structured_container:
-                        yield structured_container
-                    else:
-                        logger.warn(f"Failed To Generated Structured Container Metadata: {file_name}")
-                        self.status.warnings.append(f"failed to generate structured container metadata: {file_name}")
-                elif metadata_entry.structureFormat in [FileFormat.doc.value, FileFormat.docx.value,
-                                                        FileFormat.hwp.value, FileFormat.hwpx.value]:
-                    logger.info(f"Unstructured Data Metadata Ingestion From : {file_name}")
-                    unstructured_container: Optional[MinioContainerDetails] = (
-                        self._generate_unstructured_container_details(
-                            bucket_name=bucket,
-                            metadata_entry=metadata_entry,
-                            parent=EntityReference(id=parent_container.id, type="container",
-                                                   fullyQualifiedName=parent_container_fqn),
-                        ))
-                    if unstructured_container:
-                        yield unstructured_container
-                    else:
-                        logger.warn(f"Failed To Generated Unstructured Container Metadata: {file_name}")
-                        self.status.warnings.append(f"failed to generate unstructured container metadata: {file_name}")
+                if metadata_entry.structureFormat in STRUCTURED_FORMATS + UNSTRUCTURED_FORMATS:
+                    entity_fqn = fqn.FQN_SEPARATOR.join([parent_container_fqn, fqn.quote_name(file_name)])
+                    if self._is_unchanged(bucket, abs_file_name):
+                        logger.debug(f"Skipping {abs_file_name}: unchanged since the last run")
+                        continue
+                    yield metadata_entry, entity_fqn
                 else:
                     logger.debug(f"Unsupported format {metadata_entry.structureFormat}")
                     # self.status.filter(abs_file_name, f"Unsupported format {metadata_entry.structureFormat}")
-
-            except ValidationError as err:
-                self.status.failed(
-                    StackTraceError(
-                        name=bucket,
-                        error=f"Validation error while creating Container from bucket details - {err}",
-                        stackTrace=traceback.format_exc(),
-                    )
-                )
             except Exception as err:
                 self.status.failed(
                     StackTraceError(
@@ -420,6 +492,37 @@ class MinioSource(StorageServiceSource):
                     )
                 )
 
+    def _is_unchanged(self, bucket_name: str, key: str) -> bool:
+        if not self.incremental_state:
+            return False
+        obj = self._object_cache.get(key)
+        return obj is not None and self.incremental_state.get_unchanged_fqn(
+            bucket_name, key, obj.etag, obj.last_modified
+        ) is not None
+
+    def _generate_object_container(
+            self, bucket_name: str, metadata_entry: MetadataEntry, parent: EntityReference
+    ) -> Optional[MinioContainerDetails]:
+        """
+        Per-object work: read the schema of the structured objects or the
+        metadata of the documents. It runs in the object workers.
+        """
+        file_name = Path(metadata_entry.dataPath).name
+        if metadata_entry.structureFormat in STRUCTURED_FORMATS:
+            logger.info(f"Structured Data Metadata Ingestion From : {file_name}")
+            return self._generate_container_details(
+                bucket_name=bucket_name,
+                metadata_entry=metadata_entry,
+                parent=parent,
+            )
+        logger.info(f"Unstructured Data Metadata Ingestion From : {file_name}")
+        return self._generate_unstructured_container_details(
+            bucket_name=bucket_name,
+            metadata_entry=metadata_entry,
+            parent=parent,
+            summarize=self.summary_stage is None,
+        )
+
     def get_parent_container_fqn(self) -> str:
         service = self.context.get().objectstore_service
         bucket = self.context.get().bucket
@@ -681,15 +784,20 @@ class MinioSource(StorageServiceSource):
             bucket_name: str,
             metadata_entry: MetadataEntry,
             parent: Optional[EntityReference] = None,
+            summarize: bool = True,
     ) -> Optional[MinioContainerDetails]:
 
-        rdfs = self._get_document_meta(
+        obj = self._object_cache.get(metadata_entry.dataPath)
+        document = self._get_document_meta(
             bucket_name=bucket_name,
             path=metadata_entry.dataPath.strip(KEY_SEPARATOR),
             metadata_entry=metadata_entry,
             client=self.minio_client,
+            summarize=summarize,
+            size=obj.size if obj else None,
+            etag=obj.etag if obj else None,
         )
-        if rdfs:
+        if document and (document.rdfs or document.text):
             prefix = (
                 f"{KEY_SEPARATOR}{metadata_entry.dataPath.strip(KEY_SEPARATOR)}"
             )
@@ -706,7 +814,8 @@ class MinioSource(StorageServiceSource):
                 ),
                 file_formats=[FileFormat(metadata_entry.structureFormat)],
                 data_model=None,
-                rdfs=rdfs,
+                rdfs=document.rdfs,
+                summary_text=document.text,
                 parent=parent,
                 fullPath=self._get_full_path(bucket_name, prefix),
                 sourceUrl=self._get_object_source_url(
@@ -716,16 +825,72 @@ class MinioSource(StorageServiceSource):
             )
         return None
 
+    def _get_columns(
+            self,
+            bucket_name: str,
+            sample_key: str,
+            metadata_entry: MetadataEntry,
+            config_source: ConfigSource,
+            client,
+    ) -> Optional[List[Column]]:
+        """
+        Infer the columns reading only the bytes we need (parquet footer, CSV head,...)
+        and fall back to reading the whole object if that is not possible
+        """
+        obj = self._object_cache.get(metadata_entry.dataPath)
+        try:
+            columns = self.schema_reader.read_columns(
+                bucket_name=bucket_name,
+                key=sample_key,
+                file_format=SupportedTypes(metadata_entry.structureFormat),
+                separator=metadata_entry.separator,
+                size=obj.size if obj else None,
+                etag=obj.etag if obj else None,
+            )
+            if columns is not None:
+                return (metadata_entry.partitionColumns or []) + columns
+        except Exception as exc:
+            logger.debug(traceback.format_exc())
+            logger.warning(
+                f"Could not infer the schema of s3://{bucket_name}/{sample_key} with range reads,"
+                f" reading the whole object - {exc}"
+            )
+        return super()._get_columns(
+            bucket_name=bucket_name,
+            sample_key=sample_key,
+            metadata_entry=metadata_entry,
+            config_source=config_source,
+            client=client,
+        )
+
+    def close(self):
+        self.schema_reader.cache.save()
+        super().close()
+
+    def _get_object_info(self, bucket_name: str, key: str) -> MinioObjectInfo:
+        """
+        Object info from the bucket listing. We only send a HEAD request
+        if the object was not listed or its listing misses some field.
+        """
+        obj = self._object_cache.get(key)
+        if obj is None or not obj.is_complete():
+            res = self.minio_client.head_object(
+                Bucket=bucket_name, Key=urllib.parse.unquote_plus(key)
+            )
+            obj = MinioObjectInfo.from_response(res)
+            self._object_cache[key] = obj
+        return obj
+
     def _fetch_metric(self, bucket_name: str, key: str, metric: Metric):
+        if metric == Metric.NUMBER_OF_OBJECTS:
+            # A file container is always a single object
+            return float(1)
         try:
-            key = urllib.parse.unquote_plus(key)
-            res = self.minio_client.head_object(Bucket=bucket_name, Key=key)
+            obj = self._get_object_info(bucket_name=bucket_name, key=key)
             if metric == Metric.BUCKET_SIZE_BYTES:
-                return float(res['ContentLength'])
-            elif metric == Metric.NUMBER_OF_OBJECTS:
-                return float(1)
+                return float(obj.size)
             elif metric == Metric.LAST_MODIFIED:
-                return str(res['LastModified'].isoformat())
+                return str(obj.last_modified.isoformat())
         except Exception as err:
             logger.debug(traceback.format_exc())
             logger.warning(
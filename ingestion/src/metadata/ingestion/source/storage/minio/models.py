@@ -12,7 +12,7 @@
 Minio custom pydantic models
 """
 from datetime import datetime
-from typing import List, Optional
+from typing import List, NamedTuple, Optional
 
 from pydantic import BaseModel, Extra, Field
 
@@ -40,6 +40,31 @@ class MinioBucketResponse(BaseModel):
     )
 
 
+class MinioObjectInfo(NamedTuple):
+    """
+    Compact record of the object info returned by the bucket listing,
+    kept for every object so we don't need a HEAD request per container
+    """
+
+    size: Optional[int]
+    last_modified: Optional[datetime]
+    etag: Optional[str]
+    storage_class: Optional[str]
+
+    @classmethod
+    def from_response(cls, response: dict) -> "MinioObjectInfo":
+        """Build it from a ListObjectsV2 entry or a HeadObject response"""
+        return cls(
+            size=response.get("Size", response.get("ContentLength")),
+            last_modified=response.get("LastModified"),
+            etag=response.get("ETag"),
+            storage_class=response.get("StorageClass"),
+        )
+
+    def is_complete(self) -> bool:
+        return self.size is not None and self.last_modified is not None
+
+
 class MinioContainerDetails(BaseModel):
     """
     Class mapping container details used to create the container requests
@@ -85,6 +110,10 @@ class MinioContainerDetails(BaseModel):
         None,
         description="RDFs",
     )
+    summary_text: Optional[str] = Field(
+        None,
+        description="Text of the document waiting to be summarized in batch",
+    )
 
 
 class StructuredDataDetails(BaseModel):
@@ -0,0 +1,93 @@
+#  Copyright 2021 Collate
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""
+Prefix tree of the object keys of a bucket.
+
+It is built once while listing the bucket and holds, for every directory,
+the objects directly under it and the aggregated count and size of all
+the objects below it, so we don't need to scan every key per directory.
+"""
+from typing import Dict, Iterator, List, Optional
+
+PATH_SEPARATOR = "/"
+
+
+class PrefixTreeNode:
+    """A directory of the bucket"""
+
+    __slots__ = ("name", "path", "parent", "children", "files", "count", "size")
+
+    def __init__(
+        self, name: str, path: str, parent: Optional["PrefixTreeNode"] = None
+    ):
+        self.name = name
+        self.path = path
+        self.parent = parent
+        self.children: Dict[str, "PrefixTreeNode"] = {}
+        # Keys of the objects directly under this directory
+        self.files: List[str] = []
+        # Objects and bytes of the whole subtree
+        self.count = 0
+        self.size = 0
+
+    @property
+    def parts(self) -> List[str]:
+        return self.path.split(PATH_SEPARATOR) if self.path else []
+
+
+class PrefixTree:
+    """
+    Directories of a bucket indexed by their path. The root node
+    (path "") holds the objects that are not under any directory.
+    """
+
+    def __init__(self):
+        self.root = PrefixTreeNode(name="", path="")
+        self._nodes: Dict[str, PrefixTreeNode] = {"": self.root}
+
+    def __len__(self) -> int:
+        """Number of directories"""
+        return len(self._nodes) - 1
+
+    def add(self, key: str, size: int = 0) -> None:
+        """Add an object, creating its directories if needed"""
+        dir_path, _, _ = key.rpartition(PATH_SEPARATOR)
+        node = self._get_or_create(dir_path)
+        node.files.append(key)
+        while node is not None:
+            node.count += 1
+            node.size += size
+            node = node.parent
+
+    def _get_or_create(self, dir_path: str) -> PrefixTreeNode:
+        node = self._nodes.get(dir_path)
+        if node is None:
+            parent_path, _, name = dir_path.rpartition(PATH_SEPARATOR)
+            parent = self._get_or_create(parent_path)
+            node = PrefixTreeNode(name=name, path=dir_path, parent=parent)
+            parent.children[name] = node
+            self._nodes[dir_path] = node
+        return node
+
+    def get(self, dir_path: str) -> Optional[PrefixTreeNode]:
+        """Directory of the given path, e.g., `a/b`"""
+        return self._nodes.get(dir_path.strip(PATH_SEPARATOR))
+
+    def directories(self) -> Iterator[PrefixTreeNode]:
+        """
+        Every directory, parents before their children,
+        in the order they were first listed
+        """
+        stack = list(reversed(self.root.children.values()))
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children.values()))
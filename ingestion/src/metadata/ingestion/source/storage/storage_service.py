@@ -11,12 +11,25 @@
 """
 Base class for ingesting Object Storage services
 """
-import os
-import uuid
+import traceback
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from enum import Enum
-from typing import Any, Iterable, List, Optional, Set
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Deque,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
 from metadata.generated.schema.api.data.createContainer import CreateContainerRequest
 from metadata.generated.schema.entity.data.container import Container, Rdf
@@ -37,11 +50,15 @@ from metadata.generated.schema.metadataIngestion.storageServiceMetadataPipeline
 from metadata.generated.schema.metadataIngestion.workflow import (
     Source as WorkflowSource,
 )
-from metadata.ingestion.api.delete import delete_entity_from_source
+from metadata.ingestion.api.delete import (
+    delete_entity_by_name,
+    delete_entity_from_source,
+)
 from metadata.ingestion.api.models import Either
 from metadata.ingestion.api.steps import Source
 from metadata.ingestion.api.topology_runner import TopologyRunnerMixin
 from metadata.ingestion.models.delete_entity import DeleteEntity
+from metadata.ingestion.models.patch_request import PatchRequest
 from metadata.ingestion.models.topology import (
     NodeStage,
     ServiceTopology,
@@ -50,22 +67,29 @@ from metadata.ingestion.models.topology import (
 )
 from metadata.ingestion.ometa.ometa_api import OpenMetadata
 from metadata.ingestion.source.connections import get_connection, get_test_connection_fn
+from metadata.ingestion.source.storage.incremental_state import IncrementalState
+from metadata.ml.summarization import Summarization
 from metadata.ingestion.source.database.glue.models import Column
 from metadata.readers.dataframe.models import DatalakeTableSchemaWrapper
 from metadata.readers.dataframe.reader_factory import SupportedTypes
-from metadata.readers.file.s3 import S3Reader
+from metadata.readers.file.base import ReadException
+from metadata.readers.file.document import DEFAULT_TEMP_FILE_THRESHOLD, open_document
 from metadata.readers.models import ConfigSource
 from metadata.utils import fqn
 from metadata.utils.datalake.datalake_utils import (
     DataFrameColumnParser,
     fetch_dataframe,
 )
-from metadata.utils.local_dir import ensure_directory_exists
 from metadata.utils.logger import ingestion_logger
 from metadata.utils.storage_metadata_config import (
     StorageMetadataConfigException,
     get_manifest,
 )
+from metadata.utils.word.document_cache import (
+    document_key,
+    get_document_cache,
+    text_key,
+)
 from metadata.utils.word.ms_word_extractor import MsWordMetadataExtractor
 from metadata.utils.word.hwp_extractor import HwpMetadataExtractor
 
@@ -73,6 +97,7 @@ logger = ingestion_logger()
 
 KEY_SEPARATOR = "/"
 OPENMETADATA_TEMPLATE_FILE_NAME = "openmetadata.json"
+SUMMARY_RDF_NAME = "Summary"
 
 
 class Metric(Enum):
@@ -146,6 +171,13 @@ class StorageServiceTopology(ServiceTopology):
     )
 
 
+class DocumentMetadata(NamedTuple):
+    """RDFs extracted from a document and, if its summary was deferred, its text"""
+
+    rdfs: List[Rdf]
+    text: Optional[str] = None
+
+
 def rdfs_delete_duplicated(rdfs: List[Rdf]) -> List[Rdf]:
     """
     Remove duplicated rdf
@@ -189,6 +221,15 @@ class StorageServiceSource(TopologyRunnerMixin, Source, ABC):
         )
         self.connection = get_connection(self.service_connection)
 
+        # Only process the objects that changed since the last run
+        incremental_state_path = getattr(self.source_config, "incrementalStatePath", None)
+        self.incremental_state: Optional[IncrementalState] = (
+            IncrementalState(incremental_state_path) if incremental_state_path else None
+        )
+
+        # The model is only loaded with the first summary
+        self.summarizer = Summarization()
+
         # Flag the connection for the test connection
         self.connection_obj = self.connection
         self.test_connection()
@@ -225,8 +266,71 @@ class StorageServiceSource(TopologyRunnerMixin, Source, ABC):
     ) -> Iterable[Either[CreateContainerRequest]]:
         """Generate the create container requests based on the received details"""
 
+    def sink_ack(self, record: Any, result: Either) -> None:
+        """
+        Objects whose container the sink failed to write are not kept
+        in the incremental state, so that the next run ingests them again
+        """
+        if not self.incremental_state or result.left is None:
+            return
+        container_fqn = None
+        if isinstance(record, CreateContainerRequest) and record.parent:
+            container_fqn = fqn.FQN_SEPARATOR.join(
+                [
+                    record.parent.fullyQualifiedName,
+                    fqn.quote_name(record.name.__root__),
+                ]
+            )
+        elif isinstance(record, PatchRequest) and isinstance(
+            record.new_entity, Container
+        ):
+            container_fqn = record.new_entity.fullyQualifiedName.__root__
+        if container_fqn:
+            self.incremental_state.discard(container_fqn)
+
     def close(self):
-        """By default, nothing needs to be closed"""
+        """Save the incremental state, if any"""
+        if self.incremental_state:
+            self.incremental_state.save()
+
+    def run_object_workers(
+            self, objects: Iterable[Any], worker: Callable[[Any], Any]
+    ) -> Iterable[Tuple[Any, Future]]:
+        """
+        Run the per-object `worker` (e.g., download and parse the object) in
+        `objectThreads` threads and yield each object with its finished future,
+        in the order of `objects`, so the network I/O overlaps with the parsing.
+
+        We keep at most twice as many objects in flight as threads: the workers
+        only move ahead as the sink consumes what we yield.
+        Exceptions are raised by `future.result()` in the calling thread.
+        """
+        threads = getattr(self.source_config, "objectThreads", None) or 1
+        if threads <= 1:
+            for obj in objects:
+                future = Future()
+                try:
+                    future.set_result(worker(obj))
+                except Exception as exc:
+                    future.set_exception(exc)
+                yield obj, future
+            return
+
+        max_pending = threads * 2
+        pending: Deque[Tuple[Any, Future]] = deque()
+        with ThreadPoolExecutor(
+                max_workers=threads, thread_name_prefix="StorageObject"
+        ) as executor:
+            for obj in objects:
+                pending.append((obj, executor.submit(worker, obj)))
+                if len(pending) >= max_pending:
+                    pending[0][1].exception()
+                while pending and pending[0][1].done():
+                    yield pending.popleft()
+
+            while pending:
+                pending[0][1].exception()
+                yield pending.popleft()
 
     def get_services(self) -> Iterable[WorkflowSource]:
         yield self.config
@@ -262,7 +366,18 @@ class StorageServiceSource(TopologyRunnerMixin, Source, ABC):
 
     def mark_containers_as_deleted(self) -> Iterable[Either[DeleteEntity]]:
         """Method to mark the containers as deleted"""
-        if self.source_config.markDeletedContainers:
+        if not self.source_config.markDeletedContainers:
+            return
+        if self.incremental_state and self.incremental_state.loaded:
+            # Unchanged containers are not registered in an incremental run:
+            # we only delete the ones of the objects gone since the last run
+            yield from delete_entity_by_name(
+                metadata=self.metadata,
+                entity_type=Container,
+                entity_names=self.incremental_state.get_deleted_fqns(),
+                mark_deleted_entity=self.source_config.markDeletedContainers,
+            )
+        else:
             yield from delete_entity_from_source(
                 metadata=self.metadata,
                 entity_type=Container,
@@ -355,137 +470,158 @@ class StorageServiceSource(TopologyRunnerMixin, Source, ABC):
         )
         return (metadata_entry.partitionColumns or []) + (extracted_cols or [])
 
-    def _get_document_data(self, bucket_name: str, key: str, client: Any) -> Optional[str]:
-        """
-        Read the word document from the bucket
-        """
-        local_dir_path = os.environ.get('AIRFLOW_HOME') + "/tmp"
-        # 다운로드 디렉토리 확인 및 생성
-        ensure_directory_exists(local_dir_path)
-
-        file_extension = key.split('.')[-1]
-        local_file_path = f"{local_dir_path}/{uuid.uuid4().hex}.{file_extension}"
-
-        try:
-            s3reader = S3Reader(client)
-            s3reader.download(key, local_file_path=local_file_path, bucket_name=bucket_name, verbose=True)
-            return local_file_path
-        except (Exception,):
-            return None
-
     def _get_document_meta(self, bucket_name: str, path: str, metadata_entry: MetadataEntry,
-                           client: Any) -> Optional[List[Rdf]]:
+                           client: Any, summarize: bool = True, size: Optional[int] = None,
+                           etag: Optional[str] = None) -> Optional[DocumentMetadata]:
         """
-        Read the document from the bucket
+        Read the document from the bucket. Without summarize, the text of
+        the document is returned instead of its summary to be summarized in batch.
+        With the document cache, a document version is only extracted once.
         """
-        local_file_path = self._get_document_data(bucket_name, path, client)
-        if local_file_path is None:
-            return None
-
         file_extension = path.split('.')[-1]
-
         if file_extension == "hwp" or file_extension == "hwpx":
-            return self._get_hwp_meta(local_file_path)
+            get_meta = self._get_hwp_meta
         elif file_extension == "docx" or file_extension == "doc":
-            return self._get_word_meta(local_file_path)
+            get_meta = self._get_word_meta
         else:
             logger.warn("Unsupported file type")
             return None
 
-    def _get_hwp_meta(self, local_file_path: str) -> Optional[List[Rdf]]:
+        cache = get_document_cache()
+        cache_key = document_key(etag) if cache and etag else None
+        entry = cache.get(cache_key) if cache_key else None
+        if entry and "rdfs" in entry:
+            document = DocumentMetadata(
+                rdfs=[Rdf(name=name, object=value) for name, value in entry["rdfs"]],
+                text=entry.get("text"),
+            )
+        else:
+            temp_file_threshold = getattr(self.source_config, "documentTempFileThreshold", None)
+            try:
+                with open_document(
+                        client,
+                        bucket_name,
+                        path,
+                        size=size,
+                        temp_file_threshold=(
+                            DEFAULT_TEMP_FILE_THRESHOLD if temp_file_threshold is None else temp_file_threshold
+                        ),
+                ) as local_document:
+                    document = get_meta(local_document)
+            except ReadException as exc:
+                logger.debug(traceback.format_exc())
+                logger.warning(f"Could not read the document [{path}]: {exc}")
+                return None
+            if cache_key:
+                cache.update(
+                    cache_key,
+                    rdfs=[[rdf.name, rdf.object] for rdf in document.rdfs],
+                    text=document.text,
+                )
+
+        if summarize and document.text is not None:
+            summary = Rdf(name=SUMMARY_RDF_NAME, object=self._summarize(document.text))
+            return DocumentMetadata(rdfs=document.rdfs + [summary])
+        return document
+
+    def _summarize(self, text: str) -> str:
+        """Summary of the text, computed once per text with the document cache"""
+        cache = get_document_cache()
+        cache_key = text_key(text) if cache else None
+        entry = cache.get(cache_key) if cache_key else None
+        if entry and "summary" in entry:
+            return entry["summary"]
+        summary = self.summarizer.summarize(text)
+        if cache_key:
+            cache.update(cache_key, summary=summary)
+        return summary
+
+    def _get_hwp_meta(self, document: Union[str, BinaryIO]) -> DocumentMetadata:
         """
-        Extract metadata from hwp/hwpx file
+        Extract metadata and text from hwp/hwpx file
         """
-        try:
-            extractor = HwpMetadataExtractor(local_file_path)
-            metas = extractor.get_metadata()
-            rdfs = []
-            for k, v in metas.items():
-                if v is None:
-                    continue
-                if isinstance(v, str) and v == "":
-                    continue
-                rdfs.append(Rdf(name=k, object=f'{v}'))
-            return rdfs
-        finally:
-            os.remove(local_file_path)
-
-    def _get_word_meta(self, local_file_path: str) -> Optional[List[Rdf]]:
+        extractor = HwpMetadataExtractor(document, summarize=False)
+        metas = extractor.get_metadata()
+        rdfs = []
+        for k, v in metas.items():
+            if v is None:
+                continue
+            if isinstance(v, str) and v == "":
+                continue
+            rdfs.append(Rdf(name=k, object=f'{v}'))
+        return DocumentMetadata(rdfs=rdfs, text=extractor.sample_text)
+
+    def _get_word_meta(self, document: Union[str, BinaryIO]) -> DocumentMetadata:
         """
-        Extract metadata from word(doc/docx) document
+        Extract metadata and text from word(doc/docx) document
         """
-        try:
-            extractor = MsWordMetadataExtractor(local_file_path)
-            metas = extractor.extract_metadata()
-            rdfs = []
-            for k, v in metas.items():
-                if isinstance(v, str) and v == "":
-                    continue
-
-                if k == "Author":
-                    rdfs.append(Rdf(name="Author", object=v))
-                if k == "Category":
-                    rdfs.append(Rdf(name="Category", object=v))
-                if k == 'Comments':
-                    rdfs.append(Rdf(name="Comments", object=v))
-                if k == 'Content Status':
-                    rdfs.append(Rdf(name="Content Status", object=v))
-                if k == 'Created':
-                    if isinstance(v, str):
-                        rdfs.append(Rdf(name="Created", object=v))
-                    if isinstance(v, datetime):
-                        # datetime 형식의 경우 str로 변환
-                        rdfs.append(Rdf(name="Created", object=v.strftime('%Y-%m-%d %H:%M:%S %Z')))
-                if k == 'Identifier':
-                    rdfs.append(Rdf(name="Identifier", object=v))
-                if k == 'Language':
-                    rdfs.append(Rdf(name="Language", object=v))
-                if k == 'Last Modified By':
-                    rdfs.append(Rdf(name="Last Modified By", object=v))
-                if k == 'Modified':
-                    if isinstance(v, str):
-                        rdfs.append(Rdf(name="Modified", object=v))
-                    if isinstance(v, datetime):
-                        # datetime 형식의 경우 str로 변환
-                        rdfs.append(Rdf(name="Modified", object=v.strftime('%Y-%m-%d %H:%M:%S %Z')))
-                if k == 'Revision':
-                    rdfs.append(Rdf(name="Revision", object=v))
-                if k == 'Subject':
-                    rdfs.append(Rdf(name="Subject", object=v))
-                if k == 'Title':
-                    rdfs.append(Rdf(name="Title", object=v))
-                if k == 'Version':
-                    rdfs.append(Rdf(name="Version", object=v))
-                if k == "cp:revision":
-                    rdfs.append(Rdf(name="Revision", object=v))
-                if k == "meta:word_count":
-                    rdfs.append(Rdf(name="word_count", object=v))
-                if k == "meta:character_count":
-                    rdfs.append(Rdf(name="character_count", object=v))
-                if k == "extended-properties:Application":
-                    if isinstance(v, str):
-                        rdfs.append(Rdf(name="Application", object=v))
-                    if isinstance(v, list):
-                        # v duplicate 삭제
-                        values = " ".join(list(set(v)))
-                        rdfs.append(Rdf(name="Application", object=values))
-                if k == "dcterms:created":
-                    rdfs.append(Rdf(name="Created", object=v if isinstance(v, str) else v[0]))
-                if k == "dcterms:modified":
-                    rdfs.append(Rdf(name="Modified", object=v if isinstance(v, str) else v[0]))
-                if k == "Content-Length":
-                    rdfs.append(Rdf(name="Content-Length", object=v))
-                if k == "meta:last-author":
-                    rdfs.append(Rdf(name="Last-author", object=v if isinstance(v, str) else v[0]))
-                if k == "xmpTPg:NPages":
-                    rdfs.append(Rdf(name="Page_count", object=v))
-                if k == "dc:language":
-                    rdfs.append(Rdf(name="Language", object=v if isinstance(v, str) else v[0]))
-                if k == "Summary":
-                    rdfs.append(Rdf(name="Summary", object=v if isinstance(v, str) else v[0]))
-                # if v is not None:
-                #     rdfs.append(Rdf(name=k, object=v))
-            return rdfs_delete_duplicated(rdfs)
-        finally:
-            os.remove(local_file_path)
+        extractor = MsWordMetadataExtractor(document, summarize=False)
+        metas = extractor.extract_metadata()
+        rdfs = []
+        for k, v in metas.items():
+            if isinstance(v, str) and v == "":
+                continue
+
+            if k == "Author":
+                rdfs.append(Rdf(name="Author", object=v))
+            if k == "Category":
+                rdfs.append(Rdf(name="Category", object=v))
+            if k == 'Comments':
+                rdfs.append(Rdf(name="Comments", object=v))
+            if k == 'Content Status':
+                rdfs.append(Rdf(name="Content Status", object=v))
+            if k == 'Created':
+                if isinstance(v, str):
+                    rdfs.append(Rdf(name="Created", object=v))
+                if isinstance(v, datetime):
+                    # datetime 형식의 경우 str로 변환
+                    rdfs.append(Rdf(name="Created", object=v.strftime('%Y-%m-%d %H:%M:%S %Z')))
+            if k == 'Identifier':
+                rdfs.append(Rdf(name="Identifier", object=v))
+            if k == 'Language':
+                rdfs.append(Rdf(name="Language", object=v))
+            if k == 'Last Modified By':
+                rdfs.append(Rdf(name="Last Modified By", object=v))
+            if k == 'Modified':
+                if isinstance(v, str):
+                    rdfs.append(Rdf(name="Modified", object=v))
+                if isinstance(v, datetime):
+                    # datetime 형식의 경우 str로 변환
+                    rdfs.append(Rdf(name="Modified", object=v.strftime('%Y-%m-%d %H:%M:%S %Z')))
+            if k == 'Revision':
+                rdfs.append(Rdf(name="Revision", object=v))
+            if k == 'Subject':
+                rdfs.append(Rdf(name="Subject", object=v))
+            if k == 'Title':
+                rdfs.append(Rdf(name="Title", object=v))
+            if k == 'Version':
+                rdfs.append(Rdf(name="Version", object=v))
+            if k == "cp:revision":
+                rdfs.append(Rdf(name="Revision", object=v))
+            if k == "meta:word_count":
+                rdfs.append(Rdf(name="word_count", object=v))
+            if k == "meta:character_count":
+                rdfs.append(Rdf(name="character_count", object=v))
+            if k == "extended-properties:Application":
+                if isinstance(v, str):
+                    rdfs.append(Rdf(name="Application", object=v))
+                if isinstance(v, list):
+                    # v duplicate 삭제
+                    values = " ".join(list(set(v)))
+                    rdfs.append(Rdf(name="Application", object=values))
+            if k == "dcterms:created":
+                rdfs.append(Rdf(name="Created", object=v if isinstance(v, str) else v[0]))
+            if k == "dcterms:modified":
+                rdfs.append(Rdf(name="Modified", object=v if isinstance(v, str) else v[0]))
+            if k == "Content-Length":
+                rdfs.append(Rdf(name="Content-Length", object=v))
+            if k == "meta:last-author":
+                rdfs.append(Rdf(name="Last-author", object=v if isinstance(v, str) else v[0]))
+            if k == "xmpTPg:NPages":
+                rdfs.append(Rdf(name="Page_count", object=v))
+            if k == "dc:language":
+                rdfs.append(Rdf(name="Language", object=v if isinstance(v, str) else v[0]))
+            # if v is not None:
+            #     rdfs.append(Rdf(name=k, object=v))
+        return DocumentMetadata(rdfs=rdfs_delete_duplicated(rdfs), text=extractor.sample_text)
 
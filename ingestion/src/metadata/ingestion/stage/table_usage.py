@@ -13,41 +13,47 @@ Given query data about tables, store the results
 in a temporary file (i.e., the stage)
 to be further processed by the BulkSink.
 """
-import json
-import os
 import shutil
 import traceback
 from pathlib import Path
-from typing import Iterable, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from metadata.config.common import ConfigModel
 from metadata.generated.schema.api.data.createQuery import CreateQueryRequest
 from metadata.generated.schema.entity.services.ingestionPipelines.status import (
     StackTraceError,
 )
-from metadata.generated.schema.entity.teams.user import User
 from metadata.generated.schema.type.queryParserData import ParsedData, QueryParserData
 from metadata.generated.schema.type.tableUsageCount import TableUsageCount
 from metadata.ingestion.api.models import Either
 from metadata.ingestion.api.steps import Stage
 from metadata.ingestion.ometa.ometa_api import OpenMetadata
-from metadata.utils.constants import UTF_8
+from metadata.ingestion.stage.usage_runs import write_runs
+from metadata.ingestion.stage.user_cache import UserCache
 from metadata.utils.helpers import init_staging_dir
 from metadata.utils.logger import ingestion_logger
 
 logger = ingestion_logger()
 
+# Rough memory taken by the aggregates, on top of the SQL text of the queries
+TABLE_USAGE_SIZE = 1024
+QUERY_SIZE = 1024
+JOIN_SIZE = 512
+
 
 class TableStageConfig(ConfigModel):
     filename: str
+    # Bytes of usage kept in memory before writing them to a sorted run
+    memoryBudget: int = 256 * 1024 * 1024
 
 
 class TableUsageStage(Stage):
     """
     Stage implementation for Table Usage data.
 
-    Converts QueryParserData into TableUsageCount
-    and stores it in files partitioned by date.
+    Converts QueryParserData into TableUsageCount, adding up the
+    usage of each table and date across records, and stores it in
+    sorted runs partitioned by date (see `usage_runs`).
     """
 
     config: TableStageConfig
@@ -60,8 +66,9 @@ class TableUsageStage(Stage):
         super().__init__()
         self.config = config
         self.metadata = metadata
-        self.table_usage = {}
-        self.table_queries = {}
+        self.table_usage: Dict[Tuple[str, str], TableUsageCount] = {}
+        self.usage_size = 0
+        self.user_cache = UserCache(metadata)
         init_staging_dir(self.config.filename)
         self.wrote_something = False
 
@@ -98,67 +105,50 @@ class TableUsageStage(Stage):
         return if we find any users in OM that match, plus the user that we found in the db record.
         """
         if username:
-            user = self.metadata.get_by_name(entity=User, fqn=username)
-            if user:
-                return [user.fullyQualifiedName.__root__], [username]
+            user_fqn = self.user_cache.get(username)
+            if user_fqn:
+                return [user_fqn], [username]
             return None, [username]
         return None, None
 
-    def _add_sql_query(self, record, table):
+    def _get_sql_query(self, record: ParsedData) -> CreateQueryRequest:
         users, used_by = self._get_user_entity(record.userName)
-        if self.table_queries.get((table, record.date)):
-            self.table_queries[(table, record.date)].append(
-                CreateQueryRequest(
-                    query=record.sql,
-                    query_type=record.query_type,
-                    exclude_usage=record.exclude_usage,
-                    users=users,
-                    queryDate=record.date,
-                    usedBy=used_by,
-                    duration=record.duration,
-                    service=record.serviceName,
-                )
-            )
-        else:
-            self.table_queries[(table, record.date)] = [
-                CreateQueryRequest(
-                    query=record.sql,
-                    query_type=record.query_type,
-                    exclude_usage=record.exclude_usage,
-                    users=users,
-                    queryDate=record.date,
-                    usedBy=used_by,
-                    duration=record.duration,
-                    service=record.serviceName,
-                )
-            ]
+        return CreateQueryRequest(
+            query=record.sql,
+            query_type=record.query_type,
+            exclude_usage=record.exclude_usage,
+            users=users,
+            queryDate=record.date,
+            usedBy=used_by,
+            duration=record.duration,
+            service=record.serviceName,
+        )
 
     def _handle_table_usage(
-        self, parsed_data: ParsedData, table: str
+        self, parsed_data: ParsedData, table: str, sql_query: CreateQueryRequest
     ) -> Iterable[Either[str]]:
-        table_joins = parsed_data.joins.get(table)
+        table_joins = parsed_data.joins.get(table) or []
         try:
-            self._add_sql_query(record=parsed_data, table=table)
             table_usage_count = self.table_usage.get((table, parsed_data.date))
             if table_usage_count is not None:
                 table_usage_count.count = table_usage_count.count + 1
-                if table_joins:
-                    table_usage_count.joins.extend(table_joins)
+                table_usage_count.joins.extend(table_joins)
+                table_usage_count.sqlQueries.append(sql_query)
             else:
-                joins = []
-                if table_joins:
-                    joins.extend(table_joins)
-
                 table_usage_count = TableUsageCount(
                     table=table,
                     databaseName=parsed_data.databaseName,
                     date=parsed_data.date,
-                    joins=joins,
+                    joins=list(table_joins),
                     serviceName=parsed_data.serviceName,
-                    sqlQueries=[],
+                    sqlQueries=[sql_query],
                     databaseSchema=parsed_data.databaseSchema,
                 )
-            self.table_usage[(table, parsed_data.date)] = table_usage_count
+                self.table_usage[(table, parsed_data.date)] = table_usage_count
+                self.usage_size += TABLE_USAGE_SIZE
+            self.usage_size += (
+                QUERY_SIZE + len(parsed_data.sql) + JOIN_SIZE * len(table_joins)
+            )
 
         except Exception as exc:
             yield Either(
@@ -172,35 +162,56 @@ class TableUsageStage(Stage):
 
     def _run(self, record: QueryParserData) -> Iterable[Either[str]]:
         """
-        Process the parsed data and store it in a file
+        Add the parsed data to the usage in memory, writing it
+        to a new run when it goes over the memory budget
         """
         if not record or not record.parsedData:
             return
-        self.table_usage = {}
-        self.table_queries = {}
+        self.user_cache.resolve(
+            parsed_data.userName for parsed_data in record.parsedData if parsed_data
+        )
         for parsed_data in record.parsedData:
             if parsed_data is None:
                 continue
+            try:
+                sql_query = self._get_sql_query(parsed_data)
+            except Exception as exc:
+                yield Either(
+                    left=StackTraceError(
+                        name=", ".join(parsed_data.tables),
+                        error=f"Error in staging record [{exc}]",
+                        stackTrace=traceback.format_exc(),
+                    )
+                )
+                continue
             for table in parsed_data.tables:
                 yield from self._handle_table_usage(
-                    parsed_data=parsed_data, table=table
+                    parsed_data=parsed_data, table=table, sql_query=sql_query
                 )
-        self.dump_data_to_file()
+        if self.usage_size > self.config.memoryBudget:
+            self.dump_data_to_file()
 
     def dump_data_to_file(self):
-        for key, value in self.table_usage.items():
-            if value:
-                value.sqlQueries = self.table_queries.get(key, [])
-                data = value.json()
-                with open(
-                    os.path.join(self.config.filename, f"{value.serviceName}_{key[1]}"),
-                    "a+",
-                    encoding=UTF_8,
-                ) as file:
-                    file.write(json.dumps(data))
-                    file.write("\n")
+        """
+        Write the usage in memory as sorted runs, one file per service and date,
+        and release it so that it is not written twice
+        """
+        if self.table_usage:
+            write_runs(self.config.filename, self.table_usage.values())
+            self.wrote_something = True
+        self.table_usage = {}
+        self.usage_size = 0
+
+    def flush(self) -> None:
+        """
+        Write the last run before the BulkSink merges them. Flushing again
+        without new records writes nothing.
+        """
+        self.dump_data_to_file()
+        self.user_cache.report(self.status)
 
     def close(self) -> None:
         """
-        Nothing to close. Data is being dumped inside a context manager
+        Data is written by `flush`, we just release it
         """
+        self.table_usage = {}
@@ -0,0 +1,100 @@
+#  Copyright 2021 Collate
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""
+Sorted runs of table usage, written by the TableUsageStage and merged by the
+MetadataUsageBulkSink.
+
+The stage aggregates the usage of each table and date in memory. When it goes
+over its memory budget, and at the end, it writes the aggregates as a new run:
+a file of TableUsageCount JSON lines sorted by table, in a directory per
+service and date. Reading a directory merges its runs, so every table comes
+out once with its counts, joins and queries added up.
+"""
+import heapq
+import json
+import os
+from collections import defaultdict
+from contextlib import ExitStack
+from itertools import groupby
+from operator import attrgetter
+from typing import IO, Dict, Iterable, Iterator, List, Tuple
+
+from metadata.generated.schema.type.tableUsageCount import TableUsageCount
+from metadata.utils.constants import UTF_8
+
+RUN_PREFIX = "run-"
+RUN_SUFFIX = ".jsonl"
+
+
+def write_runs(location: str, usages: Iterable[TableUsageCount]) -> int:
+    """Write a sorted run per service and date, and return the number of runs"""
+    groups: Dict[Tuple[str, str], List[TableUsageCount]] = defaultdict(list)
+    for usage in usages:
+        groups[(usage.serviceName, usage.date)].append(usage)
+
+    for (service_name, date), group in groups.items():
+        directory = os.path.join(location, f"{service_name}_{date}")
+        os.makedirs(directory, exist_ok=True)
+        run_path = os.path.join(
+            directory, f"{RUN_PREFIX}{len(os.listdir(directory)):06d}{RUN_SUFFIX}"
+        )
+        with open(run_path, "w", encoding=UTF_8) as file:
+            for usage in sorted(group, key=attrgetter("table")):
+                file.write(usage.json(exclude_none=True))
+                file.write("\n")
+    return len(groups)
+
+
+def _parse(line: str) -> TableUsageCount:
+    record = json.loads(line)
+    # Files of previous versions hold JSON encoded strings
+    if isinstance(record, str):
+        record = json.loads(record)
+    return TableUsageCount(**record)
+
+
+def _read_lines(file: IO[str]) -> Iterator[TableUsageCount]:
+    for line in file:
+        if line.strip():
+            yield _parse(line)
+
+
+def _combine(usages: Iterator[TableUsageCount]) -> TableUsageCount:
+    """Add up the usage of the same table from several runs"""
+    combined = next(usages)
+    for usage in usages:
+        combined.count += usage.count
+        combined.joins = (combined.joins or []) + (usage.joins or [])
+        combined.sqlQueries = (combined.sqlQueries or []) + (usage.sqlQueries or [])
+    return combined
+
+
+def read_usage(path: str) -> Iterator[TableUsageCount]:
+    """
+    Usage of the tables in a service and date directory, merging its runs with
+    one open file per run. Plain files are read line by line as they are.
+    """
+    if os.path.isfile(path):
+        with open(path, encoding=UTF_8) as file:
+            yield from _read_lines(file)
+        return
+
+    with ExitStack() as stack:
+        runs = [
+            _read_lines(
+                stack.enter_context(open(os.path.join(path, name), encoding=UTF_8))
+            )
+            for name in sorted(os.listdir(path))
+            if name.startswith(RUN_PREFIX)
+        ]
+        merged = heapq.merge(*runs, key=attrgetter("table"))
+        for _, usages in groupby(merged, key=attrgetter("table")):
+            yield _combine(usages)
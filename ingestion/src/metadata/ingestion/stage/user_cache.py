@@ -0,0 +1,100 @@
+#  Copyright 2021 Collate
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""
+Resolution of the users who ran the queries of the usage workflows.
+
+Query logs come from a handful of service accounts, so we list the
+OpenMetadata users once and only look up the names we do not know, in
+batches of concurrent requests. Names not found are remembered as well,
+but not the lookups that failed.
+"""
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+
+from metadata.generated.schema.entity.teams.user import User
+from metadata.ingestion.api.status import Status
+from metadata.ingestion.ometa.ometa_api import OpenMetadata
+from metadata.utils.logger import ingestion_logger
+
+logger = ingestion_logger()
+
+USER_LOOKUP_THREADS = 8
+
+
+class UserCache:
+    """
+    FQN of the OpenMetadata user of each user name, or None if there is none
+    """
+
+    def __init__(self, metadata: OpenMetadata, threads: int = USER_LOOKUP_THREADS):
+        self.metadata = metadata
+        self.threads = threads
+        self.hits = 0
+        self.misses = 0
+        self._users: Dict[str, Optional[str]] = {}
+        self._loaded = False
+
+    def load(self) -> None:
+        """List the users once, when the stage gets its first record"""
+        self._loaded = True
+        try:
+            # Query logs have the user names: a name with dots has a quoted FQN
+            for user in self.metadata.list_all_entities(entity=User):
+                self._users[user.name.__root__] = user.fullyQualifiedName.__root__
+            logger.info(f"Loaded {len(self._users)} users")
+        except Exception as exc:
+            logger.debug(traceback.format_exc())
+            logger.warning(f"Cannot list the users, looking them up one by one: {exc}")
+
+    def _lookup(self, username: str) -> Tuple[Optional[str], bool]:
+        """FQN of the user, or None, and whether the server answered"""
+        try:
+            user = self.metadata.get_by_name(entity=User, fqn=username)
+            return (user.fullyQualifiedName.__root__ if user else None), True
+        except Exception as exc:
+            logger.debug(traceback.format_exc())
+            logger.warning(f"Cannot look up the user [{username}]: {exc}")
+            return None, False
+
+    def resolve(self, usernames: Iterable[Optional[str]]) -> None:
+        """Look up the users we do not know yet with concurrent requests"""
+        if not self._loaded:
+            self.load()
+        unknown = list(
+            {username for username in usernames if username} - self._users.keys()
+        )
+        if not unknown:
+            return
+        self.misses += len(unknown)
+        with ThreadPoolExecutor(max_workers=min(self.threads, len(unknown))) as pool:
+            for username, (user_fqn, found) in zip(
+                unknown, pool.map(self._lookup, unknown)
+            ):
+                # Errors are not remembered, the next query retries the lookup
+                if found:
+                    self._users[username] = user_fqn
+
+    def get(self, username: str) -> Optional[str]:
+        if username in self._users:
+            self.hits += 1
+        else:
+            self.resolve([username])
+        return self._users.get(username)
+
+    def report(self, status: Status) -> None:
+        """Add the lookups to the status of the stage"""
+        status.metric("User cache hits", self.hits)
+        status.metric("User lookups", self.misses)
+        status.metric(
+            "Users not found",
+            sum(1 for user_fqn in self._users.values() if user_fqn is None),
+        )
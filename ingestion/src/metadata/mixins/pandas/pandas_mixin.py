@@ -13,9 +13,8 @@
 Interfaces with database for all database engine
 supporting sqlalchemy abstraction layer
 """
-import math
 import random
-from typing import cast
+from typing import Iterable, List, cast
 
 from metadata.data_quality.validations.table.pandas.tableRowInsertedCountToBeBetween import (
     TableRowInsertedCountToBeBetweenValidator,
@@ -32,6 +31,27 @@ from metadata.utils.logger import test_suite_logger
 logger = test_suite_logger()
 
 
+def sample_rows(dfs: Iterable["DataFrame"], rows: int) -> List["DataFrame"]:
+    """
+    Uniformly sample `rows` rows out of a stream of chunks, holding at most
+    `rows` rows plus one chunk: each row gets a random key and we keep the
+    rows with the smallest keys.
+    """
+    # pylint: disable=import-outside-toplevel
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(random.randint(0, 100))
+    sample, keys = None, np.empty(0)
+    for df in dfs:
+        sample = df if sample is None else pd.concat([sample, df])
+        keys = np.concatenate((keys, rng.random(len(df))))
+        if len(sample) > rows:
+            keep = np.sort(np.argpartition(keys, rows)[:rows])
+            sample, keys = sample.iloc[keep], keys[keep]
+    return [sample] if sample is not None else []
+
+
 class PandasInterfaceMixin:
     """Interface mixin grouping shared methods between test suite and profiler interfaces"""
 
@@ -81,6 +101,26 @@ class PandasInterfaceMixin:
             for df in dfs
         ]
 
+    @staticmethod
+    def _sample_dataframes(data, profile_sample_config) -> List["DataFrame"]:
+        """
+        Consume the chunks iterator applying the profiler sample config (if any).
+        Without sampling, every chunk is kept in memory.
+        """
+        if hasattr(profile_sample_config, "profile_sample"):
+            if profile_sample_config.profile_sample_type == ProfileSampleType.PERCENTAGE:
+                return [
+                    df.sample(
+                        frac=profile_sample_config.profile_sample / 100,
+                        random_state=random.randint(0, 100),
+                        replace=True,
+                    )
+                    for df in data
+                ]
+            if profile_sample_config.profile_sample_type == ProfileSampleType.ROWS:
+                return sample_rows(data, int(profile_sample_config.profile_sample))
+        return list(data)
+
     def return_ometa_dataframes_sampled(
         self, service_connection_config, client, table, profile_sample_config
     ):
@@ -108,33 +148,10 @@ class PandasInterfaceMixin:
                     file_extension=table.fileFormat,
                 ),
             )
-        if data:
-            random.shuffle(data)
-            # sampling data based on profiler config (if any)
-            if hasattr(profile_sample_config, "profile_sample"):
-                if (
-                    profile_sample_config.profile_sample_type
-                    == ProfileSampleType.PERCENTAGE
-                ):
-                    return [
-                        df.sample(
-                            frac=profile_sample_config.profile_sample / 100,
-                            random_state=random.randint(0, 100),
-                            replace=True,
-                        )
-                        for df in data
-                    ]
-                if profile_sample_config.profile_sample_type == ProfileSampleType.ROWS:
-                    sample_rows_per_chunk: int = math.floor(
-                        profile_sample_config.profile_sample / len(data)
-                    )
-                    return [
-                        df.sample(
-                            n=sample_rows_per_chunk,
-                            random_state=random.randint(0, 100),
-                            replace=True,
-                        )
-                        for df in data
-                    ]
-            return data
+        if data is not None:
+            # The chunks are read lazily: when sampling, we only hold the sampled rows
+            dfs = self._sample_dataframes(data, profile_sample_config)
+            if dfs:
+                random.shuffle(dfs)
+                return dfs
         raise TypeError(f"Couldn't fetch {table.name.__root__}")
@@ -1,34 +1,254 @@
-import nltk
+"""
+Summarization of the text of documents (HWP, DOCX,...) with a Korean T5 model.
+
+The model is only loaded the first time we summarize a text and is then
+shared by every Summarization of the process. It can run with PyTorch
+(default) or, if `optimum[onnxruntime]` is installed, as an int8-quantized
+ONNX model which is faster on CPU. Pick the backend with the
+`SUMMARIZATION_BACKEND` environment variable (`torch` or `onnx`).
+"""
+import os
+import shutil
 import ssl
-from nltk.data import find
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+import threading
+import time
+import traceback
+from enum import Enum
+from typing import Dict, List, Optional, Tuple
+
+from metadata.utils.logger import utils_logger
+
+logger = utils_logger()
+
+MODEL_NAME = "eenzeenee/t5-base-korean-summarization"
+DEFAULT_MAX_BATCH_SIZE = 8
+MAX_INPUT_LENGTH = 512
+SUMMARIZATION_BACKEND_ENV = "SUMMARIZATION_BACKEND"
+# Where the exported and quantized ONNX models are kept between runs
+ONNX_CACHE_DIR_ENV = "SUMMARIZATION_ONNX_CACHE_DIR"
+ONNX_FILE_NAMES = ("encoder_model", "decoder_model", "decoder_with_past_model")
+
+
+class SummarizationBackend(Enum):
+    TORCH = "torch"
+    ONNX = "onnx"
+
+
+class SummarizationModel:
+    """Tokenizer and seq2seq model loaded for a backend"""
+
+    def __init__(self, tokenizer, model, backend: SummarizationBackend):
+        self.tokenizer = tokenizer
+        self.model = model
+        self.backend = backend
+        # The generation of a model instance is not meant to run concurrently
+        self.lock = threading.Lock()
+
+
+_models: Dict[Tuple[str, SummarizationBackend], SummarizationModel] = {}
+_models_lock = threading.Lock()
+_nltk_ready = False
+
+
+def _load_torch_model(model_name: str) -> SummarizationModel:
+    # pylint: disable=import-outside-toplevel
+    from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+
+    return SummarizationModel(
+        tokenizer=AutoTokenizer.from_pretrained(model_name),
+        model=AutoModelForSeq2SeqLM.from_pretrained(model_name),
+        backend=SummarizationBackend.TORCH,
+    )
+
+
+def _load_onnx_model(model_name: str) -> SummarizationModel:
+    """
+    Export the model to ONNX and quantize its weights to int8 the first
+    time, then load the quantized model from the cache directory
+    """
+    # pylint: disable=import-outside-toplevel
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+
+    cache_dir = os.environ.get(ONNX_CACHE_DIR_ENV) or os.path.join(
+        os.path.expanduser("~"), ".cache", "summarization-onnx"
+    )
+    export_dir = os.path.join(cache_dir, model_name.replace("/", "--"))
+    quantized_dir = f"{export_dir}-int8"
+
+    if not os.path.isdir(quantized_dir):
+        logger.info(f"Exporting {model_name} to int8 ONNX in {quantized_dir}")
+        try:
+            ORTModelForSeq2SeqLM.from_pretrained(
+                model_name, export=True
+            ).save_pretrained(export_dir)
+            quantization_config = AutoQuantizationConfig.avx2(
+                is_static=False, per_channel=False
+            )
+            for file_name in ONNX_FILE_NAMES:
+                if os.path.exists(os.path.join(export_dir, f"{file_name}.onnx")):
+                    ORTQuantizer.from_pretrained(
+                        export_dir, file_name=f"{file_name}.onnx"
+                    ).quantize(
+                        save_dir=quantized_dir,
+                        quantization_config=quantization_config,
+                    )
+        except Exception:
+            # Do not pick up a partial model on the next run
+            shutil.rmtree(quantized_dir, ignore_errors=True)
+            raise
+
+    return SummarizationModel(
+        tokenizer=AutoTokenizer.from_pretrained(model_name),
+        model=ORTModelForSeq2SeqLM.from_pretrained(
+            quantized_dir,
+            encoder_file_name="encoder_model_quantized.onnx",
+            decoder_file_name="decoder_model_quantized.onnx",
+            decoder_with_past_file_name="decoder_with_past_model_quantized.onnx",
+        ),
+        backend=SummarizationBackend.ONNX,
+    )
+
+
+def get_summarization_model(
+    model_name: str = MODEL_NAME,
+    backend: SummarizationBackend = SummarizationBackend.TORCH,
+) -> SummarizationModel:
+    """
+    Load the model the first time it is requested and share it
+    across the process. If the ONNX backend is not available or
+    the model cannot be exported, we fall back to PyTorch.
+    """
+    key = (model_name, backend)
+    model = _models.get(key)
+    if model is not None:
+        return model
+
+    with _models_lock:
+        if key not in _models:
+            if backend == SummarizationBackend.ONNX:
+                try:
+                    _models[key] = _load_onnx_model(model_name)
+                except ModuleNotFoundError as exc:
+                    logger.warning(
+                        f"Cannot use the ONNX summarization backend, using torch - {exc}."
+                        " Install it with `pip install openmetadata-ingestion[summarization-onnx]`."
+                    )
+                    backend = SummarizationBackend.TORCH
+                except Exception as exc:
+                    logger.debug(traceback.format_exc())
+                    logger.warning(
+                        f"Cannot load the ONNX summarization model, using torch - {exc}"
+                    )
+                    backend = SummarizationBackend.TORCH
+            if backend == SummarizationBackend.TORCH:
+                torch_key = (model_name, SummarizationBackend.TORCH)
+                if torch_key not in _models:
+                    logger.info(f"Loading the summarization model {model_name}")
+                    _models[torch_key] = _load_torch_model(model_name)
+                _models[key] = _models[torch_key]
+        return _models[key]
+
+
+def _ensure_nltk_data(pkgs: List[str]) -> None:
+    """Download the NLTK tokenizers once per process if they are missing"""
+    global _nltk_ready  # pylint: disable=global-statement
+    if _nltk_ready:
+        return
+    from nltk.data import find  # pylint: disable=import-outside-toplevel
+
+    for pkg in pkgs:
+        try:
+            find(pkg)
+        except LookupError:
+            pkg_download(pkg)
+    _nltk_ready = True
+
+
+def _backend_from_env() -> SummarizationBackend:
+    """Backend picked in the environment, torch if it is not a known one"""
+    value = os.environ.get(SUMMARIZATION_BACKEND_ENV, SummarizationBackend.TORCH.value)
+    try:
+        return SummarizationBackend(value.lower())
+    except ValueError:
+        logger.warning(
+            f"Unknown {SUMMARIZATION_BACKEND_ENV} [{value}], using"
+            f" [{SummarizationBackend.TORCH.value}]. Pick one of"
+            f" {[backend.value for backend in SummarizationBackend]}."
+        )
+        return SummarizationBackend.TORCH
 
-model = AutoModelForSeq2SeqLM.from_pretrained('eenzeenee/t5-base-korean-summarization')
-tokenizer = AutoTokenizer.from_pretrained('eenzeenee/t5-base-korean-summarization')
 
 class Summarization:
     prefix = "summarize: "
     pkgs = ["punkt", "punkt_tab"]
 
-    def __init__(self):
-        for pkg in self.pkgs:
-            try:
-                find(pkg)
-            except LookupError:
-                pkg_download(pkg)
-
+    def __init__(
+        self,
+        model_name: str = MODEL_NAME,
+        backend: Optional[SummarizationBackend] = None,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+    ):
+        # Nothing is loaded until the first summary
+        self.model_name = model_name
+        self.backend = backend or _backend_from_env()
+        self.max_batch_size = max_batch_size
+        # Throughput counters over every summarize_many call
+        self.documents = 0
+        self.input_tokens = 0
+        self.seconds = 0.0
 
     def summarize(self, text):
-        inputs = [self.prefix + text]
+        return self.summarize_many([text])[0]
 
-        inputs = tokenizer(inputs, max_length=512, truncation=True, return_tensors="pt")
-        output = model.generate(**inputs, num_beams=3, do_sample=True, min_length=10, max_length=100)
-        decoded_output = tokenizer.batch_decode(output, skip_special_tokens=True)[0]
-        result = nltk.sent_tokenize(decoded_output.strip())[0]
+    def summarize_many(self, texts: List[str]) -> List[str]:
+        """
+        Summarize the texts in batches of at most `max_batch_size`.
+        Texts of similar length are batched together so that padding
+        them to the same length wastes as little compute as possible.
+        The summaries are returned in the order of `texts`.
+        """
+        import nltk  # pylint: disable=import-outside-toplevel
+
+        _ensure_nltk_data(self.pkgs)
+        model = get_summarization_model(self.model_name, self.backend)
+
+        start_time = time.perf_counter()
+        order = sorted(range(len(texts)), key=lambda index: len(texts[index]))
+        results: List[str] = [""] * len(texts)
+        for start in range(0, len(order), self.max_batch_size):
+            indexes = order[start : start + self.max_batch_size]
+            batch = [self.prefix + texts[index] for index in indexes]
+            with model.lock:
+                inputs = model.tokenizer(
+                    batch,
+                    max_length=MAX_INPUT_LENGTH,
+                    truncation=True,
+                    padding=True,
+                    return_tensors="pt",
+                )
+                output = model.model.generate(
+                    **inputs, num_beams=3, do_sample=True, min_length=10, max_length=100
+                )
+                decoded_output = model.tokenizer.batch_decode(
+                    output, skip_special_tokens=True
+                )
+            if "attention_mask" in inputs:
+                # Tokens of the texts, without the padding
+                self.input_tokens += int(inputs["attention_mask"].sum())
+            for index, summary in zip(indexes, decoded_output):
+                sentences = nltk.sent_tokenize(summary.strip())
+                results[index] = sentences[0] if sentences else ""
+
+        self.documents += len(texts)
+        self.seconds += time.perf_counter() - start_time
+        return results
 
-        return result
 
 def pkg_download(pkg_name):
+    import nltk  # pylint: disable=import-outside-toplevel
+
     try:
         _create_default_https_context = ssl._create_default_https_context
         ssl._create_default_https_context = ssl._create_unverified_context
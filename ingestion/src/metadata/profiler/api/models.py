@@ -106,6 +106,12 @@ class ProfilerProcessorConfig(ConfigModel):
     tableConfig: Optional[List[TableConfig]] = None
     schemaConfig: Optional[List[DatabaseAndSchemaConfig]] = []
     databaseConfig: Optional[List[DatabaseAndSchemaConfig]] = []
+    # Number of tables profiled at the same time
+    tableThreads: int = 1
+    # Max number of tables of the same database profiled at the same time
+    maxTablesPerDatabase: Optional[int] = None
+    # Send the results to the next steps in the order the tables were listed
+    orderedResults: bool = True
 
 
 class ProfilerResponse(ConfigModel):
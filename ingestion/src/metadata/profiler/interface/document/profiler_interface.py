@@ -9,9 +9,7 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 #  pylint: disable=arguments-differ
-import os
-import uuid
-from typing import Any, Optional, Dict, List
+from typing import Any, BinaryIO, Dict, List, Optional, Union
 
 from sqlalchemy import Column
 
@@ -19,14 +17,21 @@ from metadata.generated.schema.tests.customMetric import CustomMetric
 from metadata.profiler.interface.profiler_interface import ProfilerInterface
 from metadata.profiler.metrics.registry import Metrics
 from metadata.profiler.processor.runner import QueryRunner
-from metadata.readers.file.s3 import S3Reader
-from metadata.utils.local_dir import ensure_directory_exists
+from metadata.readers.file.document import open_document
 from metadata.utils.logger import profiler_interface_registry_logger
+from metadata.utils.word.document_cache import (
+    document_key,
+    get_document_cache,
+    sample_from_text,
+)
 from metadata.utils.word.hwp_extractor import HwpMetadataExtractor
 from metadata.utils.word.ms_word_extractor import MsWordMetadataExtractor
 
 logger = profiler_interface_registry_logger()
 
+# Characters of text we keep as sample of a document
+SAMPLE_SIZE = 1000
+
 
 class DocumentProfilerInterface(ProfilerInterface):
     """
@@ -74,57 +79,53 @@ class DocumentProfilerInterface(ProfilerInterface):
         #     profile_sample_config = profile_sample_config,
         # )
 
-    def _get_document_data(self, bucket_name: str, key: str) -> Optional[str]:
-        """
-        Read the word document from the bucket
-        """
-        local_dir_path = os.environ.get('AIRFLOW_HOME') + "/tmp"
-        # 다운로드 디렉토리 확인 및 생성
-        ensure_directory_exists(local_dir_path)
-
-        file_extension = key.split('.')[-1]
-        local_file_path = f"{local_dir_path}/{uuid.uuid4().hex}.{file_extension}"
-
-        try:
-            s3reader = S3Reader(self.client)
-            s3reader.download(key, local_file_path=local_file_path, bucket_name=bucket_name, verbose=True)
-            return local_file_path
-        except Exception as e:
-            logger.error(e)
-            return None
-
     def fetch_sample_data(self, **kwargs) -> Optional[str]:
         """
-        Fetch sample data from minio document(doc, hwp)
+        Fetch sample data from minio document(doc, hwp).
+        With the document cache, we reuse the text extracted by the
+        metadata ingestion or by a previous run.
         """
-        local_file_path = ""
         try:
             bucket_name = self.table_entity.fullPath.replace("s3://", "").split("/")[0]
             path = str(self.table_entity.prefix).strip('/')
-            local_file_path = self._get_document_data(bucket_name, path)
-            if local_file_path is None:
-                return None
             file_extension = path.split('.')[-1]
             if file_extension == "hwp" or file_extension == "hwpx":
-                return self.get_hwp_sample(local_file_path)
+                get_sample = self.get_hwp_sample
             elif file_extension == "docx" or file_extension == "doc":
-                return self.get_word_sample(local_file_path)
+                get_sample = self.get_word_sample
             else:
                 logger.warn("Unsupported file type")
                 return None
+
+            head = self.client.head_object(Bucket=bucket_name, Key=path)
+            cache = get_document_cache()
+            cache_key = document_key(head["ETag"]) if cache and head.get("ETag") else None
+            entry = (cache.get(cache_key) if cache_key else None) or {}
+            samples = entry.get("samples", {})
+            if str(SAMPLE_SIZE) in samples:
+                return samples[str(SAMPLE_SIZE)]
+            if entry.get("text") is not None:
+                return sample_from_text(entry["text"], SAMPLE_SIZE, file_extension)
+
+            with open_document(
+                    self.client, bucket_name, path, size=head["ContentLength"]
+            ) as document:
+                sample = get_sample(document)
+            if cache_key:
+                cache.update(cache_key, samples={**samples, str(SAMPLE_SIZE): sample})
+            return sample
         except Exception as e:
             logger.error(e)
-        finally:
-            os.remove(local_file_path)
+            return None
 
-    def get_hwp_sample(self, local_file_path):
-        hwp_extractor = HwpMetadataExtractor(local_file_path)
-        sample_data = hwp_extractor.get_sample_data(1000)
+    def get_hwp_sample(self, document: Union[str, BinaryIO]):
+        hwp_extractor = HwpMetadataExtractor(document)
+        sample_data = hwp_extractor.get_sample_data(SAMPLE_SIZE)
         return sample_data
 
-    def get_word_sample(self, local_file_path):
-        word_extractor = MsWordMetadataExtractor(local_file_path)
-        sample_text = word_extractor.get_sample_data(1000)
+    def get_word_sample(self, document: Union[str, BinaryIO]):
+        word_extractor = MsWordMetadataExtractor(document)
+        sample_text = word_extractor.get_sample_data(SAMPLE_SIZE)
         return sample_text
 
     def _get_sampler(self):
@@ -36,6 +36,8 @@ from metadata.profiler.api.models import ThreadPoolMetrics
 from metadata.profiler.interface.profiler_interface import ProfilerInterface
 from metadata.profiler.metrics.core import MetricTypes
 from metadata.profiler.metrics.registry import Metrics
+from metadata.profiler.metrics.sketches import KllSketch, get_approximate_config
+from metadata.profiler.orm.registry import is_quantifiable
 from metadata.profiler.processor.metric_filter import MetricFilter
 from metadata.utils.constants import COMPLEX_COLUMN_SEPARATOR, SAMPLE_DATA_DEFAULT_COUNT
 from metadata.utils.datalake.datalake_utils import GenericDataFrameColumnParser
@@ -86,6 +88,8 @@ class PandasProfilerInterface(ProfilerInterface, PandasInterfaceMixin):
         )
 
         self.client = self.connection.client
+        # Distinct / unique counts are exact unless the sketches are enabled
+        self.approximate_metrics = get_approximate_config(self.source_config)
         self.dfs = self.return_ometa_dataframes_sampled(
             service_connection_config=self.service_connection_config,
             client=self.client,
@@ -201,7 +205,9 @@ class PandasProfilerInterface(ProfilerInterface, PandasInterfaceMixin):
         row_dict = {}
         try:
             for metric in metrics:
-                metric_resp = metric(column).df_fn(runner)
+                metric_resp = metric(
+                    column, approximate=self.approximate_metrics
+                ).df_fn(runner)
                 row_dict[metric.name()] = (
                     None if pd.isnull(metric_resp) else metric_resp
                 )
@@ -230,7 +236,9 @@ class PandasProfilerInterface(ProfilerInterface, PandasInterfaceMixin):
             dictionnary of results
         """
         col_metric = None
-        col_metric = metric(column).df_fn(runner)
+        col_metric = metric(column, approximate=self.approximate_metrics).df_fn(
+            runner
+        )
         if not col_metric:
             return None
         return {metric.name(): col_metric}
@@ -245,13 +253,21 @@ class PandasProfilerInterface(ProfilerInterface, PandasInterfaceMixin):
     ):
         """
         Given a list of metrics, compute the given results
-        and returns the values
+        and returns the values. The percentile metrics of a
+        column share a single pass over the dataframes.
         """
 
         try:
             metric_values = {}
+            sketch = (
+                KllSketch.from_columns(df[column.name] for df in runner)
+                if is_quantifiable(column.type)
+                else None
+            )
             for metric in metrics:
-                metric_values[metric.name()] = metric(column).df_fn(runner)
+                metric_values[metric.name()] = metric(column, sketch=sketch).df_fn(
+                    runner
+                )
             return metric_values if metric_values else None
         except Exception as exc:
             logger.debug(traceback.format_exc())
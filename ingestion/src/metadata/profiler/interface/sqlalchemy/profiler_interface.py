@@ -20,7 +20,7 @@ import threading
 import traceback
 from collections import defaultdict
 from datetime import datetime, timezone
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from sqlalchemy import Column, inspect, text
 from sqlalchemy.exc import DBAPIError, ProgrammingError, ResourceClosedError
@@ -53,6 +53,9 @@ OVERFLOW_ERROR_CODES = {
     "snowflake": {100046, 100058},
 }
 
+# Max number of metric expressions in the SELECT list of a fused static metrics query
+FUSED_STATIC_METRICS_MAX_WIDTH = 500
+
 
 def handle_query_exception(msg, exc, session):
     """Handle exception for query runs"""
@@ -241,6 +244,37 @@ class SQAProfilerInterface(ProfilerInterface, SQAInterfaceMixin):
             handle_query_exception(msg, exc, session)
         return None
 
+    @staticmethod
+    def _compute_fused_static_metrics(
+        metric_funcs: List[ThreadPoolMetrics],
+        runner: QueryRunner,
+    ) -> Dict[str, dict]:
+        """Compute the static metrics of all the given columns in a single query
+
+        Each metric expression is labeled by its position in the SELECT list,
+        so that the metric names do not collide between columns.
+
+        Returns:
+            dictionary of results by column name
+        """
+        entities = []
+        positions: List[Tuple[str, str]] = []
+        for metric_func in metric_funcs:
+            for metric in metric_func.metrics:
+                if metric.is_window_metric():
+                    continue
+                expression = metric(metric_func.column).fn()
+                if expression is None:
+                    continue
+                positions.append((metric_func.column.name, expression.name))
+                entities.append(expression.element.label(f"m{len(entities)}"))
+
+        row = runner.select_first_from_sample(*entities)
+        results = {metric_func.column.name: {} for metric_func in metric_funcs}
+        for (column_name, metric_name), value in zip(positions, row or []):
+            results[column_name][metric_name] = value
+        return results
+
     def _compute_query_metrics(
         self,
         metric: Metrics,
@@ -467,6 +501,71 @@ class SQAProfilerInterface(ProfilerInterface, SQAInterfaceMixin):
 
             return row, column, metric_func.metric_type.value
 
+    def compute_fused_metrics_in_thread(
+        self,
+        metric_funcs: List[ThreadPoolMetrics],
+    ) -> List[Tuple[Optional[dict], str, str]]:
+        """Run the static metrics of many columns with a single query in a processor worker.
+
+        If the fused metrics fail, e.g., due to an overflow in one of the columns
+        or a metric that cannot be built for a column type, we fall back to one
+        query per column.
+        """
+        table = metric_funcs[0].table
+        logger.debug(
+            f"Running fused static metrics for {len(metric_funcs)} columns of {table.__tablename__}"
+            f" on thread {threading.current_thread()}"
+        )
+        Session = self.session_factory  # pylint: disable=invalid-name
+        with Session() as session:
+            self.set_session_tag(session)
+            self.set_catalog(session)
+            sampler = self._create_thread_safe_sampler(session, table)
+            # Sample the whole table, since we need all the columns in the same query
+            sample = sampler.random_sample()
+            runner = self._create_thread_safe_runner(session, table, sample)
+
+            try:
+                results = self._compute_fused_static_metrics(metric_funcs, runner)
+            except Exception as exc:
+                logger.debug(traceback.format_exc())
+                logger.info(
+                    f"Could not compute the fused static metrics for {table.__tablename__},"
+                    f" computing them column by column: {exc}"
+                )
+                session.rollback()
+                return [
+                    self.compute_metrics_in_thread(metric_func)
+                    for metric_func in metric_funcs
+                ]
+
+        rows = []
+        for metric_func in metric_funcs:
+            column = metric_func.column.name
+            self.status.scanned(f"{table.__tablename__}.{column}")
+            rows.append((results.get(column), column, MetricTypes.Static.value))
+        return rows
+
+    def _fuse_static_metric_funcs(self, metric_funcs: List[ThreadPoolMetrics]) -> list:
+        """
+        Group the static metrics of the columns in batches of at most
+        FUSED_STATIC_METRICS_MAX_WIDTH metrics, to run each batch in a single query
+        """
+        batches, others = [], []
+        batch, width = [], 0
+        for metric_func in metric_funcs:
+            if metric_func.metric_type != MetricTypes.Static or metric_func.column is None:
+                others.append(metric_func)
+                continue
+            if batch and width + len(metric_func.metrics) > FUSED_STATIC_METRICS_MAX_WIDTH:
+                batches.append(batch)
+                batch, width = [], 0
+            batch.append(metric_func)
+            width += len(metric_func.metrics)
+        if batch:
+            batches.append(batch)
+        return others + batches
+
     # pylint: disable=use-dict-literal
     def get_all_metrics(
         self,
@@ -475,13 +574,19 @@ class SQAProfilerInterface(ProfilerInterface, SQAInterfaceMixin):
         """get all profiler metrics"""
         logger.debug(f"Computing metrics with {self._thread_count} threads.")
         profile_results = {"table": dict(), "columns": defaultdict(dict)}
+        metric_funcs = MetricFilter.filter_empty_metrics(metric_funcs)
+        if getattr(self.source_config, "fuseStaticMetrics", False):
+            metric_funcs = self._fuse_static_metric_funcs(metric_funcs)
+
         with CustomThreadPoolExecutor(max_workers=self._thread_count) as pool:
             futures = [
                 pool.submit(
-                    self.compute_metrics_in_thread,
+                    self.compute_fused_metrics_in_thread
+                    if isinstance(metric_func, list)
+                    else self.compute_metrics_in_thread,
                     metric_func,
                 )
-                for metric_func in MetricFilter.filter_empty_metrics(metric_funcs)
+                for metric_func in metric_funcs
             ]
 
             for future in futures:
@@ -489,28 +594,12 @@ class SQAProfilerInterface(ProfilerInterface, SQAInterfaceMixin):
                     continue
 
                 try:
-                    profile, column, metric_type = future.result(
-                        timeout=self.timeout_seconds
-                    )
-                    if metric_type != MetricTypes.System.value and not isinstance(
-                        profile, dict
+                    result = future.result(timeout=self.timeout_seconds)
+                    for profile, column, metric_type in (
+                        result if isinstance(result, list) else [result]
                     ):
-                        profile = dict()
-                    if metric_type == MetricTypes.Table.value:
-                        profile_results["table"].update(profile)
-                    elif metric_type == MetricTypes.System.value:
-                        profile_results["system"] = profile
-                    elif metric_type == MetricTypes.Custom.value and column is None:
-                        profile_results["table"].update(profile)
-                    else:
-                        profile_results["columns"][column].update(
-                            {
-                                "name": column,
-                                "timestamp": int(
-                                    datetime.now(tz=timezone.utc).timestamp() * 1000
-                                ),
-                                **profile,
-                            }
+                        self._update_profile_results(
+                            profile_results, profile, column, metric_type
                         )
                 except concurrent.futures.TimeoutError as exc:
                     pool.shutdown39(wait=True, cancel_futures=True)
@@ -520,6 +609,28 @@ class SQAProfilerInterface(ProfilerInterface, SQAInterfaceMixin):
 
         return profile_results
 
+    @staticmethod
+    def _update_profile_results(
+        profile_results: dict, profile, column: Optional[str], metric_type: str
+    ) -> None:
+        """Add the metrics computed in a worker to the profile results"""
+        if metric_type != MetricTypes.System.value and not isinstance(profile, dict):
+            profile = dict()
+        if metric_type == MetricTypes.Table.value:
+            profile_results["table"].update(profile)
+        elif metric_type == MetricTypes.System.value:
+            profile_results["system"] = profile
+        elif metric_type == MetricTypes.Custom.value and column is None:
+            profile_results["table"].update(profile)
+        else:
+            profile_results["columns"][column].update(
+                {
+                    "name": column,
+                    "timestamp": int(datetime.now(tz=timezone.utc).timestamp() * 1000),
+                    **profile,
+                }
+            )
+
     def fetch_sample_data(self, table, columns) -> TableData:
         """Fetch sample data from database
 
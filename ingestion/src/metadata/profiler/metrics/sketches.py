@@ -0,0 +1,274 @@
+#  Copyright 2021 Collate
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""
+Mergeable sketches used to approximate the metrics of dataframe based
+sources (e.g., Datalake) without holding every value in memory.
+
+Each sketch is updated chunk by chunk (with the 64-bit hashes of the
+column values for the count sketches, with the values themselves for
+the quantile sketch) and can be merged with another sketch of the same size.
+"""
+import json
+import math
+from typing import Iterable, Optional
+
+import numpy as np
+
+from metadata.generated.schema.metadataIngestion.databaseServiceProfilerPipeline import (
+    ApproximateMetricsConfig,
+)
+
+HLL_MIN_PRECISION = 4
+HLL_MAX_PRECISION = 18
+# Values retained by the top level of the KLL sketch. The rank error is ~1.65 / k.
+# Columns with fewer values than this are never compacted, so their quantiles are exact.
+KLL_DEFAULT_K = 2048
+KLL_CAPACITY_DECAY = 2 / 3
+
+
+def hash_values(values) -> np.ndarray:
+    """
+    Vectorized 64-bit hashes of the non-null values of a pandas Series.
+    Unhashable values (e.g., lists or dicts from JSON files) are hashed
+    from their JSON representation.
+    """
+    import pandas as pd  # pylint: disable=import-outside-toplevel
+
+    values = values.dropna()
+    try:
+        hashes = pd.util.hash_pandas_object(values, index=False)
+    except TypeError:
+        hashes = pd.util.hash_pandas_object(
+            values.map(lambda value: json.dumps(value, default=str)), index=False
+        )
+    return hashes.to_numpy(dtype=np.uint64)
+
+
+def get_approximate_config(source_config) -> Optional[ApproximateMetricsConfig]:
+    """Return the approximate metrics config if the sketches are enabled"""
+    config = getattr(source_config, "approximateMetrics", None)
+    return config if config and config.enabled else None
+
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct count sketch. The relative standard error
+    is 1.04 / sqrt(2 ** precision).
+    """
+
+    def __init__(self, precision: int = 14):
+        if not HLL_MIN_PRECISION <= precision <= HLL_MAX_PRECISION:
+            raise ValueError(
+                f"HyperLogLog precision must be between {HLL_MIN_PRECISION}"
+                f" and {HLL_MAX_PRECISION}, got {precision}"
+            )
+        self.precision = precision
+        self.num_registers = 1 << precision
+        self.registers = np.zeros(self.num_registers, dtype=np.uint8)
+
+    @classmethod
+    def from_error(cls, relative_error: float) -> "HyperLogLog":
+        precision = math.ceil(math.log2((1.04 / relative_error) ** 2))
+        return cls(min(max(precision, HLL_MIN_PRECISION), HLL_MAX_PRECISION))
+
+    def update(self, hashes: np.ndarray) -> None:
+        """Add a chunk of 64-bit hashes"""
+        if not hashes.size:
+            return
+        value_bits = 64 - self.precision
+        index = (hashes >> np.uint64(value_bits)).astype(np.int64)
+        remainder = hashes & np.uint64((1 << value_bits) - 1)
+        # rank = position of the leftmost 1 in the remaining bits
+        _, exponent = np.frexp(remainder.astype(np.float64))
+        rank = np.where(remainder == 0, value_bits + 1, value_bits - exponent + 1)
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        """Estimated number of distinct values"""
+        registers = self.num_registers
+        alpha = 0.7213 / (1 + 1.079 / registers)
+        raw = alpha * registers**2 / np.sum(np.ldexp(1.0, -self.registers.astype(int)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        # Linear counting is more accurate for small cardinalities
+        if raw <= 2.5 * registers and zeros:
+            return round(registers * math.log(registers / zeros))
+        return round(raw)
+
+
+class BottomKSketch:
+    """
+    Keep the k smallest distinct hashes with their exact frequencies.
+
+    A hash in the global bottom-k is never evicted once seen, so its
+    frequency is exact and the retained hashes are a uniform sample of
+    the distinct values. The share of them seen only once estimates the
+    share of unique values, with a relative error of ~1 / sqrt(k).
+    """
+
+    def __init__(self, k: int = 10000):
+        self.k = k
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.counts = np.empty(0, dtype=np.int64)
+
+    @classmethod
+    def from_error(cls, relative_error: float) -> "BottomKSketch":
+        return cls(math.ceil(1 / relative_error**2))
+
+    def update(self, hashes: np.ndarray) -> None:
+        """Add a chunk of 64-bit hashes"""
+        if not hashes.size:
+            return
+        chunk_hashes, chunk_counts = np.unique(hashes, return_counts=True)
+        self._merge_arrays(chunk_hashes[: self.k], chunk_counts[: self.k])
+
+    def merge(self, other: "BottomKSketch") -> None:
+        if other.k != self.k:
+            raise ValueError("Cannot merge bottom-k sketches of different size")
+        self._merge_arrays(other.hashes, other.counts)
+
+    def _merge_arrays(self, hashes: np.ndarray, counts: np.ndarray) -> None:
+        merged, inverse = np.unique(
+            np.concatenate((self.hashes, hashes)), return_inverse=True
+        )
+        merged_counts = np.bincount(
+            inverse, weights=np.concatenate((self.counts, counts))
+        ).astype(np.int64)
+        self.hashes = merged[: self.k]
+        self.counts = merged_counts[: self.k]
+
+    def unique_ratio(self) -> float:
+        """Share of the distinct values seen exactly once"""
+        if not self.hashes.size:
+            return 0.0
+        return float(np.count_nonzero(self.counts == 1)) / self.hashes.size
+
+    def is_exact(self) -> bool:
+        """We hold every distinct value"""
+        return self.hashes.size < self.k
+
+
+def approximate_distinct_count(
+    columns: Iterable, config: ApproximateMetricsConfig
+) -> int:
+    """Distinct count of the column chunks using a HyperLogLog sketch"""
+    sketch = HyperLogLog.from_error(config.distinctCountError)
+    for values in columns:
+        sketch.update(hash_values(values))
+    return sketch.estimate()
+
+
+def approximate_unique_count(
+    columns: Iterable, config: ApproximateMetricsConfig
+) -> int:
+    """
+    Unique count of the column chunks: the unique ratio of a bottom-k
+    sketch applied to the HyperLogLog distinct count.
+    """
+    distinct = HyperLogLog.from_error(config.distinctCountError)
+    bottom_k = BottomKSketch.from_error(config.uniqueCountError)
+    for values in columns:
+        hashes = hash_values(values)
+        distinct.update(hashes)
+        bottom_k.update(hashes)
+    if bottom_k.is_exact():
+        return int(np.count_nonzero(bottom_k.counts == 1))
+    return round(bottom_k.unique_ratio() * distinct.estimate())
+
+
+class KllSketch:
+    """
+    KLL quantile sketch: a stack of compactors where level h holds
+    values of weight 2 ** h. When a level is over capacity we sort it
+    and promote every other value (with a random offset) to the next one.
+    It retains O(k log(n / k)) values and its quantiles are exact as long
+    as no compaction happened.
+    """
+
+    def __init__(self, k: int = KLL_DEFAULT_K, seed: Optional[int] = None):
+        self.k = k
+        self.count = 0
+        self.levels = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+
+    @classmethod
+    def from_columns(cls, columns: Iterable, **kwargs) -> "KllSketch":
+        """Sketch the numeric values of the column chunks"""
+        sketch = cls(**kwargs)
+        for values in columns:
+            sketch.update(values.to_numpy(dtype=np.float64, na_value=np.nan))
+        return sketch
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(math.ceil(self.k * KLL_CAPACITY_DECAY**depth), 2)
+
+    def update(self, values: np.ndarray) -> None:
+        """Add a chunk of values, skipping the NaNs"""
+        values = values[~np.isnan(values)]
+        if not values.size:
+            return
+        self.count += values.size
+        self.levels[0] = np.concatenate((self.levels[0], values))
+        self._compress()
+
+    def merge(self, other: "KllSketch") -> None:
+        if other.k != self.k:
+            raise ValueError("Cannot merge KLL sketches of different size")
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype=np.float64))
+        for level, values in enumerate(other.levels):
+            self.levels[level] = np.concatenate((self.levels[level], values))
+        self.count += other.count
+        self._compress()
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            if self.levels[level].size > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype=np.float64))
+                values = np.sort(self.levels[level])
+                # an odd value out stays in this level
+                keep = values.size % 2
+                offset = self._rng.integers(2)
+                self.levels[level + 1] = np.concatenate(
+                    (self.levels[level + 1], values[keep + offset :: 2])
+                )
+                self.levels[level] = values[:keep]
+            level += 1
+
+    def is_exact(self) -> bool:
+        return len(self.levels) == 1
+
+    def quantile(self, quantile: float, interpolation: str = "linear") -> Optional[float]:
+        """
+        Value at the given quantile. The interpolation follows pandas
+        when the sketch is exact and is ignored otherwise.
+        """
+        if not self.count:
+            return None
+        if self.is_exact():
+            return float(np.quantile(self.levels[0], quantile, method=interpolation))
+
+        values = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [np.full(level.size, 2**height) for height, level in enumerate(self.levels)]
+        )
+        order = np.argsort(values, kind="stable")
+        values, weights = values[order], weights[order]
+        # each value stands for the ranks it covers: interpolate between their centers
+        centers = np.cumsum(weights) - weights / 2
+        return float(np.interp(quantile * self.count, centers, values))
@@ -20,6 +20,7 @@ from sqlalchemy import column, distinct, func
 
 from metadata.generated.schema.configuration.profilerConfiguration import MetricType
 from metadata.profiler.metrics.core import StaticMetric, _label
+from metadata.profiler.metrics.sketches import approximate_distinct_count
 from metadata.profiler.orm.functions.count import CountFn
 from metadata.utils.logger import profiler_logger
 
@@ -50,12 +51,21 @@ class DistinctCount(StaticMetric):
 
     def df_fn(self, dfs=None):
         """
-        Distinct Count metric for Datalake
+        Distinct Count metric for Datalake.
+
+        If the `approximate` kwarg holds an enabled ApproximateMetricsConfig,
+        we estimate it with a HyperLogLog sketch instead of counting every value.
         """
         # pylint: disable=import-outside-toplevel
         from collections import Counter
 
         try:
+            approximate = getattr(self, "approximate", None)
+            if approximate:
+                return approximate_distinct_count(
+                    (df[self.col.name] for df in dfs), approximate
+                )
+
             counter = Counter()
             for df in dfs:
                 df_col_value = df[self.col.name].dropna().to_list()
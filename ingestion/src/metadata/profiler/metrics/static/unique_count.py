@@ -20,6 +20,7 @@ from sqlalchemy.orm import DeclarativeMeta, Session
 
 from metadata.generated.schema.configuration.profilerConfiguration import MetricType
 from metadata.profiler.metrics.core import QueryMetric
+from metadata.profiler.metrics.sketches import approximate_unique_count
 from metadata.profiler.orm.functions.unique_count import _unique_count_query_mapper
 from metadata.profiler.orm.registry import NOT_COMPUTE
 from metadata.utils.logger import profiler_logger
@@ -66,11 +67,20 @@ class UniqueCount(QueryMetric):
 
     def df_fn(self, dfs=None):
         """
-        Build the Unique Count metric
+        Build the Unique Count metric.
+
+        If the `approximate` kwarg holds an enabled ApproximateMetricsConfig,
+        we estimate it with mergeable sketches instead of counting every value.
         """
         from collections import Counter  # pylint: disable=import-outside-toplevel
 
         try:
+            approximate = getattr(self, "approximate", None)
+            if approximate:
+                return approximate_unique_count(
+                    (df[self.col.name] for df in dfs), approximate
+                )
+
             counter = Counter()
             for df in dfs:
                 df_col_value = df[self.col.name].dropna().to_list()
@@ -14,8 +14,6 @@ First Quartile definition
 """
 # pylint: disable=duplicate-code
 
-from typing import List, cast
-
 from sqlalchemy import column
 
 from metadata.generated.schema.configuration.profilerConfiguration import MetricType
@@ -74,26 +72,8 @@ class FirstQuartile(StaticMetric, PercentilMixin):
 
     def df_fn(self, dfs=None):
         """Dataframe function"""
-        # pylint: disable=import-outside-toplevel
-        import pandas as pd
-
-        df = cast(List[pd.DataFrame], dfs)
-
         if is_quantifiable(self.col.type):
-            # we can't compute the first quartile unless we have
-            # the entire set. Median of Medians could be used
-            # though it would required set to be sorted before hand
-            try:
-                df = pd.concat([df[self.col.name] for df in dfs])
-            except MemoryError:
-                logger.error(
-                    f"Unable to compute Median for {self.col.name} due to memory constraints."
-                    f"We recommend using a smaller sample size or partitionning."
-                )
-                return None
-            # check if nan
-            first_quartile = df.quantile(0.25, interpolation="midpoint")
-            return None if pd.isnull(first_quartile) else first_quartile
+            return self._compute_df_fn(dfs, 0.25, interpolation="midpoint")
         logger.debug(
             f"Don't know how to process type {self.col.type} when computing First Quartile"
         )
@@ -14,8 +14,6 @@ Median Metric definition
 """
 # pylint: disable=duplicate-code
 
-from typing import List, cast
-
 from sqlalchemy import column
 
 from metadata.generated.schema.configuration.profilerConfiguration import MetricType
@@ -74,29 +72,8 @@ class Median(StaticMetric, PercentilMixin):
 
     def df_fn(self, dfs=None):
         """Dataframe function"""
-        import pandas as pd  # pylint: disable=import-outside-toplevel
-
-        dfs = cast(List[pd.DataFrame], dfs)
-
         if is_quantifiable(self.col.type):
-            # we can't compute the median unless we have
-            # the entire set. Median of Medians could be used
-            # though it would required set to be sorted before hand
-            try:
-                df = pd.concat([df[self.col.name] for df in dfs])
-            except MemoryError:
-                logger.error(
-                    f"Unable to compute Median for {self.col.name} due to memory constraints."
-                    f"We recommend using a smaller sample size or partitionning."
-                )
-                return None
-            try:
-                median = df.median()
-            except Exception as err:
-                logger.error(
-                    f"Unable to compute Median for {self.col.name} due to error: {err}"
-                )
-            return None if pd.isnull(median) else median
+            return self._compute_df_fn(dfs, 0.5)
         logger.debug(
             f"Don't know how to process type {self.col.type} when computing Median"
         )
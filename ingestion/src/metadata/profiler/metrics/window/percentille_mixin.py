@@ -1,9 +1,36 @@
 """function calls shared accross all percentile metrics"""
 
+from typing import Optional
+
+from metadata.profiler.metrics.sketches import KllSketch
 from metadata.profiler.orm.functions.median import MedianFn
+from metadata.utils.logger import profiler_logger
+
+logger = profiler_logger()
 
 
 class PercentilMixin:
     def _compute_sqa_fn(self, column, table, percentile):
         """Generic method to compute the quartile using sqlalchemy"""
         return MedianFn(column, table, percentile)
+
+    def _compute_df_fn(
+        self, dfs, percentile: float, interpolation: str = "linear"
+    ) -> Optional[float]:
+        """
+        Generic method to compute the quartile of dataframes. The chunks are
+        consumed one by one by a KLL sketch, so memory does not grow with the
+        size of the file. The interfaces can pass a `sketch` kwarg to share the
+        same sketch across the percentile metrics of a column.
+        """
+        sketch = getattr(self, "sketch", None)
+        if sketch is None:
+            try:
+                sketch = KllSketch.from_columns(df[self.col.name] for df in dfs)
+            except (TypeError, ValueError) as err:
+                logger.error(
+                    f"Unable to compute percentile {percentile} for {self.col.name}"
+                    f" due to error: {err}"
+                )
+                return None
+        return sketch.quantile(percentile, interpolation)
@@ -11,8 +11,11 @@
 """
 Profiler Processor Step
 """
+import threading
 import traceback
-from typing import Optional, cast
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Deque, Dict, Iterable, Optional, cast
 
 from metadata.generated.schema.entity.services.ingestionPipelines.status import (
     StackTraceError,
@@ -31,6 +34,9 @@ from metadata.ingestion.ometa.ometa_api import OpenMetadata
 from metadata.profiler.api.models import ProfilerProcessorConfig, ProfilerResponse
 from metadata.profiler.processor.core import Profiler
 from metadata.profiler.source.metadata import ProfilerSourceAndEntity
+from metadata.utils.logger import profiler_logger
+
+logger = profiler_logger()
 
 
 class ProfilerProcessor(Processor):
@@ -50,10 +56,17 @@ class ProfilerProcessor(Processor):
             DatabaseServiceProfilerPipeline, self.config.source.sourceConfig.config
         )  # Used to satisfy type checked
 
+        self._database_budgets: Dict[str, threading.BoundedSemaphore] = {}
+        self._budgets_lock = threading.Lock()
+
     @property
     def name(self) -> str:
         return "Profiler"
 
+    @property
+    def is_parallel(self) -> bool:
+        return self.profiler_config.tableThreads > 1
+
     def _run(self, record: ProfilerSourceAndEntity) -> Either[ProfilerResponse]:
         profiler_runner: Profiler = record.profiler_source.get_profiler_runner(
             record.entity, self.profiler_config
@@ -70,17 +83,88 @@ class ProfilerProcessor(Processor):
                 )
             )
             self.status.failures.extend(
-                record.profiler_source.interface.status.failures
+                profiler_runner.profiler_interface.status.failures
             )
         else:
-            # at this point we know we have an interface variable since we the `try` block above didn't raise
-            self.status.failures.extend(record.profiler_source.interface.status.failures)  # type: ignore
+            # Use the runner interface: the profiler source one is shared by all the tables of the database
+            self.status.failures.extend(profiler_runner.profiler_interface.status.failures)  # type: ignore
             return Either(right=profile)
         finally:
             profiler_runner.close()
 
         return Either()
 
+    def _get_database_budget(
+        self, record: ProfilerSourceAndEntity
+    ) -> Optional[threading.BoundedSemaphore]:
+        """Semaphore limiting the tables of the record database profiled at the same time"""
+        if not self.profiler_config.maxTablesPerDatabase:
+            return None
+        database = getattr(record.entity, "database", None)
+        database_fqn = database.fullyQualifiedName if database else None
+        with self._budgets_lock:
+            if database_fqn not in self._database_budgets:
+                self._database_budgets[database_fqn] = threading.BoundedSemaphore(
+                    self.profiler_config.maxTablesPerDatabase
+                )
+            return self._database_budgets[database_fqn]
+
+    def _run_with_budget(
+        self, record: ProfilerSourceAndEntity
+    ) -> Optional[ProfilerResponse]:
+        budget = self._get_database_budget(record)
+        if budget is None:
+            return self.run(record)
+        with budget:
+            return self.run(record)
+
+    def run_parallel(
+        self, records: Iterable[ProfilerSourceAndEntity]
+    ) -> Iterable[Optional[ProfilerResponse]]:
+        """
+        Profile `tableThreads` tables at the same time and yield the results
+        to be passed to the next steps from the calling thread.
+
+        We keep at most twice as many tables in flight as threads, so that we do not
+        list all the tables up front. The results are yielded in the order of the
+        records if `orderedResults`, or as soon as they are ready otherwise.
+        """
+        threads = self.profiler_config.tableThreads
+        max_pending = threads * 2
+        ordered = self.profiler_config.orderedResults
+        logger.info(f"Profiling up to {threads} tables in parallel")
+
+        pending: Deque[Future] = deque()
+        with ThreadPoolExecutor(
+            max_workers=threads, thread_name_prefix="ProfilerTable"
+        ) as executor:
+            for record in records:
+                pending.append(executor.submit(self._run_with_budget, record))
+                while len(pending) >= max_pending:
+                    yield from self._pop_results(pending, ordered, block=True)
+                yield from self._pop_results(pending, ordered, block=False)
+
+            while pending:
+                yield from self._pop_results(pending, ordered, block=True)
+
+    @staticmethod
+    def _pop_results(
+        pending: Deque[Future], ordered: bool, block: bool
+    ) -> Iterable[Optional[ProfilerResponse]]:
+        """Remove and yield the results of the finished futures"""
+        if ordered:
+            if block and pending:
+                pending[0].result()
+            while pending and pending[0].done():
+                yield pending.popleft().result()
+            return
+
+        if block and pending:
+            wait(pending, return_when=FIRST_COMPLETED)
+        for future in [future for future in pending if future.done()]:
+            pending.remove(future)
+            yield future.result()
+
     @classmethod
     def create(
         cls, config_dict: dict, _: OpenMetadata, pipeline_name: Optional[str] = None
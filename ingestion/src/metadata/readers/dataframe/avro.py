@@ -13,11 +13,12 @@
 Avro DataFrame reader
 """
 import io
+from typing import BinaryIO, Iterator, Union
 
 from metadata.generated.schema.entity.data.table import Column
 from metadata.generated.schema.type.schema import DataTypeTopic
 from metadata.readers.dataframe.base import DataFrameReader
-from metadata.readers.dataframe.common import dataframe_to_chunks
+from metadata.readers.dataframe.common import records_to_chunks
 from metadata.readers.dataframe.models import DatalakeColumnWrapper
 from metadata.utils.constants import UTF_8
 
@@ -34,6 +35,15 @@ PD_AVRO_FIELD_MAP = {
 AVRO_SCHEMA = "avro.schema"
 
 
+def _avro_records(first_record: dict, elements: "DataFileReader") -> Iterator[dict]:
+    """Decode the remaining records and close the file once consumed"""
+    try:
+        yield first_record
+        yield from elements
+    finally:
+        elements.close()
+
+
 class AvroDataFrameReader(DataFrameReader):
     """
     Manage the implementation to read Avro dataframes
@@ -41,9 +51,12 @@ class AvroDataFrameReader(DataFrameReader):
     """
 
     @staticmethod
-    def read_from_avro(avro_text: bytes) -> DatalakeColumnWrapper:
+    def read_from_avro(avro_text: Union[bytes, BinaryIO]) -> DatalakeColumnWrapper:
         """
-        Method to parse the avro data from storage sources
+        Method to parse the avro data from storage sources.
+        The records are decoded block by block as the chunks are consumed.
+        The first block is decoded here, so that if the file is not an Avro
+        data file, we can still read it as an Avro schema.
         """
         # pylint: disable=import-outside-toplevel
         from avro.datafile import DataFileReader
@@ -53,20 +66,14 @@ class AvroDataFrameReader(DataFrameReader):
 
         from metadata.parsers.avro_parser import parse_avro_schema
 
+        file = io.BytesIO(avro_text) if isinstance(avro_text, bytes) else avro_text
         try:
-            elements = DataFileReader(io.BytesIO(avro_text), DatumReader())
-            if elements.meta.get(AVRO_SCHEMA):
-                return DatalakeColumnWrapper(
-                    columns=parse_avro_schema(
-                        schema=elements.meta.get(AVRO_SCHEMA).decode(UTF_8), cls=Column
-                    ),
-                    dataframes=dataframe_to_chunks(DataFrame.from_records(elements)),
-                )
-            return DatalakeColumnWrapper(
-                dataframes=dataframe_to_chunks(DataFrame.from_records(elements))
-            )
+            elements = DataFileReader(file, DatumReader())
+            first_record = next(elements, None)
         except (AssertionError, InvalidAvroBinaryEncoding):
-            columns = parse_avro_schema(schema=avro_text, cls=Column)
+            file.seek(0)
+            columns = parse_avro_schema(schema=file.read(), cls=Column)
+            file.close()
             field_map = {
                 col.name.__root__: Series(
                     PD_AVRO_FIELD_MAP.get(col.dataType.value, "str")
@@ -74,9 +81,27 @@ class AvroDataFrameReader(DataFrameReader):
                 for col in columns
             }
             return DatalakeColumnWrapper(
-                columns=columns, dataframes=dataframe_to_chunks(DataFrame(field_map))
+                columns=columns, dataframes=iter([DataFrame(field_map)])
+            )
+        except Exception:
+            file.close()
+            raise
+
+        if first_record is None:
+            elements.close()
+            dataframes = iter(())
+        else:
+            dataframes = records_to_chunks(_avro_records(first_record, elements))
+        if elements.meta.get(AVRO_SCHEMA):
+            return DatalakeColumnWrapper(
+                columns=parse_avro_schema(
+                    schema=elements.meta.get(AVRO_SCHEMA).decode(UTF_8), cls=Column
+                ),
+                dataframes=dataframes,
             )
+        return DatalakeColumnWrapper(dataframes=dataframes)
 
     def _read(self, *, key: str, bucket_name: str, **__) -> DatalakeColumnWrapper:
-        text = self.reader.read(key, bucket_name=bucket_name)
-        return self.read_from_avro(text)
+        # Avro needs to seek, e.g., to find the file length
+        file = self.reader.open(key, bucket_name=bucket_name, seekable=True)
+        return self.read_from_avro(file)
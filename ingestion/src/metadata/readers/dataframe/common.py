@@ -12,6 +12,10 @@
 """
 DF Reader common methods
 """
+import os
+from itertools import islice
+from typing import Any, Iterable, Iterator, Optional
+
 from metadata.utils.constants import CHUNKSIZE
 
 PANDAS_ENCODINGS = [
@@ -29,3 +33,84 @@ def dataframe_to_chunks(df: "DataFrame"):
         df[range_iter : range_iter + CHUNKSIZE]
         for range_iter in range(0, len(df), CHUNKSIZE)
     ]
+
+
+def records_to_chunks(records: Iterable[Any]) -> Iterator["DataFrame"]:
+    """
+    Lazily build dataframes of CHUNKSIZE rows from an iterable of records,
+    so that only one chunk is held in memory at a time
+    """
+    import pandas as pd  # pylint: disable=import-outside-toplevel
+
+    records = iter(records)
+    while True:
+        batch = list(islice(records, CHUNKSIZE))
+        if not batch:
+            return
+        yield pd.DataFrame.from_records(batch)
+
+
+def parquet_to_chunks(
+    path: str, filesystem: Optional["AbstractFileSystem"] = None
+) -> Iterator["DataFrame"]:
+    """
+    Lazily read a parquet file, or a directory of parquet files such as a
+    partitioned dataset, in batches of CHUNKSIZE rows. pyarrow only loads
+    the row groups needed by the batch being read.
+
+    The footer of a file is read eagerly, so that invalid files fail here,
+    and the file is closed once the chunks are consumed.
+    """
+    # pylint: disable=import-outside-toplevel
+    from pyarrow.parquet import ParquetFile
+
+    is_dir = filesystem.isdir(path) if filesystem else os.path.isdir(path)
+    if is_dir:
+        import pyarrow.dataset as ds
+
+        dataset = ds.dataset(
+            path, filesystem=filesystem, format="parquet", partitioning="hive"
+        )
+        return (
+            batch.to_pandas(split_blocks=True, self_destruct=True)
+            for batch in dataset.to_batches(batch_size=CHUNKSIZE)
+            if batch.num_rows
+        )
+
+    file = filesystem.open(path, "rb") if filesystem else open(path, "rb")
+    try:
+        parquet_file = ParquetFile(file)
+    except Exception:
+        file.close()
+        raise
+
+    def _chunks():
+        try:
+            for batch in parquet_file.iter_batches(batch_size=CHUNKSIZE):
+                yield batch.to_pandas(split_blocks=True, self_destruct=True)
+        finally:
+            file.close()
+
+    return _chunks()
+
+
+def pandas_reader_to_chunks(reader: "TextFileReader") -> Iterator["DataFrame"]:
+    """
+    Lazily read the chunks of a pandas chunked reader, reading the first one eagerly
+    so that decoding or parsing errors in the header are raised by the caller
+    """
+    try:
+        first_chunk = next(reader)
+    except StopIteration:
+        reader.close()
+        return iter(())
+    except Exception:
+        reader.close()
+        raise
+
+    def _chunks():
+        with reader:
+            yield first_chunk
+            yield from reader
+
+    return _chunks()
@@ -33,7 +33,10 @@ from metadata.generated.schema.security.credentials.minioCredentials import (
     MinioCredentials
 )
 from metadata.readers.dataframe.base import DataFrameReader, FileFormatException
-from metadata.readers.dataframe.common import PANDAS_ENCODINGS
+from metadata.readers.dataframe.common import (
+    PANDAS_ENCODINGS,
+    pandas_reader_to_chunks,
+)
 from metadata.readers.dataframe.models import DatalakeColumnWrapper
 from metadata.readers.file.adls import AZURE_PATH, return_azure_storage_options
 from metadata.readers.models import ConfigSource
@@ -61,32 +64,26 @@ class DSVDataFrameReader(DataFrameReader):
     def read_from_pandas(
             self, path: str, storage_options: Optional[Dict[str, Any]] = None, **kwargs
     ) -> DatalakeColumnWrapper:
+        """
+        Lazily read the file in chunks of CHUNKSIZE rows. The first chunk is read
+        eagerly so that encoding errors are raised here and the caller can retry.
+        """
         import pandas as pd  # pylint: disable=import-outside-toplevel
 
-        chunk_list = []
-        with pd.read_csv(
-                path,
-                sep=self.separator,
-                chunksize=CHUNKSIZE,
-                storage_options=storage_options,
-                **kwargs
-        ) as reader:
-            for chunks in reader:
-                chunk_list.append(chunks)
-
-        # columns = [Column(name=col) for col in chunk_list[0].columns]
-        return DatalakeColumnWrapper(dataframes=chunk_list)
+        reader = pd.read_csv(
+            path,
+            sep=self.separator,
+            chunksize=CHUNKSIZE,
+            storage_options=storage_options,
+            **kwargs
+        )
+        return DatalakeColumnWrapper(dataframes=pandas_reader_to_chunks(reader))
 
     def read_from_pandas_with_raw(self, body) -> DatalakeColumnWrapper:
         import pandas as pd  # pylint: disable=import-outside-toplevel
 
-        chunk_list = []
-        with pd.read_csv(body, sep=self.separator, chunksize=CHUNKSIZE) as reader:
-            for chunks in reader:
-                chunk_list.append(chunks)
-
-        # columns = [Column(name=col) for col in chunk_list[0].columns]
-        return DatalakeColumnWrapper(dataframes=chunk_list)
+        reader = pd.read_csv(body, sep=self.separator, chunksize=CHUNKSIZE)
+        return DatalakeColumnWrapper(dataframes=pandas_reader_to_chunks(reader))
 
     @singledispatchmethod
     def _read_dsv_dispatch(
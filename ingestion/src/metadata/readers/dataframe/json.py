@@ -16,10 +16,21 @@ import gzip
 import io
 import json
 import zipfile
-from typing import Any, Dict, List, Optional, Tuple, Union
+from contextlib import ExitStack
+from typing import (
+    IO,
+    Any,
+    BinaryIO,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Tuple,
+    Union,
+)
 
 from metadata.readers.dataframe.base import DataFrameReader
-from metadata.readers.dataframe.common import dataframe_to_chunks
+from metadata.readers.dataframe.common import records_to_chunks
 from metadata.readers.dataframe.models import DatalakeColumnWrapper
 from metadata.utils.constants import UTF_8
 from metadata.utils.logger import ingestion_logger
@@ -27,16 +38,37 @@ from metadata.utils.logger import ingestion_logger
 logger = ingestion_logger()
 
 
-def _get_json_text(key: str, text: bytes, decode: bool) -> Union[str, bytes]:
-    processed_text: Union[str, bytes] = text
+def _open_json_text(key: str, file: BinaryIO) -> IO[str]:
+    """
+    Decompress (if needed) and decode the file as it is read.
+    Zip files need a seekable file to find their members.
+    """
     if key.endswith(".gz"):
-        processed_text = gzip.decompress(text)
+        file = gzip.GzipFile(fileobj=file)
     if key.endswith(".zip"):
-        with zipfile.ZipFile(io.BytesIO(text)) as zip_file:
-            processed_text = zip_file.read(zip_file.infolist()[0])
-    if decode:
-        return processed_text.decode(UTF_8) if isinstance(text, bytes) else text
-    return processed_text
+        zip_file = zipfile.ZipFile(file)  # pylint: disable=consider-using-with
+        file = zip_file.open(zip_file.infolist()[0])
+    return io.TextIOWrapper(file, encoding=UTF_8)
+
+
+def _json_lines(
+    first_records: Iterable[Any], lines: Iterable[str], files: ExitStack
+) -> Iterator[Any]:
+    """Parse the remaining JSON Lines and close the files once consumed"""
+    with files:
+        yield from first_records
+        for line in lines:
+            yield json.loads(line)
+
+
+def _document_chunks(
+    data: Any, json_text: str
+) -> Tuple[Iterator["DataFrame"], Optional[str]]:
+    """Chunks of a JSON document, and its text if it is a JSON Schema"""
+    raw_data = json_text if isinstance(data, dict) and data.get("$schema") else None
+    # if we get a scalar value (e.g. {"a":"b"}) then we need to specify the index
+    data = data if not isinstance(data, dict) else [data]
+    return records_to_chunks(data), raw_data
 
 
 class JSONDataFrameReader(DataFrameReader):
@@ -46,38 +78,62 @@ class JSONDataFrameReader(DataFrameReader):
 
     @staticmethod
     def read_from_json(
-        key: str, json_text: bytes, decode: bool = False, **__
-    ) -> Tuple[List["DataFrame"], Optional[Dict[str, Any]]]:
+        key: str, json_text: Union[str, bytes, BinaryIO], **__
+    ) -> Tuple[Iterator["DataFrame"], Optional[Dict[str, Any]]]:
         """
         Decompress a JSON file (if needed) and read its contents
-        as a dataframe.
+        as a lazy iterator of dataframes.
+
+        The file is read line by line: a file with more than one JSON value
+        per line is read as JSON Lines, parsing each line as the chunks are
+        consumed. Only a document spread over several lines is read whole.
+        The first records are parsed here, so that invalid files fail early.
 
         Note that for the metadata we need to flag nested columns with a
         custom separator. For the profiler this is not needed. We require the
         correct column name to match with the metadata description.
         """
-        # pylint: disable=import-outside-toplevel
-        import pandas as pd
-
-        json_text = _get_json_text(key=key, text=json_text, decode=decode)
-        raw_data = None
-        try:
-            data = json.loads(json_text)
-            if isinstance(data, dict) and data.get("$schema"):
-                raw_data = json_text
-        except json.decoder.JSONDecodeError:
-            logger.debug("Failed to read as JSON object. Trying to read as JSON Lines")
-            data = [json.loads(json_obj) for json_obj in json_text.strip().split("\n")]
-
-        # if we get a scalar value (e.g. {"a":"b"}) then we need to specify the index
-        data = data if not isinstance(data, dict) else [data]
-        return dataframe_to_chunks(pd.DataFrame.from_records(data)), raw_data
+        files = ExitStack()
+        if isinstance(json_text, str):
+            text = files.enter_context(io.StringIO(json_text))
+        else:
+            file = files.enter_context(
+                io.BytesIO(json_text) if isinstance(json_text, bytes) else json_text
+            )
+            text = files.enter_context(_open_json_text(key=key, file=file))
+
+        lines = (line for line in text if line.strip())
+        with files:
+            first_line = next(lines, None)
+            if first_line is None:
+                return iter(()), None
+            try:
+                first_record = json.loads(first_line)
+            except json.decoder.JSONDecodeError:
+                logger.debug("Failed to read as JSON Lines. Reading the whole document")
+                json_text = first_line + "".join(lines)
+                return _document_chunks(json.loads(json_text), json_text)
+
+            second_line = next(lines, None)
+            if second_line is None:
+                return _document_chunks(first_record, first_line)
+            second_record = json.loads(second_line)
+
+            # The files are now closed by the lazy iterator
+            files = files.pop_all()
+
+        return (
+            records_to_chunks(
+                _json_lines([first_record, second_record], lines, files)
+            ),
+            None,
+        )
 
     def _read(self, *, key: str, bucket_name: str, **kwargs) -> DatalakeColumnWrapper:
-        text = self.reader.read(key, bucket_name=bucket_name)
-        dataframes, raw_data = self.read_from_json(
-            key=key, json_text=text, decode=True, **kwargs
+        file = self.reader.open(
+            key, bucket_name=bucket_name, seekable=key.endswith(".zip")
         )
+        dataframes, raw_data = self.read_from_json(key=key, json_text=file, **kwargs)
         return DatalakeColumnWrapper(
             dataframes=dataframes,
             raw_data=raw_data,
@@ -28,7 +28,9 @@ class DatalakeColumnWrapper(BaseModel):
     """
 
     columns: Optional[List[Column]]
-    dataframes: Optional[List[Any]]  # pandas.Dataframe does not have any validators
+    # Lazy iterator of pandas.DataFrame chunks. It can only be consumed once.
+    # pandas.Dataframe does not have any validators
+    dataframes: Optional[Any]
     raw_data: Any  # in special cases like json schema, we need to store the raw data
 
 
@@ -27,7 +27,7 @@ from metadata.generated.schema.entity.services.connections.database.datalakeConn
     LocalConfig,
 )
 from metadata.readers.dataframe.base import DataFrameReader, FileFormatException
-from metadata.readers.dataframe.common import dataframe_to_chunks
+from metadata.readers.dataframe.common import parquet_to_chunks
 from metadata.readers.dataframe.models import DatalakeColumnWrapper
 from metadata.readers.file.adls import AZURE_PATH, return_azure_storage_options
 from metadata.readers.models import ConfigSource
@@ -35,8 +35,11 @@ from metadata.readers.models import ConfigSource
 
 class ParquetDataFrameReader(DataFrameReader):
     """
-    Manage the implementation to read DSV dataframes
+    Manage the implementation to read Parquet dataframes
     from any source based on its init client.
+
+    Files are read from their footer and directories (e.g., partitioned
+    datasets) as a pyarrow dataset, lazily, in batches of CHUNKSIZE rows.
     """
 
     @singledispatchmethod
@@ -50,22 +53,13 @@ class ParquetDataFrameReader(DataFrameReader):
         """
         Read the CSV file from the gcs bucket and return a dataframe
         """
-        # pylint: disable=import-outside-toplevel
-        from gcsfs import GCSFileSystem
-        from pyarrow.parquet import ParquetFile
-
-        gcs = GCSFileSystem()
-        file = gcs.open(f"gs://{bucket_name}/{key}")
-        dataframe_response = (
-            ParquetFile(file).read().to_pandas(split_blocks=True, self_destruct=True)
-        )
-        return dataframe_to_chunks(dataframe_response)
+        from gcsfs import GCSFileSystem  # pylint: disable=import-outside-toplevel
+
+        return parquet_to_chunks(f"{bucket_name}/{key}", GCSFileSystem())
 
     @_read_parquet_dispatch.register
     def _(self, _: S3Config, key: str, bucket_name: str) -> DatalakeColumnWrapper:
-        # pylint: disable=import-outside-toplevel
-        import s3fs
-        from pyarrow.parquet import ParquetDataset
+        import s3fs  # pylint: disable=import-outside-toplevel
 
         client_kwargs = {}
         if self.config_source.securityConfig.endPointURL:
@@ -89,14 +83,11 @@ class ParquetDataFrameReader(DataFrameReader):
                 client_kwargs=client_kwargs,
             )
 
-        bucket_uri = f"s3://{bucket_name}/{key}"
-        dataset = ParquetDataset(bucket_uri, filesystem=s3_fs)
-
-        return dataframe_to_chunks(dataset.read_pandas().to_pandas())
+        return parquet_to_chunks(f"{bucket_name}/{key}", s3_fs)
 
     @_read_parquet_dispatch.register
     def _(self, _: AzureConfig, key: str, bucket_name: str) -> DatalakeColumnWrapper:
-        import pandas as pd  # pylint: disable=import-outside-toplevel
+        import fsspec  # pylint: disable=import-outside-toplevel
 
         storage_options = return_azure_storage_options(self.config_source)
         account_url = AZURE_PATH.format(
@@ -104,8 +95,8 @@ class ParquetDataFrameReader(DataFrameReader):
             account_name=self.config_source.securityConfig.accountName,
             key=key,
         )
-        dataframe = pd.read_parquet(account_url, storage_options=storage_options)
-        return dataframe_to_chunks(dataframe)
+        filesystem, path = fsspec.core.url_to_fs(account_url, **storage_options)
+        return parquet_to_chunks(path, filesystem)
 
     @_read_parquet_dispatch.register
     def _(
@@ -114,10 +105,7 @@ class ParquetDataFrameReader(DataFrameReader):
         key: str,
         bucket_name: str,  # pylint: disable=unused-argument
     ) -> DatalakeColumnWrapper:
-        import pandas as pd  # pylint: disable=import-outside-toplevel
-
-        dataframe = pd.read_parquet(key)
-        return dataframe_to_chunks(dataframe)
+        return parquet_to_chunks(key)
 
     def _read(self, *, key: str, bucket_name: str, **__) -> DatalakeColumnWrapper:
         return DatalakeColumnWrapper(
@@ -0,0 +1,231 @@
+#  Copyright 2021 Collate
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""
+Schema-only reads of the structured objects of S3 compatible services.
+
+Instead of downloading the whole object to infer its columns,
+we only fetch the bytes we need with range requests:
+- Parquet: the file footer.
+- CSV / TSV: the first `sample_size` bytes, cut at the last full line.
+- Excel (xlsx): the zip directory and the first rows of the first sheet.
+
+The inferred columns are cached by ETag, so unchanged objects are not read again.
+"""
+import io
+import json
+import os
+import threading
+import traceback
+from typing import Dict, List, Optional
+
+from metadata.generated.schema.entity.data.table import Column
+from metadata.readers.dataframe.common import PANDAS_ENCODINGS
+from metadata.readers.dataframe.reader_factory import SupportedTypes
+from metadata.readers.file.s3 import S3RangeFile, S3Reader
+from metadata.utils.logger import ingestion_logger
+
+logger = ingestion_logger()
+
+DEFAULT_SCHEMA_SAMPLE_SIZE = 64 * 1024
+# Rows of the first Excel sheet used to infer the column types
+EXCEL_SAMPLE_ROWS = 100
+# Group the small reads of the parquet / zip readers in fewer range requests
+RANGE_BUFFER_SIZE = 256 * 1024
+
+
+class SchemaCache:
+    """
+    Columns inferred for each object, keyed by bucket + key and
+    validated with the object ETag. If a path is given, the cache
+    is loaded from and saved to that JSON file across runs.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as file:
+                    self._entries = json.load(file)
+            except (OSError, ValueError) as exc:
+                logger.warning(f"Ignoring the schema cache file [{path}]: {exc}")
+
+    @staticmethod
+    def _key(bucket_name: str, key: str) -> str:
+        return f"{bucket_name}/{key}"
+
+    def get(self, bucket_name: str, key: str, etag: str) -> Optional[List[Column]]:
+        with self._lock:
+            entry = self._entries.get(self._key(bucket_name, key))
+            if entry and entry["etag"] == etag:
+                self.hits += 1
+                return [Column.parse_obj(column) for column in entry["columns"]]
+            self.misses += 1
+            return None
+
+    def put(self, bucket_name: str, key: str, etag: str, columns: List[Column]):
+        with self._lock:
+            self._entries[self._key(bucket_name, key)] = {
+                "etag": etag,
+                "columns": [json.loads(column.json()) for column in columns],
+            }
+            self._dirty = True
+
+    def save(self) -> None:
+        """Write the cache file, if any"""
+        with self._lock:
+            if not self.path or not self._dirty:
+                return
+            with open(self.path, "w", encoding="utf-8") as file:
+                json.dump(self._entries, file)
+            self._dirty = False
+
+
+class ObjectSchemaReader:
+    """
+    Infer the columns of structured objects reading as few bytes as possible
+    """
+
+    def __init__(
+        self,
+        client,
+        sample_size: int = DEFAULT_SCHEMA_SAMPLE_SIZE,
+        cache: Optional[SchemaCache] = None,
+    ):
+        self.client = client
+        self.sample_size = sample_size
+        self.cache = cache or SchemaCache()
+        self._reader = S3Reader(client)
+
+    def read_columns(
+        self,
+        bucket_name: str,
+        key: str,
+        file_format: SupportedTypes,
+        separator: Optional[str] = None,
+        size: Optional[int] = None,
+        etag: Optional[str] = None,
+    ) -> Optional[List[Column]]:
+        """
+        Return the columns of the object, or None if its format
+        has no schema-only read path
+        """
+        if etag:
+            columns = self.cache.get(bucket_name, key, etag)
+            if columns is not None:
+                return columns
+
+        if file_format == SupportedTypes.PARQUET:
+            columns = self._read_parquet_columns(bucket_name, key, size)
+        elif file_format in {SupportedTypes.CSV, SupportedTypes.TSV}:
+            columns = self._read_dsv_columns(
+                bucket_name, key, file_format, separator, size
+            )
+        elif file_format == SupportedTypes.EXCEL:
+            columns = self._read_excel_columns(bucket_name, key, size)
+        else:
+            return None
+
+        if etag and columns is not None:
+            self.cache.put(bucket_name, key, etag, columns)
+        return columns
+
+    def _open(self, bucket_name: str, key: str, size: Optional[int]) -> io.BufferedReader:
+        return io.BufferedReader(
+            S3RangeFile(self.client, bucket_name, key, size=size),
+            buffer_size=RANGE_BUFFER_SIZE,
+        )
+
+    def _read_parquet_columns(
+        self, bucket_name: str, key: str, size: Optional[int]
+    ) -> List[Column]:
+        # pylint: disable=import-outside-toplevel
+        from pyarrow.parquet import ParquetFile
+
+        from metadata.utils.datalake.datalake_utils import (
+            ParquetDataFrameColumnParser,
+        )
+
+        with self._open(bucket_name, key, size) as file:
+            schema = ParquetFile(file).schema_arrow
+        return ParquetDataFrameColumnParser(schema.empty_table()).get_columns()
+
+    def _read_head(self, bucket_name: str, key: str, size: Optional[int]) -> bytes:
+        """
+        Read the first full lines of the object within the sample size.
+        If a single line does not fit, we keep doubling the sample.
+        """
+        if self.sample_size <= 0 or (size is not None and size <= self.sample_size):
+            return self._reader.read(key, bucket_name=bucket_name)
+
+        sample_size = self.sample_size
+        while True:
+            data = self._reader.read_range(
+                key, 0, sample_size - 1, bucket_name=bucket_name
+            )
+            if len(data) < sample_size:
+                # We got the whole object
+                return data
+            last_line_end = data.rfind(b"\n")
+            if last_line_end > 0:
+                return data[: last_line_end + 1]
+            sample_size *= 2
+
+    def _read_dsv_columns(
+        self,
+        bucket_name: str,
+        key: str,
+        file_format: SupportedTypes,
+        separator: Optional[str],
+        size: Optional[int],
+    ) -> List[Column]:
+        # pylint: disable=import-outside-toplevel
+        import pandas as pd
+
+        from metadata.readers.dataframe.dsv import CSV_SEPARATOR, TSV_SEPARATOR
+        from metadata.utils.datalake.datalake_utils import DataFrameColumnParser
+
+        head = self._read_head(bucket_name, key, size)
+        separator = separator or (
+            TSV_SEPARATOR if file_format == SupportedTypes.TSV else CSV_SEPARATOR
+        )
+        for encoding in PANDAS_ENCODINGS:
+            try:
+                data_frame = pd.read_csv(
+                    io.BytesIO(head), sep=separator, encoding=encoding
+                )
+                return DataFrameColumnParser.create(
+                    data_frame, file_format
+                ).get_columns()
+            except UnicodeDecodeError:
+                logger.debug(traceback.format_exc())
+        raise ValueError(f"Could not decode the head of [{bucket_name}/{key}]")
+
+    def _read_excel_columns(
+        self, bucket_name: str, key: str, size: Optional[int]
+    ) -> List[Column]:
+        # pylint: disable=import-outside-toplevel
+        import pandas as pd
+
+        from metadata.utils.datalake.datalake_utils import DataFrameColumnParser
+
+        with self._open(bucket_name, key, size) as file:
+            data_frame = pd.read_excel(
+                file, sheet_name=0, nrows=EXCEL_SAMPLE_ROWS, engine="openpyxl"
+            )
+        return DataFrameColumnParser.create(
+            data_frame, SupportedTypes.EXCEL
+        ).get_columns()
@@ -11,10 +11,12 @@
 """
 Base local reader
 """
+import io
 import traceback
 from abc import ABC, abstractmethod
-from typing import List, Optional, Union
+from typing import BinaryIO, List, Optional, Union
 
+from metadata.utils.constants import UTF_8
 from metadata.utils.logger import ingestion_logger
 
 logger = ingestion_logger()
@@ -38,6 +40,15 @@ class Reader(ABC):
         """
         raise NotImplementedError("Missing read implementation")
 
+    def open(self, path: str, **kwargs) -> BinaryIO:
+        """
+        Given a path, return a binary file object to read it from.
+        By default, the whole file is read in memory. Readers that can
+        stream the contents should override it.
+        """
+        data = self.read(path, **kwargs)
+        return io.BytesIO(data.encode(UTF_8) if isinstance(data, str) else data)
+
     @abstractmethod
     def _get_tree(self) -> List[str]:
         """
@@ -0,0 +1,95 @@
+#  Copyright 2021 Collate
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""
+Open the documents (HWP, HWPX, DOC, DOCX) stored in S3/MinIO for the
+metadata extractors without downloading them to a temporary file.
+
+- HWPX files are zip archives: we read them with range requests, so only
+  the central directory and the members the extractor opens are fetched.
+- HWP (OLE) and Word files are read in memory. Word files go to Tika as a
+  whole anyway, and OLE streams are scattered in small sectors.
+- Objects bigger than `temp_file_threshold` are downloaded to a temporary
+  file, removed once the extraction is done.
+"""
+import io
+import os
+import tempfile
+import traceback
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Optional, Union
+
+from metadata.readers.file.base import ReadException
+from metadata.readers.file.s3 import S3RangeFile, S3Reader
+from metadata.utils.local_dir import ensure_directory_exists
+from metadata.utils.logger import ingestion_logger
+
+logger = ingestion_logger()
+
+DEFAULT_TEMP_FILE_THRESHOLD = 32 * 1024 * 1024
+# Formats whose members we can read with range requests
+RANGE_READ_FORMATS = {"hwpx"}
+RANGE_READ_BUFFER_SIZE = 64 * 1024
+
+
+def _get_temp_dir() -> Optional[str]:
+    """Keep using the Airflow tmp directory when we run in Airflow"""
+    airflow_home = os.environ.get("AIRFLOW_HOME")
+    if not airflow_home:
+        return None
+    temp_dir = os.path.join(airflow_home, "tmp")
+    ensure_directory_exists(temp_dir)
+    return temp_dir
+
+
+@contextmanager
+def open_document(
+    client,
+    bucket_name: str,
+    key: str,
+    size: Optional[int] = None,
+    temp_file_threshold: int = DEFAULT_TEMP_FILE_THRESHOLD,
+) -> Iterator[Union[str, BinaryIO]]:
+    """
+    Yield a seekable binary stream over the document, named after its key,
+    or the path of a temporary file for the big ones.
+    Raises a ReadException if the object cannot be read.
+    """
+    if size is None:
+        try:
+            size = client.head_object(Bucket=bucket_name, Key=key)["ContentLength"]
+        except Exception as err:
+            logger.debug(traceback.format_exc())
+            raise ReadException(f"Error fetching the size of [{key}] from S3: {err}")
+
+    file_extension = key.split(".")[-1].lower()
+    if file_extension in RANGE_READ_FORMATS:
+        range_file = S3RangeFile(client, bucket_name, key, size=size)
+        stream = io.BufferedReader(range_file, buffer_size=RANGE_READ_BUFFER_SIZE)
+        yield stream
+        logger.debug(f"Read {range_file.bytes_read} of {size} bytes of [{key}]")
+        return
+
+    reader = S3Reader(client)
+    if size <= temp_file_threshold:
+        stream = io.BytesIO(reader.read(key, bucket_name=bucket_name))
+        stream.name = key
+        yield stream
+        return
+
+    with tempfile.NamedTemporaryFile(
+        suffix=f".{file_extension}", dir=_get_temp_dir(), delete=False
+    ) as temp_file:
+        local_file_path = temp_file.name
+    try:
+        reader.download(key, local_file_path=local_file_path, bucket_name=bucket_name)
+        yield local_file_path
+    finally:
+        os.remove(local_file_path)
@@ -14,7 +14,7 @@ Local Reader
 import os
 import traceback
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import BinaryIO, List, Optional, Union
 
 from metadata.readers.file.base import Reader, ReadException
 from metadata.utils.constants import UTF_8
@@ -53,6 +53,13 @@ class LocalReader(Reader):
             logger.debug(traceback.format_exc())
             raise ReadException(f"Error reading file [{path}] locally: {err}")
 
+    def open(self, path: str, **__) -> BinaryIO:
+        try:
+            return open(self.base_path / path, "rb")  # pylint: disable=consider-using-with
+        except Exception as err:
+            logger.debug(traceback.format_exc())
+            raise ReadException(f"Error opening file [{path}] locally: {err}")
+
     def _get_tree(self) -> Optional[List[str]]:
         """
         Return the tree with the files relative to the base path
@@ -12,14 +12,18 @@
 """
 Read files as string from S3
 """
+import io
 import traceback
-from typing import List
+from typing import BinaryIO, List, Optional
 
 from metadata.readers.file.base import Reader, ReadException
 from metadata.utils.logger import ingestion_logger
 
 logger = ingestion_logger()
 
+# Bytes fetched by each range request of a seekable S3 file
+RANGE_FILE_BUFFER_SIZE = 1024 * 1024
+
 
 class S3Reader(Reader):
     """S3 Reader
@@ -39,6 +43,39 @@ class S3Reader(Reader):
                 logger.debug(traceback.format_exc())
             raise ReadException(f"Error fetching file [{path}] from S3: {err}")
 
+    def open(
+        self, path: str, *, bucket_name: str = None, seekable: bool = False, **__
+    ) -> BinaryIO:
+        """
+        Open the object without downloading it. By default, we return the
+        streaming body, to be read sequentially. If `seekable`, each read
+        of the file is a range request instead.
+        """
+        try:
+            if seekable:
+                return io.BufferedReader(
+                    S3RangeFile(self.client, bucket_name, path),
+                    buffer_size=RANGE_FILE_BUFFER_SIZE,
+                )
+            return self.client.get_object(Bucket=bucket_name, Key=path)["Body"]
+        except Exception as err:
+            logger.debug(traceback.format_exc())
+            raise ReadException(f"Error opening file [{path}] from S3: {err}")
+
+    def read_range(
+        self, path: str, start: int, end: int, *, bucket_name: str = None
+    ) -> bytes:
+        """Read the bytes [start, end] (inclusive) of the object with a range request"""
+        try:
+            return self.client.get_object(
+                Bucket=bucket_name, Key=path, Range=f"bytes={start}-{end}"
+            )["Body"].read()
+        except Exception as err:
+            logger.debug(traceback.format_exc())
+            raise ReadException(
+                f"Error fetching bytes {start}-{end} of file [{path}] from S3: {err}"
+            )
+
     def _get_tree(self) -> List[str]:
         """
         We are not implementing this yet. This should
@@ -62,3 +99,62 @@ class S3Reader(Reader):
             if verbose:
                 logger.debug(traceback.format_exc())
             raise ReadException(f"Error downloading file [{path}] from S3: {err}")
+
+
+class S3RangeFile(io.RawIOBase):
+    """
+    Seekable read-only file over an S3 object. Every read is a range
+    request, so libraries that seek (e.g., to a parquet footer or a zip
+    central directory) only download the bytes they need.
+    Wrap it in an io.BufferedReader to group the small reads.
+    """
+
+    def __init__(
+        self, client, bucket_name: str, key: str, size: Optional[int] = None
+    ):
+        super().__init__()
+        self._reader = S3Reader(client)
+        self.bucket_name = bucket_name
+        self.key = key
+        # Like a file object, so the readers can tell the format from the name
+        self.name = key
+        self.size = (
+            size
+            if size is not None
+            else client.head_object(Bucket=bucket_name, Key=key)["ContentLength"]
+        )
+        self.position = 0
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self.position = offset
+        elif whence == io.SEEK_CUR:
+            self.position += offset
+        elif whence == io.SEEK_END:
+            self.position = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence {whence}")
+        self.position = max(self.position, 0)
+        return self.position
+
+    def readinto(self, buffer) -> int:
+        if self.position >= self.size or not len(buffer):
+            return 0
+        end = min(self.position + len(buffer), self.size) - 1
+        data = self._reader.read_range(
+            self.key, self.position, end, bucket_name=self.bucket_name
+        )
+        buffer[: len(data)] = data
+        self.position += len(data)
+        self.bytes_read += len(data)
+        return len(data)
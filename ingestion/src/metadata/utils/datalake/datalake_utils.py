@@ -17,7 +17,7 @@ import ast
 import json
 import random
 import traceback
-from typing import Any, Dict, List, Optional, Union, cast
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union, cast
 
 from metadata.generated.schema.entity.data.table import Column, DataType
 from metadata.ingestion.source.database.column_helpers import truncate_column_name
@@ -38,9 +38,12 @@ def fetch_dataframe(
     file_fqn: DatalakeTableSchemaWrapper,
     fetch_raw_data: bool = False,
     **kwargs,
-) -> Optional[List["DataFrame"]]:
+) -> Optional[Iterator["DataFrame"]]:
     """
-    Method to get dataframe for profiling
+    Method to get dataframe for profiling.
+
+    The dataframes are returned as a lazy iterator of chunks
+    that can only be consumed once.
     """
     # dispatch to handle fetching of data from multiple file formats (csv, tsv, json, avro and parquet)
     key: str = file_fqn.key
@@ -145,18 +148,22 @@ class DataFrameColumnParser:
 
     @staticmethod
     def _get_data_frame(
-        data_frame: Union[List["DataFrame"], "DataFrame"], sample: bool, shuffle: bool
+        data_frame: Union[Iterable["DataFrame"], "DataFrame"],
+        sample: bool,
+        shuffle: bool,
     ):
         """Return the dataframe to use for parsing"""
         import pandas as pd
 
-        if not isinstance(data_frame, list):
+        if isinstance(data_frame, pd.DataFrame):
             return data_frame
 
         if sample:
             if shuffle:
+                data_frame = list(data_frame)
                 random.shuffle(data_frame)
-            return data_frame[0]
+            # Only the first chunk of a lazy iterator is read
+            return next(iter(data_frame), None)
 
         return pd.concat(data_frame)
 
@@ -384,7 +391,7 @@ class GenericDataFrameColumnParser:
 class ParquetDataFrameColumnParser:
     """Given a dataframe object generated from a parquet file, parse the columns and return a list of Column objects."""
 
-    def __init__(self, data_frame: "DataFrame"):
+    def __init__(self, data_frame: Union["DataFrame", "Table"]):
         import pyarrow as pa
 
         self._data_formats = {
@@ -424,7 +431,12 @@ class ParquetDataFrameColumnParser:
         }
 
         self.data_frame = data_frame
-        self._arrow_table = pa.Table.from_pandas(self.data_frame)
+        # We can also receive the (empty) arrow table read from a parquet footer
+        self._arrow_table = (
+            data_frame
+            if isinstance(data_frame, pa.Table)
+            else pa.Table.from_pandas(self.data_frame)
+        )
 
     def get_columns(self):
         """
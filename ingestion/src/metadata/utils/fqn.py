@@ -15,7 +15,8 @@ ES indexes definitions
 """
 import hashlib
 import re
-from typing import Dict, List, Optional, Type, TypeVar, Union
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Type, TypeVar, Union
 
 from antlr4.CommonTokenStream import CommonTokenStream
 from antlr4.error.ErrorStrategy import BailErrorStrategy
@@ -51,6 +52,8 @@ from metadata.utils.elasticsearch import get_entity_from_es_result
 T = TypeVar("T", bound=BaseModel)
 
 FQN_SEPARATOR: str = "."
+# Number of FQNs whose parts are kept in memory by `split`
+FQN_SPLIT_CACHE_SIZE = 65536
 fqn_build_registry = class_register()
 
 
@@ -73,6 +76,48 @@ def split(str_: str) -> List[str]:
     """
     Equivalent of Java's FullyQualifiedName#split
     """
+    return list(_split_cached(str_))
+
+
+@lru_cache(maxsize=FQN_SPLIT_CACHE_SIZE)
+def _split_cached(str_: str) -> Tuple[str, ...]:
+    parts = _split_fast(str_)
+    if parts is None:
+        # Let the grammar have the last word, and raise its parsing errors
+        parts = _split_antlr(str_)
+    return tuple(parts)
+
+
+def _split_fast(str_: str) -> Optional[List[str]]:
+    """
+    Linear scan following the Fqn.g4 grammar: names are separated by dots, and
+    are either unquoted, without dots nor quotes, or quoted, with at least one
+    dot and no quotes inside. Quoted names keep their quotes.
+    Return None if the FQN does not follow these rules.
+    """
+    parts = []
+    start = 0
+    length = len(str_)
+    while True:
+        if start < length and str_[start] == '"':
+            end = str_.find('"', start + 1) + 1
+            if not end or str_.find(FQN_SEPARATOR, start, end) < 0:
+                return None
+        else:
+            end = str_.find(FQN_SEPARATOR, start)
+            if end < 0:
+                end = length
+            if end == start or str_.find('"', start, end) >= 0:
+                return None
+        parts.append(str_[start:end])
+        if end == length:
+            return parts
+        if str_[end] != FQN_SEPARATOR:
+            return None
+        start = end + 1
+
+
+def _split_antlr(str_: str) -> List[str]:
     lexer = FqnLexer(InputStream(str_))
     stream = CommonTokenStream(lexer)
     parser = FqnParser(stream)
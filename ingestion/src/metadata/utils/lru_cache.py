@@ -46,6 +46,13 @@ class LRUCache:
         if len(self._cache) > self.capacity:
             self._cache.popitem(last=False)
 
+    def pop(self, key, default=None):
+        """
+        Removes `key` from the cache, returning its value
+        or `default` if it doesn't exist.
+        """
+        return self._cache.pop(key, default)
+
     def __contains__(self, key) -> bool:
         if key not in self._cache:
             return False
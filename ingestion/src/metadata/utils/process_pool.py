@@ -0,0 +1,248 @@
+#  Copyright 2021 Collate
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""
+Process pool with a timeout per task.
+
+The `timeout` decorator relies on SIGALRM, which only works in the main
+thread, so CPU-bound work such as query parsing cannot be spread over
+threads. Here every worker process gets chunks of tasks through its own
+pipe and sends back one result per task. If a task runs for more than
+`timeout_seconds` (or its process dies), the process is killed and replaced,
+the task fails and the rest of its chunk goes to the new process.
+"""
+import multiprocessing
+import time
+import traceback
+from collections import Counter, deque
+from multiprocessing.connection import Connection, wait
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from metadata.utils.logger import utils_logger
+
+logger = utils_logger()
+
+# Seconds a new process has to start, before its first task
+STARTUP_TIMEOUT = 60
+# Tag of the messages with the stats of a chunk
+STATS_MESSAGE = "stats"
+
+
+class TaskResult(NamedTuple):
+    """Return value of the task, or the error that stopped it"""
+
+    value: Any = None
+    error: Optional[str] = None
+
+
+def _worker_loop(
+    func: Callable[[Any], Any],
+    conn: Connection,
+    worker_stats: Optional[Callable[[], Dict[str, int]]] = None,
+) -> None:
+    """
+    Tell that we are ready, then run the chunks of (index, item) received
+    until we get None, sending the stats of the process with each chunk
+    """
+    conn.send(None)
+    while True:
+        chunk = conn.recv()
+        if chunk is None:
+            return
+        for position, (index, item) in enumerate(chunk, start=1):
+            try:
+                result = TaskResult(value=func(item))
+            except Exception as exc:
+                result = TaskResult(error=f"{type(exc).__name__}: {exc}")
+            # Before the last result, so the stats are in when the map ends
+            if worker_stats is not None and position == len(chunk):
+                conn.send((STATS_MESSAGE, worker_stats()))
+            conn.send((index, result))
+
+
+class _Worker:
+    """Worker process with the (index, item) tasks it still has to run"""
+
+    def __init__(
+        self,
+        context,
+        func: Callable[[Any], Any],
+        worker_stats: Optional[Callable[[], Dict[str, int]]] = None,
+    ):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_loop, args=(func, child_conn, worker_stats), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.pending: Deque[Tuple[int, Any]] = deque()
+        # Whether the process is done importing and running tasks
+        self.ready = False
+        # The task at the head of `pending` must finish before this time
+        self.deadline = 0.0
+
+    def submit(self, chunk: List[Tuple[int, Any]], timeout_seconds: float) -> None:
+        self.conn.send(chunk)
+        self.pending.extend(chunk)
+        self.deadline = time.monotonic() + timeout_seconds
+        if not self.ready:
+            self.deadline += STARTUP_TIMEOUT
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=1)
+        self.kill()
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class TimeoutProcessPool:
+    """
+    Run `func` over items in `processes` worker processes, in chunks of
+    `chunk_size` items, and give back the results in the order of the items.
+    `func` and the items must be picklable, and `func` importable from a
+    new process.
+
+    `worker_stats`, if given, runs in the workers after each chunk. The
+    counters it returns are added up in `stats`.
+    """
+
+    def __init__(
+        self,
+        func: Callable[[Any], Any],
+        processes: int,
+        timeout_seconds: float,
+        chunk_size: int = 50,
+        worker_stats: Optional[Callable[[], Dict[str, int]]] = None,
+    ):
+        self.func = func
+        self.worker_stats = worker_stats
+        self.stats: Counter = Counter()
+        self.processes = processes
+        self.timeout_seconds = timeout_seconds
+        self.chunk_size = max(chunk_size, 1)
+        # Forking the workflow process, which already runs threads (REST
+        # connection pool, caches), could copy a held lock and deadlock
+        self._context = multiprocessing.get_context(
+            "forkserver"
+            if "forkserver" in multiprocessing.get_all_start_methods()
+            else "spawn"
+        )
+        self._workers: List[_Worker] = []
+
+    def map(self, items: Iterable[Any]) -> List[TaskResult]:
+        indexed = list(enumerate(items))
+        results: List[Optional[TaskResult]] = [None] * len(indexed)
+        chunks: Deque[List[Tuple[int, Any]]] = deque(
+            indexed[start : start + self.chunk_size]
+            for start in range(0, len(indexed), self.chunk_size)
+        )
+        while len(self._workers) < min(self.processes, len(chunks)):
+            self._workers.append(_Worker(self._context, self.func, self.worker_stats))
+
+        for worker in self._workers:
+            if chunks:
+                worker.submit(chunks.popleft(), self.timeout_seconds)
+
+        remaining = len(indexed)
+        while remaining:
+            busy = [worker for worker in self._workers if worker.pending]
+            next_deadline = min(worker.deadline for worker in busy)
+            ready = wait(
+                [worker.conn for worker in busy],
+                timeout=max(next_deadline - time.monotonic(), 0),
+            )
+            for worker in busy:
+                if worker.conn in ready:
+                    try:
+                        message = worker.conn.recv()
+                    except (EOFError, OSError):
+                        self._replace(
+                            worker, results, chunks, "The worker process died"
+                        )
+                        remaining -= 1
+                        continue
+                    if message is None:
+                        # The timeout of the first task starts now
+                        worker.ready = True
+                        worker.deadline = time.monotonic() + self.timeout_seconds
+                        continue
+                    if message[0] == STATS_MESSAGE:
+                        self.stats.update(message[1])
+                        continue
+                    index, result = message
+                    results[index] = result
+                    worker.pending.popleft()
+                    worker.deadline = time.monotonic() + self.timeout_seconds
+                    remaining -= 1
+                    if not worker.pending and chunks:
+                        worker.submit(chunks.popleft(), self.timeout_seconds)
+                elif worker.deadline <= time.monotonic():
+                    self._replace(
+                        worker,
+                        results,
+                        chunks,
+                        f"Timed out after {self.timeout_seconds} seconds",
+                    )
+                    remaining -= 1
+
+        return results
+
+    def _replace(
+        self,
+        worker: _Worker,
+        results: List[Optional[TaskResult]],
+        chunks: Deque[List[Tuple[int, Any]]],
+        error: str,
+    ) -> None:
+        """Fail the current task of the worker and restart it with the rest of its chunk"""
+        index, _ = worker.pending.popleft()
+        logger.debug(f"Task {index} failed: {error}")
+        results[index] = TaskResult(error=error)
+        rest = list(worker.pending)
+        worker.kill()
+
+        new_worker = _Worker(self._context, self.func, self.worker_stats)
+        self._workers[self._workers.index(worker)] = new_worker
+        if rest:
+            chunks.appendleft(rest)
+        if chunks:
+            new_worker.submit(chunks.popleft(), self.timeout_seconds)
+
+    def take_stats(self) -> Dict[str, int]:
+        """Stats of the workers since the last call"""
+        stats, self.stats = dict(self.stats), Counter()
+        return stats
+
+    def close(self) -> None:
+        for worker in self._workers:
+            try:
+                worker.stop()
+            except Exception as exc:
+                logger.debug(traceback.format_exc())
+                logger.warning(f"Error stopping a worker process: {exc}")
+        self._workers = []
@@ -51,3 +51,16 @@ def generate_source_hash(
         logger.warning(f"Failed to generate source hash due to - {exc}")
         logger.debug(traceback.format_exc())
     return None
+
+
+def source_hash_digest(source_hash: Optional[str]) -> Optional[bytes]:
+    """
+    Compact representation of the source hash to keep in memory.
+    The md5 hex digest takes 16 bytes instead of a 32 chars string.
+    """
+    if not source_hash:
+        return None
+    try:
+        return bytes.fromhex(source_hash)
+    except ValueError:
+        return source_hash.encode("utf-8")
@@ -0,0 +1,171 @@
+#  Copyright 2021 Collate
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""
+Content-addressed cache of what we extract from the documents (HWP, DOCX,...).
+
+Entries are JSON files in a local directory, shared by every workflow of the
+host (storage metadata ingestion, document profiler) and kept across runs:
+- the metadata and text of a document, keyed by its ETag,
+- the summary of a text, keyed by the SHA-256 of the text.
+So text extraction and summarization only run once per document version.
+
+When the directory is bigger than the maximum size, the least recently
+used entries are removed. Enable it with the `DOCUMENT_CACHE_DIR`
+environment variable, and bound it with `DOCUMENT_CACHE_MAX_SIZE` (bytes).
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import traceback
+from typing import Dict, Optional
+
+from metadata.utils.logger import utils_logger
+
+logger = utils_logger()
+
+DOCUMENT_CACHE_DIR_ENV = "DOCUMENT_CACHE_DIR"
+DOCUMENT_CACHE_MAX_SIZE_ENV = "DOCUMENT_CACHE_MAX_SIZE"
+DEFAULT_MAX_SIZE = 1024 * 1024 * 1024
+ENTRY_SUFFIX = ".json"
+# Formats whose sample stops at the end of the paragraph that reaches the size
+PARAGRAPH_SAMPLE_FORMATS = {"hwpx", "docx", "doc"}
+
+
+def document_key(etag: str) -> str:
+    """Key of a document version"""
+    return "doc-" + hashlib.sha256(etag.strip('"').encode("utf-8")).hexdigest()
+
+
+def text_key(text: str) -> str:
+    """Key of a text, e.g., to cache its summary"""
+    return "text-" + hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def sample_from_text(text: str, chunk_size: int, file_extension: str) -> str:
+    """
+    Same sample as `get_sample_data(chunk_size)` of the extractors, from the
+    full text of the document: HWP texts are cut at `chunk_size`, the others
+    at the end of the paragraph that makes them longer than `chunk_size`.
+    """
+    if chunk_size < 0 or len(text) <= chunk_size:
+        return text
+    if file_extension not in PARAGRAPH_SAMPLE_FORMATS:
+        return text[:chunk_size]
+    end = text.find("\n", chunk_size)
+    return text if end < 0 else text[: end + 1]
+
+
+class DocumentCache:
+    """
+    JSON entries in `directory`, evicted in least recently used order
+    once they take more than `max_size` bytes
+    """
+
+    def __init__(self, directory: str, max_size: int = DEFAULT_MAX_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._sizes: Dict[str, int] = {
+            file_name[: -len(ENTRY_SUFFIX)]: os.path.getsize(
+                os.path.join(directory, file_name)
+            )
+            for file_name in os.listdir(directory)
+            if file_name.endswith(ENTRY_SUFFIX)
+        }
+
+    @property
+    def size(self) -> int:
+        return sum(self._sizes.values())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ENTRY_SUFFIX)
+
+    def _read(self, key: str) -> Optional[dict]:
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as file:
+                entry = json.load(file)
+            # The access time drives the eviction
+            os.utime(path)
+            return entry
+        except (OSError, ValueError):
+            return None
+
+    def get(self, key: str) -> Optional[dict]:
+        entry = self._read(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def update(self, key: str, **fields) -> None:
+        """Add the fields to the entry, creating it if needed"""
+        entry = self._read(key) or {}
+        entry.update(fields)
+        data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        try:
+            # Write and rename, so concurrent workflows never read half an entry
+            with tempfile.NamedTemporaryFile(
+                dir=self.directory, suffix=".tmp", delete=False
+            ) as file:
+                file.write(data)
+            os.replace(file.name, self._path(key))
+        except OSError as exc:
+            logger.debug(traceback.format_exc())
+            logger.warning(f"Could not write the document cache entry [{key}]: {exc}")
+            return
+        with self._lock:
+            self._sizes[key] = len(data)
+            self._evict()
+
+    def _evict(self) -> None:
+        total = sum(self._sizes.values())
+        if total <= self.max_size:
+            return
+        entries = []
+        for key in self._sizes:
+            try:
+                entries.append((os.path.getmtime(self._path(key)), key))
+            except OSError:
+                entries.append((0, key))
+        for _, key in sorted(entries):
+            if total <= self.max_size:
+                break
+            total -= self._sizes.pop(key)
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+
+_cache: Optional[DocumentCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_document_cache() -> Optional[DocumentCache]:
+    """Cache of the process, if `DOCUMENT_CACHE_DIR` is set"""
+    global _cache  # pylint: disable=global-statement
+    directory = os.environ.get(DOCUMENT_CACHE_DIR_ENV)
+    if not directory:
+        return None
+    with _cache_lock:
+        if _cache is None or _cache.directory != directory:
+            _cache = DocumentCache(
+                directory,
+                int(os.environ.get(DOCUMENT_CACHE_MAX_SIZE_ENV, DEFAULT_MAX_SIZE)),
+            )
+        return _cache
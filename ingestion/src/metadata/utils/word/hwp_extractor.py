@@ -8,6 +8,7 @@ import struct
 #### 추가 ####
 import re
 import unicodedata
+from typing import BinaryIO, Union
 
 from metadata.ml.summarization import Summarization
 
@@ -19,21 +20,26 @@ class HwpMetadataExtractor:
     BODYTEXT_SECTION = "BodyText"
     HWP_TEXT_TAGS = [67]
 
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: Union[str, BinaryIO], summarize: bool = True):
+        # file_path can also be a seekable binary stream named after the file
+        # Without summarize, the text is kept in sample_text to be summarized later
+        self.summarize = summarize
         self.summarizer = Summarization()
+        self.sample_text = None
         self._compressed = None
         self._valid = None
         self._ole = None
         self.file_path = file_path
+        file_name = file_path if isinstance(file_path, str) else getattr(file_path, "name", "")
 
         if zipfile.is_zipfile(file_path):
             self.is_zip = True
         else:
             self.is_zip = False
 
-        if file_path.endswith(".hwp"):
+        if file_name.endswith(".hwp"):
             self.is_hwp = True
-        elif file_path.endswith(".hwpx") and self.is_zip:
+        elif file_name.endswith(".hwpx") and self.is_zip:
             self.is_hwp = False
         else:
             self.is_hwp = True
@@ -44,7 +50,7 @@ class HwpMetadataExtractor:
         return self.extract_hwpx_metadata()
 
     def extract_metadata(self) -> dict:
-        olestg = OleStorage(self.file_path)
+        olestg = OleStorage(self.load())
         hwp5file = FS.Hwp5File(olestg)
         summary: FS.HwpSummaryInfo = hwp5file.summaryinfo
 
@@ -72,8 +78,11 @@ class HwpMetadataExtractor:
 
         sample_data = self.get_sample_data(-1)
         if sample_data is not None:
-            str_summary = self.summarizer.summarize(sample_data)
-            metadata["Summary"] = str_summary
+            if self.summarize:
+                str_summary = self.summarizer.summarize(sample_data)
+                metadata["Summary"] = str_summary
+            else:
+                self.sample_text = sample_data
 
         return metadata
 
@@ -114,8 +123,11 @@ class HwpMetadataExtractor:
 
         sample_data = self.get_sample_data(-1)
         if sample_data is not None:
-            str_summary = self.summarizer.summarize(sample_data)
-            metadata_dict["Summary"] = str_summary
+            if self.summarize:
+                str_summary = self.summarizer.summarize(sample_data)
+                metadata_dict["Summary"] = str_summary
+            else:
+                self.sample_text = sample_data
 
         return metadata_dict
 
@@ -124,9 +136,11 @@ class HwpMetadataExtractor:
             return self.get_sample_data_from_hwp(chunk_size)
         return self.get_sample_data_from_hwpx(chunk_size)
 
-    # 파일 불러오기
+    # 파일 불러오기 (경로 또는 메모리 버퍼)
     def load(self):
-        return olefile.OleFileIO(self.file_path)
+        if self._ole is None:
+            self._ole = olefile.OleFileIO(self.file_path)
+        return self._ole
 
     # hwp 파일인지 확인 header가 없으면 hwp가 아닌 것으로 판단하여 진행 안함
     def is_valid(self, dirs):
@@ -162,8 +176,12 @@ class HwpMetadataExtractor:
         sections = self.get_body_sections(_dirs)
         text = ""
         for section in sections:
-            text += self.get_text_from_section(_ole, _compressed, section)
+            # 요청한 길이만큼 모이면 나머지 section은 읽지 않는다
+            remaining = chunk_size - len(text) if chunk_size > 0 else -1
+            text += self.get_text_from_section(_ole, _compressed, section, remaining)
             text += "\n"
+            if 0 < chunk_size <= len(text):
+                break
 
         if chunk_size < 0:
             return text
@@ -171,7 +189,7 @@ class HwpMetadataExtractor:
         return text[0:chunk_size]
 
     # section 내 text 추출
-    def get_text_from_section(self, _ole, is_compressed, section):
+    def get_text_from_section(self, _ole, is_compressed, section, chunk_size: int = -1):
         bodytext = _ole.openstream(section)
         data = bodytext.read()
 
@@ -197,6 +215,8 @@ class HwpMetadataExtractor:
 
                 text += res
                 text += "\n"
+                if 0 < chunk_size <= len(text):
+                    break
 
             i += 4 + rec_len
 
@@ -204,26 +224,29 @@ class HwpMetadataExtractor:
 
     def get_sample_data_from_hwpx(self, chunk_size: int = 1000):
         extracted_text = ""
+        paragraph_tag = "{http://www.hancom.co.kr/hwpml/2011/paragraph}p"
+        text_tag = "{http://www.hancom.co.kr/hwpml/2011/paragraph}t"
         try:
-            # HWPX 파일 열기
+            # HWPX 파일 열기 (스트림인 경우 필요한 section만 읽는다)
             with zipfile.ZipFile(self.file_path, 'r') as z:
                 # Contents/ 디렉터리의 Section*.xml 파일 찾기
                 section_files = [f for f in z.namelist() if f.startswith("Contents/section") and f.endswith(".xml")]
 
                 for section_file in section_files:
-                    # XML 파일 읽기
+                    # XML 파일을 문단 단위로 읽고, 요청한 길이만큼 모이면 멈춘다
                     with z.open(section_file) as file:
-                        tree = ET.parse(file)
-                        root = tree.getroot()
-
-                        # 텍스트 추출 (hwp:paragraph 태그 안의 텍스트)
-                        for para in root.findall(".//{http://www.hancom.co.kr/hwpml/2011/paragraph}p"):
-                            texts = para.findall(".//{http://www.hancom.co.kr/hwpml/2011/paragraph}t")
-                            for text in texts:
+                        for _, para in ET.iterparse(file, events=("end",)):
+                            if para.tag != paragraph_tag:
+                                continue
+                            # 텍스트 추출 (hwp:paragraph 태그 안의 텍스트)
+                            for text in para.iter(text_tag):
                                 extracted_text += text.text if text.text else ""
                             extracted_text += "\n"  # 문단 구분
+                            para.clear()
                             if 0 < chunk_size < len(extracted_text):
                                 break
+                    if 0 < chunk_size < len(extracted_text):
+                        break
         except Exception as e:
             print(f"오류 발생: {e}")
 
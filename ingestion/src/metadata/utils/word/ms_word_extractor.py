@@ -1,4 +1,5 @@
 import os
+from typing import BinaryIO, Union
 
 from docx import Document
 from tika import parser
@@ -7,18 +8,28 @@ from metadata.ml.summarization import Summarization
 
 
 class MsWordMetadataExtractor:
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: Union[str, BinaryIO], summarize: bool = True):
+        # file_path can also be a seekable binary stream named after the file
         self.file_path = file_path
+        # Without summarize, the text is kept in sample_text to be summarized later
+        self.summarize = summarize
         self.summarizer = Summarization()
+        self.sample_text = None
 
     def extract_metadata(self) -> dict:
 
         # Tika로 문서 파싱
-        parsed = parser.from_file(self.file_path)
+        if isinstance(self.file_path, str):
+            parsed = parser.from_file(self.file_path)
+            file_name = self.file_path
+        else:
+            self.file_path.seek(0)
+            parsed = parser.from_buffer(self.file_path.read())
+            file_name = getattr(self.file_path, "name", "")
         # 메타데이터 추출
         metadata = parsed['metadata']
         # 파일 확장자가 docx가 아니면 tika 결과만을 반환
-        file_extension = os.path.splitext(self.file_path)[1]
+        file_extension = os.path.splitext(file_name)[1]
         if file_extension != '.docx':
             return metadata
 
@@ -58,8 +69,11 @@ class MsWordMetadataExtractor:
 
         sample_data = self.get_sample_data(-1)
         if sample_data is not None:
-            str_summary = self.summarizer.summarize(sample_data)
-            metadata['Summary'] = str_summary
+            if self.summarize:
+                str_summary = self.summarizer.summarize(sample_data)
+                metadata['Summary'] = str_summary
+            else:
+                self.sample_text = sample_data
         return metadata
 
     def get_sample_data(self, chunk_size: int = 1000) -> str:
@@ -21,7 +21,7 @@ To be extended by any other workflow:
 """
 import traceback
 from abc import ABC, abstractmethod
-from typing import List, Tuple, cast
+from typing import Any, Iterable, List, Tuple, cast
 
 from metadata.config.common import WorkflowExecutionError
 from metadata.generated.schema.entity.services.connections.metadata.openMetadataConnection import (
@@ -114,14 +114,41 @@ class IngestionWorkflow(BaseWorkflow, ABC):
         Note how the Source class needs to be an Iterator. Specifically,
         we are defining Sources as Generators.
         """
+        self._connect_sinks()
         for record in self.source.run():
-            processed_record = record
-            for step in self.steps:
-                # We only process the records for these Step types
-                if processed_record is not None and isinstance(
-                    step, (Processor, Stage, Sink)
-                ):
-                    processed_record = step.run(processed_record)
+            self._run_steps(record, self.steps)
+
+        self._finish_steps()
+
+    def _connect_sinks(self) -> None:
+        """Let the source flush the sinks and know the result of each record it sent"""
+        for step in self.steps:
+            if isinstance(step, Sink):
+                step.add_ack_listener(self.source.sink_ack)
+        self.source.set_sink_flush(self._flush_sinks)
+
+    def _flush_sinks(self) -> None:
+        for step in self.steps:
+            if isinstance(step, Sink):
+                step.flush()
+
+    @staticmethod
+    def _run_steps(record: Any, steps: Iterable[Step]) -> None:
+        """Pass a single record through the given steps"""
+        processed_record = record
+        for step in steps:
+            # We only process the records for these Step types
+            if processed_record is not None and isinstance(
+                step, (Processor, Stage, Sink)
+            ):
+                processed_record = step.run(processed_record)
+
+    def _finish_steps(self) -> None:
+        """Flush the sinks and run the BulkSink once all the records are processed"""
+        # Make sure any buffered record is sent before reporting the status
+        for step in self.steps:
+            if isinstance(step, (Sink, Stage)):
+                step.flush()
 
         # Try to pick up the BulkSink and execute it, if needed
         bulk_sink = next(
@@ -179,6 +179,14 @@ def print_query_parsing_issues():
         )
 
 
+def print_entity_cache_summary(workflow: "BaseWorkflow") -> None:
+    """Log the entity cache hit ratio, if the cache is enabled"""
+    entity_cache = getattr(getattr(workflow, "metadata", None), "entity_cache", None)
+    if entity_cache:
+        log_ansi_encoded_string(bold=True, message="Entity Cache Summary")
+        log_ansi_encoded_string(message=str(entity_cache.stats))
+
+
 def print_workflow_summary(workflow: "BaseWorkflow") -> None:
     """
     Args:
@@ -193,6 +201,8 @@ def print_workflow_summary(workflow: "BaseWorkflow") -> None:
         print_execution_time_summary()
         print_query_parsing_issues()
 
+    print_entity_cache_summary(workflow)
+
     failures = []
     total_records = 0
     total_errors = 0
@@ -211,6 +221,8 @@ def print_workflow_summary(workflow: "BaseWorkflow") -> None:
         if step_summary.filtered:
             log_ansi_encoded_string(message=f"Filtered: {step_summary.filtered}")
         log_ansi_encoded_string(message=f"Errors: {step_summary.errors}")
+        for key, value in step.get_status().metrics.items():
+            log_ansi_encoded_string(message=f"{key}: {value}")
 
     print_failures_if_apply(failures)
 
@@ -68,6 +68,25 @@ class ProfilerWorkflow(IngestionWorkflow):
         self.steps = (profiler_processor, pii_processor, glossary_processor, sink)
         # self.steps = (profiler_processor, pii_processor, sink)
 
+    def execute_internal(self):
+        """
+        If the profiler processor is configured with `tableThreads`, profile
+        the tables in parallel and pass the results down to the rest of the steps.
+        """
+        profiler_processor, *next_steps = self.steps
+        if not (
+            isinstance(profiler_processor, ProfilerProcessor)
+            and profiler_processor.is_parallel
+        ):
+            super().execute_internal()
+            return
+
+        for processed_record in profiler_processor.run_parallel(self.source.run()):
+            if processed_record is not None:
+                self._run_steps(processed_record, next_steps)
+
+        self._finish_steps()
+
     def test_connection(self):
         service_config = self.config.source.serviceConnection.__root__.config
         conn = get_connection(service_config)
@@ -0,0 +1,222 @@
+#  Copyright 2021 Collate
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""
+Validate the bulk mode of the Metadata REST Sink against a local stand-in server
+"""
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from metadata.generated.schema.api.data.createTable import CreateTableRequest
+from metadata.generated.schema.entity.data.table import Column, DataType
+from metadata.generated.schema.entity.services.connections.metadata.openMetadataConnection import (
+    OpenMetadataConnection,
+)
+from metadata.generated.schema.security.client.openMetadataJWTClientConfig import (
+    OpenMetadataJWTClientConfig,
+)
+from metadata.ingestion.ometa.ometa_api import OpenMetadata
+from metadata.ingestion.sink.metadata_rest import MetadataRestSink
+
+SCHEMA_FQN = "service.database.schema"
+# Latency the stand-in server adds to every request to mimic a real round-trip
+REQUEST_LATENCY = 0.002
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Stores the calls received by the handler"""
+
+    daemon_threads = True
+
+    def __init__(self, address, handler, support_bulk: bool = True):
+        super().__init__(address, handler)
+        self.support_bulk = support_bulk
+        self.calls = []
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Minimal PUT /tables and PUT /tables/bulk implementation"""
+
+    def log_message(self, *_):  # pylint: disable=arguments-differ
+        """Keep the test output clean"""
+
+    @staticmethod
+    def _table(request: dict) -> dict:
+        return {
+            "id": str(uuid.uuid4()),
+            "name": request["name"],
+            "fullyQualifiedName": f"{SCHEMA_FQN}.{request['name']}",
+            "columns": request["columns"],
+        }
+
+    def _reply(self, code: int, body) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_PUT(self):  # pylint: disable=invalid-name
+        """Create or update one or many tables"""
+        time.sleep(REQUEST_LATENCY)
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.calls.append(self.path)
+
+        if self.path == "/api/v1/tables":
+            self._reply(200, self._table(body))
+        elif self.path == "/api/v1/tables/bulk" and self.server.support_bulk:
+            self._reply(
+                200,
+                [
+                    None if request["name"].startswith("broken") else self._table(request)
+                    for request in body
+                ],
+            )
+        else:
+            self._reply(404, {"code": 404, "message": f"{self.path} not found"})
+
+
+def _start_server(support_bulk: bool = True) -> StandInServer:
+    server = StandInServer(("localhost", 0), StandInHandler, support_bulk=support_bulk)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def stand_in_server():
+    server = _start_server()
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def stand_in_server_without_bulk():
+    server = _start_server(support_bulk=False)
+    yield server
+    server.shutdown()
+
+
+def _metadata(server: StandInServer) -> OpenMetadata:
+    return OpenMetadata(
+        OpenMetadataConnection(
+            hostPort=f"http://localhost:{server.server_address[1]}/api",
+            authProvider="openmetadata",
+            securityConfig=OpenMetadataJWTClientConfig(jwtToken="token"),
+            enableVersionValidation=False,
+        )
+    )
+
+
+def _table_requests(count: int, prefix: str = "table"):
+    return [
+        CreateTableRequest(
+            name=f"{prefix}_{i}",
+            databaseSchema=SCHEMA_FQN,
+            columns=[Column(name="id", dataType=DataType.INT)],
+        )
+        for i in range(count)
+    ]
+
+
+def _run_sink(sink: MetadataRestSink, requests) -> None:
+    for request in requests:
+        sink.run(request)
+    sink.flush()
+
+
+def test_single_request_mode(stand_in_server):
+    """Without bulk size, each record is its own PUT"""
+    sink = MetadataRestSink.create({}, _metadata(stand_in_server))
+    acks = []
+    sink.add_ack_listener(lambda record, result: acks.append(result.right))
+    _run_sink(sink, _table_requests(5))
+
+    assert stand_in_server.calls == ["/api/v1/tables"] * 5
+    assert len(sink.status.records) == 5
+    assert [table.name.__root__ for table in acks] == [f"table_{i}" for i in range(5)]
+
+
+def test_bulk_mode(stand_in_server):
+    """Records are buffered and the status is updated at flush time"""
+    sink = MetadataRestSink.create({"bulk_size": 4}, _metadata(stand_in_server))
+    acks = []
+    sink.add_ack_listener(lambda record, result: acks.append((record, result)))
+    requests = _table_requests(9) + _table_requests(1, prefix="broken")
+
+    for request in requests[:3]:
+        assert sink.run(request) is None
+    assert not stand_in_server.calls
+    assert not sink.status.records
+    assert not acks
+
+    _run_sink(sink, requests[3:])
+
+    assert stand_in_server.calls == ["/api/v1/tables/bulk"] * 3
+    assert len(sink.status.records) == 9
+    assert len(sink.status.failures) == 1
+    assert "broken_0" in sink.status.failures[0].name
+
+    # Each record is acknowledged with the entity created, or its error
+    assert [record for record, _ in acks] == requests
+    assert [
+        result.right.fullyQualifiedName.__root__ for _, result in acks[:9]
+    ] == [f"{SCHEMA_FQN}.table_{i}" for i in range(9)]
+    assert acks[9][1].left is not None
+
+
+def test_bulk_mode_flushes_on_interval(stand_in_server):
+    """Old buffered requests are sent even if the bulk size is not reached"""
+    sink = MetadataRestSink.create(
+        {"bulk_size": 100, "bulk_flush_interval": 0}, _metadata(stand_in_server)
+    )
+    _run_sink(sink, _table_requests(2))
+
+    assert stand_in_server.calls == ["/api/v1/tables/bulk"] * 2
+    assert len(sink.status.records) == 2
+
+
+def test_bulk_mode_fallback(stand_in_server_without_bulk):
+    """If the server has no bulk endpoint, we go back to one PUT per record"""
+    sink = MetadataRestSink.create(
+        {"bulk_size": 4}, _metadata(stand_in_server_without_bulk)
+    )
+    _run_sink(sink, _table_requests(6))
+
+    assert not sink.bulk_enabled
+    assert stand_in_server_without_bulk.calls == ["/api/v1/tables/bulk"] + [
+        "/api/v1/tables"
+    ] * 6
+    assert len(sink.status.records) == 6
+
+
+@pytest.mark.slow
+def test_bulk_mode_benchmark(stand_in_server):
+    """Compare the records/sec of the single and bulk modes"""
+    requests = _table_requests(500)
+    throughput = {}
+    for mode, config in (("single", {}), ("bulk", {"bulk_size": 100})):
+        sink = MetadataRestSink.create(config, _metadata(stand_in_server))
+        start = time.perf_counter()
+        _run_sink(sink, requests)
+        throughput[mode] = len(requests) / (time.perf_counter() - start)
+        assert len(sink.status.records) == len(requests)
+
+    print(
+        f"\nMetadataRestSink records/sec - single: {throughput['single']:.0f}, "
+        f"bulk: {throughput['bulk']:.0f}"
+    )
+    assert throughput["bulk"] > throughput["single"]
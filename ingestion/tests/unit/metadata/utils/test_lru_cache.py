@@ -48,3 +48,10 @@ class TestLRUCache:
         cache = LRUCache(2)
         cache.put(1, 2)
         assert cache.get(1) == 2
+
+    def test_pop_removes_the_element(self) -> None:
+        cache = LRUCache(2)
+        cache.put(1, 2)
+        assert cache.pop(1) == 2
+        assert 1 not in cache
+        assert cache.pop(1) is None
@@ -0,0 +1,214 @@
+#  Copyright 2021 Collate
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""
+Validate the approximate distinct / unique count and quantile sketches
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from metadata.generated.schema.entity.data.table import DataType
+from metadata.generated.schema.metadataIngestion.databaseServiceProfilerPipeline import (
+    ApproximateMetricsConfig,
+    DatabaseServiceProfilerPipeline,
+)
+from metadata.profiler.metrics.registry import Metrics
+from metadata.profiler.metrics.sketches import (
+    BottomKSketch,
+    HyperLogLog,
+    KllSketch,
+    get_approximate_config,
+    hash_values,
+)
+from metadata.utils.sqa_like_column import SQALikeColumn
+
+CONFIG = ApproximateMetricsConfig(
+    enabled=True, distinctCountError=0.01, uniqueCountError=0.02
+)
+
+
+def _chunks(num_rows: int = 300_000, chunk_size: int = 50_000):
+    """Values 0..99_999 appearing 1 to 3 times, split in chunks"""
+    rng = np.random.default_rng(42)
+    values = np.concatenate(
+        [np.arange(50_000), np.repeat(np.arange(50_000, 100_000), 2)]
+    )
+    values = rng.permutation(np.concatenate([values, np.arange(90_000, 100_000)]))
+    return [
+        pd.DataFrame({"col": values[start : start + chunk_size]})
+        for start in range(0, min(num_rows, len(values)), chunk_size)
+    ]
+
+
+def _exact(dfs):
+    counts = pd.concat(dfs)["col"].value_counts()
+    return len(counts), int((counts == 1).sum())
+
+
+def test_approximate_config():
+    """Exact mode is the default"""
+    assert get_approximate_config(DatabaseServiceProfilerPipeline()) is None
+    assert (
+        get_approximate_config(
+            DatabaseServiceProfilerPipeline(
+                approximateMetrics=ApproximateMetricsConfig()
+            )
+        )
+        is None
+    )
+    assert get_approximate_config(
+        DatabaseServiceProfilerPipeline(approximateMetrics=CONFIG)
+    )
+
+
+def test_hll_error_bound():
+    """The distinct count is within 3 standard errors"""
+    dfs = _chunks()
+    distinct, _ = _exact(dfs)
+
+    approx = Metrics.DISTINCT_COUNT.value(
+        SQALikeColumn("col", None), approximate=CONFIG
+    ).df_fn(dfs)
+
+    assert abs(approx - distinct) / distinct < 3 * CONFIG.distinctCountError
+    assert (
+        Metrics.DISTINCT_COUNT.value(SQALikeColumn("col", None)).df_fn(dfs)
+        == distinct
+    )
+
+
+def test_unique_count_error_bound():
+    """The unique count is within 3 standard errors of both sketches"""
+    dfs = _chunks()
+    _, unique = _exact(dfs)
+
+    approx = Metrics.UNIQUE_COUNT.value(
+        SQALikeColumn("col", None), approximate=CONFIG
+    ).df_fn(dfs)
+
+    assert abs(approx - unique) / unique < 3 * (
+        CONFIG.distinctCountError + CONFIG.uniqueCountError
+    )
+    assert (
+        Metrics.UNIQUE_COUNT.value(SQALikeColumn("col", None)).df_fn(dfs) == unique
+    )
+
+
+def test_small_columns_are_exact():
+    """Small cardinalities are exact with the bottom-k sketch"""
+    dfs = [
+        pd.DataFrame({"col": ["a", "b", None]}),
+        pd.DataFrame({"col": ["b", "c", "d"]}),
+    ]
+    assert (
+        Metrics.UNIQUE_COUNT.value(
+            SQALikeColumn("col", None), approximate=CONFIG
+        ).df_fn(dfs)
+        == 3
+    )
+    assert (
+        Metrics.DISTINCT_COUNT.value(
+            SQALikeColumn("col", None), approximate=CONFIG
+        ).df_fn(dfs)
+        == 4
+    )
+
+
+def test_unhashable_values():
+    """JSON values are hashed from their JSON representation"""
+    hashes = hash_values(pd.Series([{"a": 1}, [1, 2], {"a": 1}, None]))
+    assert len(hashes) == 3
+    assert hashes[0] == hashes[2]
+
+
+@pytest.mark.parametrize("sketch_cls", [HyperLogLog, BottomKSketch])
+def test_merge(sketch_cls):
+    """Merging per chunk sketches equals sketching all the values at once"""
+    dfs = _chunks()
+    merged = sketch_cls.from_error(0.02)
+    for df in dfs:
+        chunk = sketch_cls.from_error(0.02)
+        chunk.update(hash_values(df["col"]))
+        merged.merge(chunk)
+
+    full = sketch_cls.from_error(0.02)
+    full.update(hash_values(pd.concat(dfs)["col"]))
+
+    if sketch_cls is HyperLogLog:
+        assert np.array_equal(merged.registers, full.registers)
+    else:
+        assert np.array_equal(merged.hashes, full.hashes)
+        assert np.array_equal(merged.counts, full.counts)
+
+
+def test_merge_different_sizes():
+    with pytest.raises(ValueError):
+        HyperLogLog(10).merge(HyperLogLog(12))
+    with pytest.raises(ValueError):
+        BottomKSketch(10).merge(BottomKSketch(12))
+
+
+def test_kll_is_exact_for_small_columns():
+    """Without compaction we match the pandas quantiles"""
+    dfs = [pd.DataFrame({"col": [1, 5, None, 3]}), pd.DataFrame({"col": [8, 2, 2]})]
+    column = SQALikeColumn("col", DataType.INT)
+    values = pd.concat(dfs)["col"]
+
+    assert Metrics.MEDIAN.value(column).df_fn(dfs) == values.median()
+    assert Metrics.FIRST_QUARTILE.value(column).df_fn(dfs) == values.quantile(
+        0.25, interpolation="midpoint"
+    )
+    assert Metrics.THIRD_QUARTILE.value(column).df_fn(dfs) == values.quantile(
+        0.75, interpolation="midpoint"
+    )
+    assert Metrics.MEDIAN.value(column).df_fn([pd.DataFrame({"col": [None]})]) is None
+
+
+def test_kll_rank_error():
+    """The quantiles of 1M values are within the rank error and memory is bounded"""
+    rng = np.random.default_rng(7)
+    values = rng.lognormal(size=1_000_000)
+    sketch = KllSketch(k=512, seed=7)
+    for start in range(0, values.size, 100_000):
+        sketch.update(values[start : start + 100_000])
+
+    sorted_values = np.sort(values)
+    for quantile in (0.25, 0.5, 0.75):
+        rank = np.searchsorted(sorted_values, sketch.quantile(quantile)) / values.size
+        assert abs(rank - quantile) < 0.01
+    assert sum(level.size for level in sketch.levels) < 3 * 512 + 64
+
+
+def test_kll_merge():
+    """Merging per chunk sketches keeps the count and the accuracy"""
+    rng = np.random.default_rng(3)
+    chunks = [rng.normal(size=50_000) for _ in range(10)]
+    merged = KllSketch(k=512, seed=3)
+    for chunk in chunks:
+        sketch = KllSketch(k=512, seed=3)
+        sketch.update(chunk)
+        merged.merge(sketch)
+
+    assert merged.count == 500_000
+    assert abs(merged.quantile(0.5)) < 0.02
+    with pytest.raises(ValueError):
+        merged.merge(KllSketch(k=64))
+
+
+def test_shared_sketch():
+    """The percentile metrics can share a single sketch"""
+    dfs = [pd.DataFrame({"col": np.arange(100)})]
+    column = SQALikeColumn("col", DataType.INT)
+    sketch = KllSketch.from_columns(df["col"] for df in dfs)
+
+    assert Metrics.MEDIAN.value(column, sketch=sketch).df_fn(None) == 49.5
+    assert Metrics.FIRST_QUARTILE.value(column, sketch=sketch).df_fn(None) == 24.5
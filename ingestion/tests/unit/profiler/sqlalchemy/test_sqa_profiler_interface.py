@@ -19,7 +19,8 @@ from unittest import TestCase
 from unittest.mock import patch
 from uuid import uuid4
 
-from sqlalchemy import TEXT, Column, Integer, String, inspect
+from sqlalchemy import TEXT, Column, Integer, String, event, inspect
+from sqlalchemy.exc import ProgrammingError
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm.session import Session
 
@@ -38,6 +39,9 @@ from metadata.generated.schema.entity.services.connections.database.sqliteConnec
     SQLiteConnection,
     SQLiteScheme,
 )
+from metadata.generated.schema.metadataIngestion.databaseServiceProfilerPipeline import (
+    DatabaseServiceProfilerPipeline,
+)
 from metadata.profiler.api.models import ThreadPoolMetrics
 from metadata.profiler.interface.sqlalchemy.profiler_interface import (
     SQAProfilerInterface,
@@ -247,6 +251,83 @@ class SQAInterfaceTestMultiThread(TestCase):
         assert name_column_profile.nullCount == 0
         assert id_column_profile.median == 1.0
 
+    def _static_column_metrics(self):
+        return [
+            ThreadPoolMetrics(
+                metrics=[
+                    metric
+                    for metric in self.static_metrics
+                    if metric.is_col_metric() and not metric.is_window_metric()
+                ],
+                metric_type=MetricTypes.Static,
+                column=col,
+                table=self.table,
+            )
+            for col in inspect(User).c
+        ]
+
+    def _get_all_metrics_counting_queries(self, metric_funcs, fuse: bool):
+        """Return the results and the number of queries sent to the database"""
+        statements = []
+
+        def count_statement(_, __, statement, *args):
+            statements.append(statement)
+
+        engine = self.sqa_profiler_interface.session.get_bind()
+        self.sqa_profiler_interface.source_config = DatabaseServiceProfilerPipeline(
+            fuseStaticMetrics=fuse
+        )
+        event.listen(engine, "before_cursor_execute", count_statement)
+        try:
+            profile_results = self.sqa_profiler_interface.get_all_metrics(metric_funcs)
+        finally:
+            event.remove(engine, "before_cursor_execute", count_statement)
+            self.sqa_profiler_interface.source_config = None
+        return profile_results, len(statements)
+
+    def test_fused_static_metrics(self):
+        """Static metrics of all columns are computed with a single query"""
+        per_column, per_column_queries = self._get_all_metrics_counting_queries(
+            self._static_column_metrics(), fuse=False
+        )
+        fused, fused_queries = self._get_all_metrics_counting_queries(
+            self._static_column_metrics(), fuse=True
+        )
+
+        assert per_column_queries == len(inspect(User).c)
+        assert fused_queries == 1
+        for col in inspect(User).c:
+            expected = {**per_column["columns"][col.name], "timestamp": None}
+            assert {**fused["columns"][col.name], "timestamp": None} == expected
+        assert fused["columns"]["age"]["max"] == 31
+        assert fused["columns"]["nickname"]["nullCount"] == 1
+
+    def test_fused_static_metrics_width(self):
+        """Wide tables are split in several queries"""
+        with patch(
+            "metadata.profiler.interface.sqlalchemy.profiler_interface.FUSED_STATIC_METRICS_MAX_WIDTH",
+            len(self._static_column_metrics()[0].metrics) * 2,
+        ):
+            _, queries = self._get_all_metrics_counting_queries(
+                self._static_column_metrics(), fuse=True
+            )
+        assert queries == 3
+
+    def test_fused_static_metrics_fallback(self):
+        """If the fused metrics fail, we compute the metrics column by column"""
+        for error in (
+            ProgrammingError("SELECT", {}, Exception("overflow")),
+            TypeError("Cannot build the metric for the column type"),
+        ):
+            with self.subTest(error=error), patch.object(
+                SQAProfilerInterface, "_compute_fused_static_metrics", side_effect=error
+            ):
+                fused, queries = self._get_all_metrics_counting_queries(
+                    self._static_column_metrics(), fuse=True
+                )
+                assert queries == len(inspect(User).c)
+                assert fused["columns"]["age"]["max"] == 31
+
     @classmethod
     def tearDownClass(cls) -> None:
         os.remove(cls.db_path)
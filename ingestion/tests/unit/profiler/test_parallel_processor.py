@@ -0,0 +1,330 @@
+#  Copyright 2021 Collate
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""
+Validate the table-parallel mode of the ProfilerProcessor
+"""
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from copy import deepcopy
+
+import pytest
+import sqlalchemy as sqa
+from sqlalchemy.orm import declarative_base
+
+from metadata.generated.schema.entity.data.table import Column, DataType, Table
+from metadata.generated.schema.entity.services.connections.database.sqliteConnection import (
+    SQLiteConnection,
+    SQLiteScheme,
+)
+from metadata.generated.schema.entity.services.databaseService import (
+    DatabaseServiceType,
+)
+from metadata.generated.schema.metadataIngestion.databaseServiceProfilerPipeline import (
+    DatabaseServiceProfilerPipeline,
+)
+from metadata.generated.schema.type.entityReference import EntityReference
+from metadata.ingestion.api.parser import parse_workflow_config_gracefully
+from metadata.profiler.api.models import ProfilerResponse
+from metadata.profiler.interface.sqlalchemy.profiler_interface import (
+    SQAProfilerInterface,
+)
+from metadata.profiler.processor.default import DefaultProfiler
+from metadata.profiler.processor.processor import ProfilerProcessor
+from metadata.profiler.source.base.profiler_source import ProfilerSource
+from metadata.profiler.source.metadata import ProfilerSourceAndEntity
+
+CONFIG = {
+    "source": {
+        "type": "sqlite",
+        "serviceName": "my_service",
+        "serviceConnection": {"config": {"type": "SQLite"}},
+        "sourceConfig": {"config": {"type": "Profiler"}},
+    },
+    "processor": {"type": "orm-profiler", "config": {}},
+    "sink": {"type": "metadata-rest", "config": {}},
+    "workflowConfig": {
+        "openMetadataServerConfig": {
+            "hostPort": "http://localhost:8585/api",
+            "authProvider": "openmetadata",
+            "securityConfig": {"jwtToken": "token"},
+        }
+    },
+}
+
+
+def _processor(**processor_config) -> ProfilerProcessor:
+    config = deepcopy(CONFIG)
+    config["processor"]["config"] = processor_config
+    return ProfilerProcessor(config=parse_workflow_config_gracefully(config))
+
+
+def _table(name: str, database: str = "db") -> Table:
+    return Table(
+        id=uuid.uuid4(),
+        name=name,
+        fullyQualifiedName=f"my_service.{database}.main.{name}",
+        columns=[Column(name="id", dataType=DataType.INT)],
+        database=EntityReference(
+            id=uuid.uuid4(),
+            type="database",
+            fullyQualifiedName=f"my_service.{database}",
+        ),
+    )
+
+
+class StubInterface:
+    """Only what the processor reads from the interface"""
+
+    def __init__(self):
+        self.status = type("Status", (), {"failures": []})()
+
+
+class StubRunner:
+    """Sleep for the given time, tracking the tables running by database"""
+
+    def __init__(self, entity: Table, delay: float, tracker: "ConcurrencyTracker"):
+        self.entity = entity
+        self.delay = delay
+        self.tracker = tracker
+        self.profiler_interface = StubInterface()
+
+    def process(self) -> ProfilerResponse:
+        database = self.entity.database.fullyQualifiedName
+        self.tracker.enter(database)
+        time.sleep(self.delay(self.entity) if callable(self.delay) else self.delay)
+        self.tracker.exit(database)
+        if self.entity.name.__root__.startswith("broken"):
+            raise RuntimeError("Could not profile the table")
+        return ProfilerResponse.construct(table=self.entity)
+
+    def close(self):
+        """Nothing to close"""
+
+
+class ConcurrencyTracker:
+    """Max number of tables profiled at the same time, by database"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = defaultdict(int)
+        self.max_running = defaultdict(int)
+
+    def enter(self, database: str):
+        with self.lock:
+            self.running[database] += 1
+            self.max_running[database] = max(
+                self.max_running[database], self.running[database]
+            )
+
+    def exit(self, database: str):
+        with self.lock:
+            self.running[database] -= 1
+
+
+class StubProfilerSource(ProfilerSource):
+    """Return stub runners"""
+
+    # pylint: disable=super-init-not-called
+    def __init__(self, delay, tracker: ConcurrencyTracker):
+        self.delay = delay
+        self.tracker = tracker
+
+    def get_profiler_runner(self, entity, profiler_config):
+        return StubRunner(entity, self.delay, self.tracker)
+
+
+def _records(tables, delay=0.01, tracker=None):
+    source = StubProfilerSource(delay, tracker or ConcurrencyTracker())
+    return [
+        ProfilerSourceAndEntity(profiler_source=source, entity=table)
+        for table in tables
+    ]
+
+
+def _names(results):
+    return [result.table.name.__root__ for result in results if result]
+
+
+def test_parallel_mode_config():
+    """Parallel mode is opt-in"""
+    assert not _processor().is_parallel
+    assert _processor(tableThreads=4).is_parallel
+
+
+def test_ordered_results():
+    """Results follow the order of the records even if later tables finish first"""
+    tables = [_table(f"table_{i}") for i in range(10)]
+    records = _records(
+        tables, delay=lambda table: 0.05 if table.name.__root__ == "table_0" else 0
+    )
+
+    processor = _processor(tableThreads=4)
+    start = time.perf_counter()
+    results = list(processor.run_parallel(records))
+
+    assert _names(results) == [f"table_{i}" for i in range(10)]
+    assert len(processor.status.records) == 10
+    assert time.perf_counter() - start < 0.5
+
+
+def test_unordered_results():
+    """Results are emitted as soon as they are ready"""
+    tables = [_table(f"table_{i}") for i in range(4)]
+    records = _records(
+        tables, delay=lambda table: 0.1 if table.name.__root__ == "table_0" else 0
+    )
+
+    results = list(
+        _processor(tableThreads=4, orderedResults=False).run_parallel(records)
+    )
+
+    assert sorted(_names(results)) == [f"table_{i}" for i in range(4)]
+    assert _names(results)[-1] == "table_0"
+
+
+def test_database_budget():
+    """We never profile more tables of the same database than the budget"""
+    tracker = ConcurrencyTracker()
+    tables = [_table(f"a_{i}", database="db_a") for i in range(8)] + [
+        _table(f"b_{i}", database="db_b") for i in range(8)
+    ]
+
+    results = list(
+        _processor(tableThreads=8, maxTablesPerDatabase=2).run_parallel(
+            _records(tables, tracker=tracker)
+        )
+    )
+
+    assert len(_names(results)) == 16
+    assert tracker.max_running["my_service.db_a"] <= 2
+    assert tracker.max_running["my_service.db_b"] <= 2
+
+
+def test_failures_are_reported():
+    """A failing table does not stop the others"""
+    tables = [_table("table_0"), _table("broken_table"), _table("table_1")]
+    processor = _processor(tableThreads=2)
+
+    results = list(processor.run_parallel(_records(tables)))
+
+    assert _names(results) == ["table_0", "table_1"]
+    assert results[1] is None
+    assert len(processor.status.failures) == 1
+    assert processor.status.failures[0].name == "my_service.db.main.broken_table"
+
+
+class SQLiteProfilerSource(ProfilerSource):
+    """Build real SQLAlchemy profilers over a SQLite file"""
+
+    # pylint: disable=super-init-not-called
+    def __init__(self, connection: SQLiteConnection, orm_tables: dict):
+        self.connection = connection
+        self.orm_tables = orm_tables
+
+    def get_profiler_runner(self, entity, profiler_config):
+        orm_table = self.orm_tables[entity.name.__root__]
+
+        class Interface(SQAProfilerInterface):
+            def _convert_table_to_orm_object(self, sqa_metadata_obj=None):
+                return orm_table
+
+        interface = Interface(
+            self.connection,
+            None,
+            entity,
+            None,
+            None,
+            DatabaseServiceProfilerPipeline(generateSampleData=False),
+            None,
+            None,
+            1,
+            43200,
+        )
+        return DefaultProfiler(profiler_interface=interface)
+
+
+@pytest.mark.slow
+def test_parallel_profiler_benchmark():
+    """Tables/minute of the real SQLAlchemy profiler by number of threads"""
+    num_tables = 40
+    base = declarative_base()
+    orm_tables = {
+        f"table_{i}": type(
+            f"Table{i}",
+            (base,),
+            {
+                "__tablename__": f"table_{i}",
+                "id": sqa.Column(sqa.Integer, primary_key=True),
+                "name": sqa.Column(sqa.String(256)),
+                "age": sqa.Column(sqa.Integer),
+            },
+        )
+        for i in range(num_tables)
+    }
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "benchmark.db")
+        engine = sqa.create_engine(f"sqlite:///{db_path}")
+        base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            for orm_table in orm_tables.values():
+                conn.execute(
+                    orm_table.__table__.insert(),
+                    [{"name": f"name_{j}", "age": j % 90} for j in range(2000)],
+                )
+        engine.dispose()
+
+        source = SQLiteProfilerSource(
+            SQLiteConnection(
+                scheme=SQLiteScheme.sqlite_pysqlite,
+                databaseMode=db_path + "?check_same_thread=False",
+            ),
+            orm_tables,
+        )
+        tables = [
+            Table(
+                id=uuid.uuid4(),
+                name=name,
+                fullyQualifiedName=f"my_service.db.main.{name}",
+                serviceType=DatabaseServiceType.SQLite,
+                columns=[
+                    Column(name="id", dataType=DataType.INT),
+                    Column(name="name", dataType=DataType.STRING),
+                    Column(name="age", dataType=DataType.INT),
+                ],
+            )
+            for name in orm_tables
+        ]
+        records = [
+            ProfilerSourceAndEntity(profiler_source=source, entity=table)
+            for table in tables
+        ]
+
+        throughput = {}
+        for threads in (1, 2, 4):
+            processor = _processor(tableThreads=threads)
+            start = time.perf_counter()
+            if processor.is_parallel:
+                results = list(processor.run_parallel(records))
+            else:
+                results = [processor.run(record) for record in records]
+            throughput[threads] = num_tables * 60 / (time.perf_counter() - start)
+            assert len(_names(results)) == num_tables
+
+    print(
+        "\nProfiled tables/minute by threads: "
+        + ", ".join(f"{threads}: {value:.0f}" for threads, value in throughput.items())
+    )
@@ -12,14 +12,26 @@
 """
 Validate factory and logic to read dataframes from local.
 """
+import gzip
+import io
+import json
+import tempfile
+import zipfile
 from pathlib import Path
 from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
 
 from metadata.generated.schema.entity.services.connections.database.datalakeConnection import (
     LocalConfig,
 )
+from metadata.readers.dataframe.avro import AvroDataFrameReader
+from metadata.readers.dataframe.common import parquet_to_chunks
+from metadata.readers.dataframe.json import JSONDataFrameReader
 from metadata.readers.dataframe.models import DatalakeTableSchemaWrapper
 from metadata.readers.dataframe.reader_factory import SupportedTypes
+from metadata.mixins.pandas.pandas_mixin import sample_rows
 from metadata.utils.datalake.datalake_utils import fetch_dataframe
 
 ROOT_PATH = Path(__file__).parent.parent / "resources" / "datalake"
@@ -34,12 +46,16 @@ class TestDataFrameReader(TestCase):
     def test_dsv_no_extension_reader(self):
         key = ROOT_PATH / "transactions_1"
 
-        df_list = fetch_dataframe(
-            config_source=LocalConfig(),
-            client=None,
-            file_fqn=DatalakeTableSchemaWrapper(
-                key=str(key), bucket_name="unused", file_extension=SupportedTypes.CSV
-            ),
+        df_list = list(
+            fetch_dataframe(
+                config_source=LocalConfig(),
+                client=None,
+                file_fqn=DatalakeTableSchemaWrapper(
+                    key=str(key),
+                    bucket_name="unused",
+                    file_extension=SupportedTypes.CSV,
+                ),
+            )
         )
 
         self.assertIsNotNone(df_list)
@@ -53,10 +69,12 @@ class TestDataFrameReader(TestCase):
     def test_dsv_reader(self):
         key = ROOT_PATH / "transactions_1.csv"
 
-        df_list = fetch_dataframe(
-            config_source=LocalConfig(),
-            client=None,
-            file_fqn=DatalakeTableSchemaWrapper(key=str(key), bucket_name="unused"),
+        df_list = list(
+            fetch_dataframe(
+                config_source=LocalConfig(),
+                client=None,
+                file_fqn=DatalakeTableSchemaWrapper(key=str(key), bucket_name="unused"),
+            )
         )
 
         self.assertIsNotNone(df_list)
@@ -70,12 +88,14 @@ class TestDataFrameReader(TestCase):
     def test_dsv_reader_with_separator(self):
         key = ROOT_PATH / "transactions_separator.csv"
 
-        df_list = fetch_dataframe(
-            config_source=LocalConfig(),
-            client=None,
-            file_fqn=DatalakeTableSchemaWrapper(
-                key=str(key), bucket_name="unused", separator=";"
-            ),
+        df_list = list(
+            fetch_dataframe(
+                config_source=LocalConfig(),
+                client=None,
+                file_fqn=DatalakeTableSchemaWrapper(
+                    key=str(key), bucket_name="unused", separator=";"
+                ),
+            )
         )
 
         self.assertIsNotNone(df_list)
@@ -89,10 +109,12 @@ class TestDataFrameReader(TestCase):
     def test_json_reader(self):
         key = ROOT_PATH / "employees.json"
 
-        df_list = fetch_dataframe(
-            config_source=LocalConfig(),
-            client=None,
-            file_fqn=DatalakeTableSchemaWrapper(key=str(key), bucket_name="unused"),
+        df_list = list(
+            fetch_dataframe(
+                config_source=LocalConfig(),
+                client=None,
+                file_fqn=DatalakeTableSchemaWrapper(key=str(key), bucket_name="unused"),
+            )
         )
 
         self.assertIsNotNone(df_list)
@@ -107,10 +129,12 @@ class TestDataFrameReader(TestCase):
     def test_avro_reader(self):
         key = ROOT_PATH / "example.avro"
 
-        df_list = fetch_dataframe(
-            config_source=LocalConfig(),
-            client=None,
-            file_fqn=DatalakeTableSchemaWrapper(key=str(key), bucket_name="unused"),
+        df_list = list(
+            fetch_dataframe(
+                config_source=LocalConfig(),
+                client=None,
+                file_fqn=DatalakeTableSchemaWrapper(key=str(key), bucket_name="unused"),
+            )
         )
 
         self.assertIsNotNone(df_list)
@@ -130,3 +154,206 @@ class TestDataFrameReader(TestCase):
                 "DateTime64",
             ],
         )
+
+
+class TestStreamingDataFrameReader(TestCase):
+    """
+    The readers return lazy iterators of CHUNKSIZE rows
+    """
+
+    data = pd.DataFrame({"id": range(5), "name": [f"name_{i}" for i in range(5)]})
+
+    def _read(self, key: Path):
+        with patch("metadata.readers.dataframe.common.CHUNKSIZE", 2), patch(
+            "metadata.readers.dataframe.dsv.CHUNKSIZE", 2
+        ):
+            chunks = fetch_dataframe(
+                config_source=LocalConfig(),
+                client=None,
+                file_fqn=DatalakeTableSchemaWrapper(key=str(key), bucket_name="unused"),
+            )
+            self.assertFalse(isinstance(chunks, list))
+            df_list = list(chunks)
+
+        self.assertEqual([len(df) for df in df_list], [2, 2, 1])
+        self.assertTrue(
+            pd.concat(df_list, ignore_index=True)[["id", "name"]].equals(self.data)
+        )
+
+    def test_streaming_readers(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_path = Path(tmp_dir)
+
+            self.data.to_csv(tmp_path / "data.csv", index=False)
+            self._read(tmp_path / "data.csv")
+
+            # 2 row groups of 3 and 2 rows, read in batches of 2
+            self.data.to_parquet(tmp_path / "data.parquet", row_group_size=3)
+            self._read(tmp_path / "data.parquet")
+
+            (tmp_path / "data.json").write_text(
+                "\n".join(json.dumps(row) for row in self.data.to_dict("records"))
+            )
+            self._read(tmp_path / "data.json")
+
+            self._write_avro(tmp_path / "data.avro")
+            self._read(tmp_path / "data.avro")
+
+    def test_parquet_dataset(self):
+        """Directories of parquet files are read as a partitioned dataset"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # As written by Spark
+            tmp_path = Path(tmp_dir) / "table.parquet"
+            for part, rows in (("a", self.data[:3]), ("b", self.data[3:])):
+                (tmp_path / f"part={part}").mkdir(parents=True)
+                rows.to_parquet(tmp_path / f"part={part}" / "data.parquet")
+
+            chunks = fetch_dataframe(
+                config_source=LocalConfig(),
+                client=None,
+                file_fqn=DatalakeTableSchemaWrapper(
+                    key=str(tmp_path), bucket_name="unused"
+                ),
+            )
+            data = pd.concat(list(chunks), ignore_index=True)
+
+        self.assertEqual(sorted(data["id"]), list(range(5)))
+        self.assertEqual(sorted(data["part"].astype(str).unique()), ["a", "b"])
+
+    def test_parquet_file_closed(self):
+        """The parquet file is closed once its chunks are consumed"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "data.parquet"
+            self.data.to_parquet(path)
+            # pylint: disable=consider-using-with
+            file = open(path, "rb")
+            filesystem = MagicMock(isdir=lambda _: False, open=lambda *_: file)
+
+            chunks = parquet_to_chunks(str(path), filesystem)
+            self.assertFalse(file.closed)
+            self.assertEqual(len(pd.concat(list(chunks))), 5)
+            self.assertTrue(file.closed)
+
+    def _write_avro(self, path: Path, data: pd.DataFrame = None):
+        # pylint: disable=import-outside-toplevel
+        from avro.datafile import DataFileWriter
+        from avro.io import DatumWriter
+        from avro.schema import parse
+
+        schema = parse(
+            json.dumps(
+                {
+                    "type": "record",
+                    "name": "Row",
+                    "fields": [
+                        {"name": "id", "type": "long"},
+                        {"name": "name", "type": "string"},
+                    ],
+                }
+            )
+        )
+        with open(path, "wb") as file:
+            writer = DataFileWriter(file, DatumWriter(), schema)
+            for row in (self.data if data is None else data).to_dict("records"):
+                writer.append(row)
+            writer.close()
+
+    def test_avro_columns(self):
+        """The schema is available before consuming the chunks"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "data.avro"
+            self._write_avro(path)
+            wrapper = AvroDataFrameReader.read_from_avro(path.read_bytes())
+
+        self.assertEqual(
+            [col.name.__root__ for col in wrapper.columns[0].children], ["id", "name"]
+        )
+        self.assertEqual(len(next(wrapper.dataframes)), 5)
+
+    def test_json_lines_streamed(self):
+        """JSON Lines are parsed as the chunks are consumed, whatever the compression"""
+        rows = "".join(json.dumps({"id": i}) + "\n" for i in range(20000)).encode()
+        zip_file = io.BytesIO()
+        with zipfile.ZipFile(zip_file, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("data.json", rows)
+
+        for key, content in (
+            ("data.json", rows),
+            ("data.json.gz", gzip.compress(rows)),
+            ("data.json.zip", zip_file.getvalue()),
+        ):
+            with self.subTest(key=key), patch(
+                "metadata.readers.dataframe.common.CHUNKSIZE", 2
+            ):
+                file = io.BytesIO(content)
+                chunks, raw_data = JSONDataFrameReader.read_from_json(
+                    key=key, json_text=file
+                )
+                self.assertIsNone(raw_data)
+                self.assertEqual(list(next(chunks)["id"]), [0, 1])
+                self.assertLess(file.tell(), len(content))
+                self.assertEqual(sum(len(chunk) for chunk in chunks), 19998)
+                self.assertTrue(file.closed)
+
+    def test_json_document(self):
+        """A document spread over several lines is still read whole"""
+        content = json.dumps(self.data.to_dict("records"), indent=2).encode()
+        chunks, _ = JSONDataFrameReader.read_from_json(
+            key="data.json", json_text=io.BytesIO(content)
+        )
+        self.assertTrue(pd.concat(list(chunks)).equals(self.data))
+
+        with self.assertRaises(json.decoder.JSONDecodeError):
+            JSONDataFrameReader.read_from_json(
+                key="data.json", json_text=b'{"id": 1}\nnot json\n'
+            )
+
+    def test_avro_streamed(self):
+        """Avro blocks are decoded as the chunks are consumed"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "data.avro"
+            self._write_avro(
+                path,
+                pd.DataFrame(
+                    {"id": range(5000), "name": [f"name_{i}" for i in range(5000)]}
+                ),
+            )
+            with patch("metadata.readers.dataframe.common.CHUNKSIZE", 2):
+                # pylint: disable=consider-using-with
+                file = open(path, "rb")
+                wrapper = AvroDataFrameReader.read_from_avro(file)
+                self.assertEqual(len(next(wrapper.dataframes)), 2)
+                self.assertLess(file.tell(), path.stat().st_size)
+                self.assertEqual(sum(len(chunk) for chunk in wrapper.dataframes), 4998)
+                self.assertTrue(file.closed)
+
+    def test_avro_schema_fallback(self):
+        """A file that is not an Avro data file is read as an Avro schema"""
+        schema = {
+            "type": "record",
+            "name": "Row",
+            "fields": [{"name": "id", "type": "long"}],
+        }
+        wrapper = AvroDataFrameReader.read_from_avro(
+            io.BytesIO(json.dumps(schema).encode())
+        )
+        self.assertEqual(
+            [col.name.__root__ for col in wrapper.columns[0].children], ["id"]
+        )
+        self.assertEqual(list(next(wrapper.dataframes).columns), ["Row"])
+
+    def test_sample_rows(self):
+        """We keep a uniform sample of the rows without holding every chunk"""
+        chunks = (
+            pd.DataFrame({"id": range(start, start + 100)})
+            for start in range(0, 1000, 100)
+        )
+        sample = sample_rows(chunks, 50)
+
+        self.assertEqual(len(sample), 1)
+        self.assertEqual(len(sample[0]), 50)
+        self.assertEqual(sample[0]["id"].nunique(), 50)
+        self.assertGreater(sample[0]["id"].max(), 100)
+
+        self.assertEqual(len(sample_rows(iter([self.data]), 50)[0]), 5)
+        self.assertEqual(sample_rows(iter([]), 50), [])
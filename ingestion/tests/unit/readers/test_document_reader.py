@@ -0,0 +1,136 @@
+#  Copyright 2021 Collate
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""
+Validate that documents are read from S3 without downloading them
+"""
+import io
+import os
+import re
+import zipfile
+
+import pytest
+
+from metadata.readers.file.base import ReadException
+from metadata.readers.file.document import open_document
+
+BUCKET = "bucket"
+PARAGRAPH_NS = "http://www.hancom.co.kr/hwpml/2011/paragraph"
+
+
+class FakeS3Client:
+    """In-memory objects, honouring the Range header and tracking the bytes sent"""
+
+    def __init__(self, objects: dict):
+        self.objects = objects
+        self.bytes_sent = 0
+
+    def get_object(self, Bucket, Key, Range=None):  # pylint: disable=invalid-name
+        data = self.objects[Key]
+        if Range:
+            start, end = map(int, re.match(r"bytes=(\d+)-(\d+)", Range).groups())
+            data = data[start : end + 1]
+        self.bytes_sent += len(data)
+        return {"Body": io.BytesIO(data)}
+
+    def head_object(self, Bucket, Key):  # pylint: disable=invalid-name
+        if Key not in self.objects:
+            raise KeyError(Key)
+        return {"ContentLength": len(self.objects[Key])}
+
+    def download_file(self, bucket, key, local_file_path):
+        with open(local_file_path, "wb") as file:
+            file.write(self.objects[key])
+
+
+def _section(paragraphs) -> str:
+    return (
+        f'<hs:sec xmlns:hs="http://www.hancom.co.kr/hwpml/2011/section" xmlns:hp="{PARAGRAPH_NS}">'
+        + "".join(f"<hp:p><hp:run><hp:t>{text}</hp:t></hp:run></hp:p>" for text in paragraphs)
+        + "</hs:sec>"
+    )
+
+
+def _hwpx_bytes() -> bytes:
+    """HWPX archive with two sections and a big picture we never need to read"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr(
+            "Contents/content.hpf",
+            '<opf:package xmlns:opf="http://www.idpf.org/2007/opf/">'
+            "<opf:metadata><opf:title>Report</opf:title>"
+            '<opf:meta name="creator">Kim</opf:meta></opf:metadata></opf:package>',
+        )
+        archive.writestr(
+            "Contents/section0.xml",
+            _section([f"first section paragraph {i}" for i in range(50)]),
+            compress_type=zipfile.ZIP_DEFLATED,
+        )
+        archive.writestr(
+            "Contents/section1.xml", _section(["second section paragraph"])
+        )
+        archive.writestr("BinData/image1.bmp", os.urandom(2 * 1024 * 1024))
+    return buffer.getvalue()
+
+
+def test_hwpx_range_read():
+    """Only the members the extractor needs are fetched"""
+    pytest.importorskip("hwp5")
+    from metadata.utils.word.hwp_extractor import HwpMetadataExtractor
+
+    data = _hwpx_bytes()
+    client = FakeS3Client({"docs/report.hwpx": data})
+
+    with open_document(client, BUCKET, "docs/report.hwpx") as document:
+        assert not isinstance(document, str)
+        extractor = HwpMetadataExtractor(document, summarize=False)
+        assert not extractor.is_hwp
+        metadata = extractor.get_metadata()
+        sample = extractor.get_sample_data(60)
+
+    assert metadata == {"title": "Report", "creator": "Kim"}
+    assert extractor.sample_text.startswith("first section paragraph 0\n")
+    assert extractor.sample_text.endswith("second section paragraph\n")
+    # The sample stops at the first paragraphs of the first section
+    assert sample == "".join(f"first section paragraph {i}\n" for i in range(3))
+    assert client.bytes_sent < len(data) / 10
+
+
+def test_small_documents_in_memory():
+    """Small OLE/Word documents are read in a buffer named after the key"""
+    client = FakeS3Client({"docs/report.hwp": b"hwp data"})
+
+    with open_document(client, BUCKET, "docs/report.hwp", size=8) as document:
+        assert isinstance(document, io.BytesIO)
+        assert document.name == "docs/report.hwp"
+        assert document.read() == b"hwp data"
+
+
+def test_big_documents_in_temp_file(tmp_path, monkeypatch):
+    """Documents above the threshold go to a temporary file removed afterwards"""
+    monkeypatch.setenv("AIRFLOW_HOME", str(tmp_path))
+    client = FakeS3Client({"docs/report.docx": b"docx data"})
+
+    with open_document(
+        client, BUCKET, "docs/report.docx", temp_file_threshold=4
+    ) as document:
+        assert document.startswith(str(tmp_path / "tmp"))
+        assert document.endswith(".docx")
+        with open(document, "rb") as file:
+            assert file.read() == b"docx data"
+
+    assert not os.path.exists(document)
+
+
+def test_missing_document():
+    with pytest.raises(ReadException):
+        with open_document(FakeS3Client({}), BUCKET, "docs/missing.hwp"):
+            pass
@@ -0,0 +1,186 @@
+#  Copyright 2021 Collate
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""
+Validate the range-read schema inference of S3 objects
+"""
+import io
+import os
+import re
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from metadata.generated.schema.entity.data.table import DataType
+from metadata.readers.dataframe.reader_factory import SupportedTypes
+from metadata.readers.dataframe.schema import ObjectSchemaReader, SchemaCache
+from metadata.readers.file.s3 import S3RangeFile
+
+BUCKET = "bucket"
+
+
+class FakeS3Client:
+    """In-memory objects, honouring the Range header and tracking the bytes sent"""
+
+    def __init__(self, objects: dict):
+        self.objects = objects
+        self.bytes_sent = 0
+        self.requests = 0
+
+    def get_object(self, Bucket, Key, Range=None):  # pylint: disable=invalid-name
+        data = self.objects[Key]
+        if Range:
+            start, end = map(int, re.match(r"bytes=(\d+)-(\d+)", Range).groups())
+            data = data[start : end + 1]
+        self.bytes_sent += len(data)
+        self.requests += 1
+        return {"Body": io.BytesIO(data)}
+
+    def head_object(self, Bucket, Key):  # pylint: disable=invalid-name
+        return {"ContentLength": len(self.objects[Key])}
+
+
+def _parquet_bytes(num_rows: int = 200_000) -> bytes:
+    rng = np.random.default_rng(1)
+    buffer = io.BytesIO()
+    pd.DataFrame(
+        {
+            "id": np.arange(num_rows),
+            "value": rng.normal(size=num_rows),
+            "name": [f"name_{i}" for i in range(num_rows)],
+        }
+    ).to_parquet(buffer)
+    return buffer.getvalue()
+
+
+def _csv_bytes(num_rows: int = 100_000, separator: str = ",") -> bytes:
+    return pd.DataFrame(
+        {"id": range(num_rows), "city": ["Seoul"] * num_rows}
+    ).to_csv(index=False, sep=separator).encode()
+
+
+def test_range_file():
+    """Seek and read only the requested bytes"""
+    client = FakeS3Client({"key": bytes(range(100))})
+    file = S3RangeFile(client, BUCKET, "key")
+
+    file.seek(-10, io.SEEK_END)
+    assert file.read(5) == bytes(range(90, 95))
+    assert file.tell() == 95
+    assert file.read() == bytes(range(95, 100))
+    assert file.read() == b""
+    assert file.bytes_read == 10
+
+
+def test_parquet_footer_only():
+    """We read the parquet schema from its footer"""
+    data = _parquet_bytes()
+    client = FakeS3Client({"data.parquet": data})
+
+    columns = ObjectSchemaReader(client).read_columns(
+        BUCKET, "data.parquet", SupportedTypes.PARQUET, size=len(data)
+    )
+
+    assert [column.name.__root__ for column in columns] == ["id", "value", "name"]
+    assert columns[0].dataType == DataType.INT
+    assert columns[2].dataType == DataType.STRING
+    assert client.bytes_sent < len(data) / 4
+
+
+@pytest.mark.parametrize(
+    "file_format,separator",
+    [(SupportedTypes.CSV, ","), (SupportedTypes.TSV, "\t")],
+)
+def test_dsv_head(file_format, separator):
+    """We only read the sample size, cut at the last full line"""
+    data = _csv_bytes(separator=separator)
+    client = FakeS3Client({"data": data})
+
+    columns = ObjectSchemaReader(client, sample_size=4096).read_columns(
+        BUCKET, "data", file_format, size=len(data)
+    )
+
+    assert [column.name.__root__ for column in columns] == ["id", "city"]
+    assert columns[0].dataType == DataType.INT
+    assert client.bytes_sent == 4096
+
+
+def test_dsv_long_line():
+    """The sample grows until it holds a full line"""
+    data = (",".join(f"column_{i}" for i in range(1000)) + "\n1\n").encode()
+    client = FakeS3Client({"data.csv": data})
+
+    columns = ObjectSchemaReader(client, sample_size=1024).read_columns(
+        BUCKET, "data.csv", SupportedTypes.CSV, size=len(data)
+    )
+
+    assert len(columns) == 1000
+
+
+def test_excel_header():
+    """The xlsx columns come from the first rows of the first sheet"""
+    pytest.importorskip("openpyxl")
+    buffer = io.BytesIO()
+    pd.DataFrame({"id": [1, 2], "city": ["Seoul", "Busan"]}).to_excel(
+        buffer, index=False
+    )
+    client = FakeS3Client({"data.xlsx": buffer.getvalue()})
+
+    columns = ObjectSchemaReader(client).read_columns(
+        BUCKET, "data.xlsx", SupportedTypes.EXCEL
+    )
+
+    assert [column.name.__root__ for column in columns] == ["id", "city"]
+
+
+def test_unsupported_format():
+    """Formats without a range-read path fall back to the caller"""
+    client = FakeS3Client({"data.json": b"{}"})
+    assert (
+        ObjectSchemaReader(client).read_columns(
+            BUCKET, "data.json", SupportedTypes.JSON
+        )
+        is None
+    )
+    assert client.requests == 0
+
+
+def test_etag_cache():
+    """Unchanged objects are never read again, even across runs"""
+    data = _csv_bytes(num_rows=10)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "schema_cache.json")
+        client = FakeS3Client({"data.csv": data})
+
+        reader = ObjectSchemaReader(client, cache=SchemaCache(path))
+        first = reader.read_columns(
+            BUCKET, "data.csv", SupportedTypes.CSV, size=len(data), etag='"v1"'
+        )
+        reader.cache.save()
+        requests = client.requests
+
+        reader = ObjectSchemaReader(client, cache=SchemaCache(path))
+        assert (
+            reader.read_columns(
+                BUCKET, "data.csv", SupportedTypes.CSV, size=len(data), etag='"v1"'
+            )
+            == first
+        )
+        assert client.requests == requests
+        assert reader.cache.hits == 1
+
+        # A new ETag means the object changed
+        reader.read_columns(
+            BUCKET, "data.csv", SupportedTypes.CSV, size=len(data), etag='"v2"'
+        )
+        assert client.requests == requests + 1
@@ -11,6 +11,8 @@
 """
 Test FQN build behavior
 """
+import random
+import time
 from unittest import TestCase
 from unittest.mock import MagicMock
 
@@ -87,6 +89,40 @@ class TestFqn(TestCase):
         with self.assertRaises(Exception):
             fqn.split('a"')
 
+    def test_split_fast_matches_grammar(self):
+        """
+        The fast splitter gives the same parts as the ANTLR grammar,
+        and rejects the same FQNs
+        """
+        rand = random.Random(42)
+        alphabet = ["a", "b", "1", " ", "_", "-", "한", ".", ".", '"', '"']
+        fqns = ["", ".", '"', '""', '"."', 'a."b', '"a.b"c', 'a.."b.c"', "a.b."]
+        fqns += [
+            "".join(rand.choice(alphabet) for _ in range(rand.randint(1, 12)))
+            for _ in range(5000)
+        ]
+        for str_ in fqns:
+            try:
+                expected = fqn._split_antlr(str_)  # pylint: disable=protected-access
+            except Exception:
+                expected = None
+            self.assertEqual(
+                fqn._split_fast(str_), expected, str_  # pylint: disable=protected-access
+            )
+            if expected is None:
+                with self.assertRaises(Exception):
+                    fqn.split(str_)
+            else:
+                self.assertEqual(fqn.split(str_), expected)
+
+    def test_split_returns_copies(self):
+        parts = fqn.split('service."data.base".schema.table')
+        parts.append("column")
+        self.assertEqual(
+            fqn.split('service."data.base".schema.table'),
+            ["service", '"data.base"', "schema", "table"],
+        )
+
     def test_build_table(self):
         """
         Validate Table FQN building
@@ -145,3 +181,39 @@ class TestFqn(TestCase):
 
         with pytest.raises(ValueError):
             fqn.split_test_case_fqn("local_redshift.dev.dbt_jaffle.customers")
+
+
+@pytest.mark.slow
+def test_split_benchmark():
+    """FQNs split per second by the grammar, the fast splitter and the memoized split"""
+    corpus = []
+    for service in ("mysql_prod", "snowflake", '"s3.bucket"'):
+        for database in ("analytics", '"raw.2024"', "영업"):
+            for table in range(50):
+                table_fqn = f"{service}.{database}.public.orders_{table}"
+                corpus += [
+                    table_fqn,
+                    f"{table_fqn}.customer_id",
+                    f'{table_fqn}."address.city"',
+                    f"{table_fqn}.customer_id.column_values_to_be_not_null",
+                ]
+
+    throughput = {}
+    for name, func in (
+        ("antlr", fqn._split_antlr),  # pylint: disable=protected-access
+        ("fast", fqn._split_fast),  # pylint: disable=protected-access
+        ("memoized, cold", fqn.split),
+        ("memoized, warm", fqn.split),
+    ):
+        start = time.perf_counter()
+        results = [func(str_) for str_ in corpus]
+        throughput[name] = len(corpus) / (time.perf_counter() - start)
+        assert len(results) == len(corpus)
+
+    assert [fqn.split(str_) for str_ in corpus] == [
+        fqn._split_antlr(str_) for str_ in corpus  # pylint: disable=protected-access
+    ]
+    print(
+        f"\nSplit FQNs/second over {len(corpus)} FQNs: "
+        + ", ".join(f"{name}: {value:.0f}" for name, value in throughput.items())
+    )
@@ -0,0 +1,188 @@
+#  Copyright 2021 Collate
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""
+Validate the cache of the lineage parser results
+"""
+import pickle
+from unittest.mock import patch
+
+from metadata.ingestion.api.status import Status
+from metadata.ingestion.lineage.models import Dialect
+from metadata.ingestion.lineage.parser import LineageParser
+from metadata.ingestion.lineage.parser_cache import (
+    LINEAGE_PARSER_CACHE_PATH_ENV,
+    LineageParserCache,
+    get_lineage_parser_cache,
+    normalize_query,
+    query_fingerprint,
+)
+
+QUERY = """
+    INSERT INTO db.target
+    SELECT a.id, b.name FROM db.orders a JOIN db.users b ON a.user_id = b.id
+    WHERE a.status = '{status}' AND a.amount > {amount} AND b.id IN ({ids})
+"""
+
+
+def test_normalize_query():
+    assert normalize_query(
+        "SELECT \"A  1\", t2.x -- run 42\nFROM t2 WHERE s = 'it''s' AND n IN (1, 2.5)"
+    ) == "SELECT \"A  1\", t2.x -- FROM t2 WHERE s = ? AND n IN (?)"
+    assert normalize_query(
+        "/* job 1 */ INSERT INTO t VALUES (1, 'a'), (2, 'b')"
+    ) == normalize_query("/* job 2 */ INSERT INTO t VALUES (3, 'c')")
+
+    first = QUERY.format(status="paid", amount=10, ids="1, 2")
+    second = QUERY.format(status="new", amount=2.5, ids="7")
+    assert query_fingerprint(first, Dialect.SNOWFLAKE) == query_fingerprint(
+        second, Dialect.SNOWFLAKE
+    )
+    assert query_fingerprint(first, Dialect.SNOWFLAKE) != query_fingerprint(
+        first, Dialect.MYSQL
+    )
+    assert query_fingerprint(first, Dialect.MYSQL) != query_fingerprint(
+        first.replace("db.users", "db.customers"), Dialect.MYSQL
+    )
+
+
+def test_parser_uses_cache():
+    """Queries that only differ in their literals are parsed once"""
+    cache = LineageParserCache()
+    with patch(
+        "metadata.ingestion.lineage.parser.get_lineage_parser_cache",
+        return_value=cache,
+    ):
+        parsed = LineageParser(
+            QUERY.format(status="paid", amount=10, ids="1, 2"), Dialect.MYSQL
+        )
+        parsed_attributes = (
+            parsed.clean_table_list,
+            parsed.table_aliases,
+            parsed.table_joins,
+            parsed.column_lineage,
+        )
+        with patch.object(LineageParser, "_evaluate_best_parser") as evaluate:
+            cached = LineageParser(
+                QUERY.format(status="new", amount=3, ids="7"), Dialect.MYSQL
+            )
+            cached_attributes = (
+                cached.clean_table_list,
+                cached.table_aliases,
+                cached.table_joins,
+                cached.column_lineage,
+            )
+            evaluate.assert_not_called()
+
+    assert "parser" not in cached.__dict__
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cached_attributes[:3] == parsed_attributes[:3]
+    assert cached.query_parsing_success
+    assert [str(table) for table in cached.source_tables] == [
+        str(table) for table in parsed.source_tables
+    ]
+    assert [tuple(map(str, pair)) for pair in cached_attributes[3]] == [
+        tuple(map(str, pair)) for pair in parsed_attributes[3]
+    ]
+
+    status = Status()
+    cache.report(status)
+    assert status.metrics["Lineage parser cache hit rate"] == "50.0%"
+
+
+def test_cache_filled_lazily():
+    """Only the properties computed are cached, the others parse the query"""
+    cache = LineageParserCache()
+    with patch(
+        "metadata.ingestion.lineage.parser.get_lineage_parser_cache",
+        return_value=cache,
+    ):
+        parsed = LineageParser(QUERY.format(status="a", amount=1, ids="1"))
+        assert not cache._entries  # pylint: disable=protected-access
+        tables = [str(table) for table in parsed.source_tables]
+        entries = cache._entries  # pylint: disable=protected-access
+        assert [pickle.loads(entry) for entry in entries.values()][0].keys() == {
+            "source_tables"
+        }
+
+        evaluate = LineageParser._evaluate_best_parser  # pylint: disable=protected-access
+        with patch.object(
+            LineageParser, "_evaluate_best_parser", autospec=True, side_effect=evaluate
+        ) as evaluate_mock:
+            cached = LineageParser(QUERY.format(status="b", amount=2, ids="2"))
+            assert [str(table) for table in cached.source_tables] == tables
+            evaluate_mock.assert_not_called()
+
+            # Missing from the entry: the query is parsed and the entry completed
+            assert cached.table_joins == parsed.table_joins
+            evaluate_mock.assert_called_once()
+
+        complete = LineageParser(QUERY.format(status="c", amount=3, ids="3"))
+        assert complete.table_joins == parsed.table_joins
+        assert "parser" not in complete.__dict__
+
+
+def test_failures_not_cached():
+    """A query that failed to parse, e.g. on a timeout, is parsed again"""
+    cache = LineageParserCache()
+    evaluate = LineageParser._evaluate_best_parser  # pylint: disable=protected-access
+
+    def failed_evaluate(self, *args, **kwargs):
+        parser = evaluate(self, *args, **kwargs)
+        self.query_parsing_success = False
+        return parser
+
+    with patch(
+        "metadata.ingestion.lineage.parser.get_lineage_parser_cache",
+        return_value=cache,
+    ), patch.object(LineageParser, "_evaluate_best_parser", failed_evaluate):
+        parser = LineageParser(
+            QUERY.format(status="paid", amount=10, ids="1"), Dialect.MYSQL
+        )
+        assert parser.source_tables and parser.table_joins
+
+    assert not cache._entries  # pylint: disable=protected-access
+
+
+def test_stats_across_processes():
+    cache = LineageParserCache()
+    cache.get("a")
+    stats = cache.take_stats()
+    assert stats == {"hits": 0, "persistent_hits": 0, "misses": 1}
+    assert cache.misses == 0
+
+    cache.add_stats(stats)
+    cache.add_stats({"hits": 3, "persistent_hits": 1, "misses": 1})
+    assert (cache.hits, cache.persistent_hits, cache.misses) == (3, 1, 2)
+
+
+def test_lru_and_persistent_tier(tmp_path):
+    path = str(tmp_path / "lineage.db")
+    cache = LineageParserCache(max_entries=1, path=path)
+    cache.put("a", {"source_tables": ["a"]})
+    cache.put("b", {"source_tables": ["b"]})
+    assert list(cache._entries) == ["b"]  # pylint: disable=protected-access
+
+    # Entries evicted from memory, or from a previous run, come from the file
+    assert cache.get("a") == {"source_tables": ["a"]}
+    assert LineageParserCache(max_entries=0, path=path).get("b") == {
+        "source_tables": ["b"]
+    }
+    assert cache.get("c") is None
+    assert (cache.hits, cache.persistent_hits, cache.misses) == (1, 1, 1)
+
+
+def test_get_lineage_parser_cache(tmp_path, monkeypatch):
+    monkeypatch.delenv(LINEAGE_PARSER_CACHE_PATH_ENV, raising=False)
+    assert get_lineage_parser_cache() is get_lineage_parser_cache()
+    assert get_lineage_parser_cache().path is None
+
+    monkeypatch.setenv(LINEAGE_PARSER_CACHE_PATH_ENV, str(tmp_path / "lineage.db"))
+    assert get_lineage_parser_cache().path == str(tmp_path / "lineage.db")
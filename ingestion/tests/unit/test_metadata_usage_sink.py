@@ -0,0 +1,209 @@
+#  Copyright 2021 Collate
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""
+Validate the concurrent publishing of the usage bulk sink
+"""
+import time
+import uuid
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from metadata.generated.schema.api.data.createQuery import CreateQueryRequest
+from metadata.generated.schema.entity.data.table import Column, DataType, Table
+from metadata.generated.schema.type.tableUsageCount import TableUsageCount
+from metadata.ingestion.bulksink.metadata_usage import (
+    MetadataUsageBulkSink,
+    group_queries,
+)
+from metadata.ingestion.stage.usage_runs import write_runs
+
+SERVICE = "mysql"
+DATE = "1700000000000"
+
+TABLES = {
+    name: Table(
+        id=uuid.uuid4(),
+        name=name,
+        fullyQualifiedName=f"{SERVICE}.shop.public.{name}",
+        columns=[Column(name="id", dataType=DataType.INT)],
+    )
+    for name in ("orders", "users", "items")
+}
+
+
+def _query(sql: str, user: str, date: int = 1700000000000) -> CreateQueryRequest:
+    return CreateQueryRequest(query=sql, users=[user], queryDate=date, service=SERVICE)
+
+
+def _usage(table: str, count: int, queries=None, date: str = DATE) -> TableUsageCount:
+    return TableUsageCount(
+        table=table,
+        date=date,
+        databaseName="shop",
+        count=count,
+        sqlQueries=queries,
+        joins=[],
+        serviceName=SERVICE,
+    )
+
+
+def _run_sink(tmp_path, metadata, publish_threads=4) -> MetadataUsageBulkSink:
+    metadata.get_entity_reference.return_value = None
+    # Two runs, so the usage of orders is merged
+    write_runs(
+        str(tmp_path),
+        [
+            _usage("orders", 2, [_query("SELECT * FROM orders", "alice")]),
+            _usage("users", 1),
+        ],
+    )
+    write_runs(
+        str(tmp_path),
+        [
+            _usage("orders", 3, [_query("SELECT * FROM orders", "bob")]),
+            _usage("items", 1),
+        ],
+    )
+    sink = MetadataUsageBulkSink.create(
+        {
+            "filename": str(tmp_path),
+            "preloadTableIndex": False,
+            "publishThreads": publish_threads,
+        },
+        metadata,
+    )
+    with patch(
+        "metadata.ingestion.bulksink.metadata_usage.get_table_entities_from_query",
+        side_effect=lambda table_name, **_: [TABLES[table_name]],
+    ):
+        sink.run()
+    return sink
+
+
+def test_group_queries():
+    queries = group_queries(
+        [
+            _query("SELECT 1", "alice"),
+            _query("SELECT 1", "bob"),
+            _query("SELECT 1", "alice"),
+            _query("SELECT 2", "alice"),
+        ]
+    )
+    assert [query.query.__root__ for query in queries] == ["SELECT 1", "SELECT 2"]
+    assert [user.__root__ for user in queries[0].users] == ["alice", "bob"]
+
+
+def test_publish_usage(tmp_path):
+    metadata = MagicMock()
+    sink = _run_sink(tmp_path, metadata)
+
+    usage = {
+        call.args[0].name.__root__: call.args[1].count
+        for call in metadata.publish_table_usage.call_args_list
+    }
+    assert usage == {"orders": 5, "users": 1, "items": 1}
+
+    metadata.ingest_entity_queries_data.assert_called_once()
+    entity, queries = metadata.ingest_entity_queries_data.call_args.args
+    assert entity.name.__root__ == "orders"
+    assert len(queries) == 1
+    assert [user.__root__ for user in queries[0].users] == ["alice", "bob"]
+
+    assert not sink.status.failures
+    assert len(sink.status.records) == 3
+    assert sink.status.metrics["Usage records"] == 3
+    # Usage of 3 tables, plus the queries and life cycle of orders
+    assert sink.status.metrics["Published requests"] == 5
+
+
+def test_publish_failures(tmp_path):
+    metadata = MagicMock()
+
+    def publish_table_usage(table, _):
+        if table.name.__root__ == "users":
+            raise RuntimeError("Server error")
+
+    metadata.publish_table_usage.side_effect = publish_table_usage
+    sink = _run_sink(tmp_path, metadata, publish_threads=1)
+
+    assert [failure.name for failure in sink.status.failures] == [
+        f"{SERVICE}.shop.public.users"
+    ]
+    assert "Server error" in sink.status.failures[0].error
+    assert len(sink.status.records) == 2
+
+
+def test_usage_dates_in_order(tmp_path):
+    """The usage of a date is published once the previous date is done"""
+    write_runs(
+        str(tmp_path),
+        [
+            _usage("orders", 1, date="1700000000000"),
+            _usage("users", 1, date="1700000000000"),
+            _usage("orders", 2, date="1700086400000"),
+        ],
+    )
+    older, newer = (
+        datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d")
+        for timestamp in (1700000000, 1700086400)
+    )
+    events = []
+
+    def publish_table_usage(table, usage_request):
+        events.append(("start", table.name.__root__, usage_request.date))
+        if usage_request.date == older:
+            time.sleep(0.1)
+        events.append(("end", table.name.__root__, usage_request.date))
+
+    metadata = MagicMock()
+    metadata.get_entity_reference.return_value = None
+    metadata.publish_table_usage.side_effect = publish_table_usage
+    sink = MetadataUsageBulkSink.create(
+        {"filename": str(tmp_path), "preloadTableIndex": False, "publishThreads": 4},
+        metadata,
+    )
+    with patch(
+        "metadata.ingestion.bulksink.metadata_usage.get_table_entities_from_query",
+        side_effect=lambda table_name, **_: [TABLES[table_name]],
+    ):
+        sink.run()
+
+    newer_start = events.index(("start", "orders", newer))
+    assert ("end", "orders", older) in events[:newer_start]
+    assert ("end", "users", older) in events[:newer_start]
+
+
+def test_life_cycle_across_dates(tmp_path):
+    """The life cycle of a table is patched once, with its latest queries"""
+    newer, older = 1700086400000, 1700000000000
+    write_runs(
+        str(tmp_path),
+        [
+            _usage("orders", 1, [_query("SELECT 1", "bob", newer)], str(newer)),
+            _usage("orders", 1, [_query("SELECT 2", "alice", older)], str(older)),
+            _usage("orders", 1, [_query("INSERT 3", "alice", older)], str(older)),
+        ],
+    )
+    metadata = MagicMock()
+    metadata.get_entity_reference.return_value = None
+    sink = MetadataUsageBulkSink.create(
+        {"filename": str(tmp_path), "preloadTableIndex": False}, metadata
+    )
+    with patch(
+        "metadata.ingestion.bulksink.metadata_usage.get_table_entities_from_query",
+        side_effect=lambda table_name, **_: [TABLES[table_name]],
+    ):
+        sink.run()
+
+    metadata.patch_life_cycle.assert_called_once()
+    life_cycle = metadata.patch_life_cycle.call_args.kwargs["life_cycle"]
+    assert life_cycle.accessed.timestamp.__root__ == newer
+    assert life_cycle.updated.timestamp.__root__ == older
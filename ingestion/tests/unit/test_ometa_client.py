@@ -0,0 +1,181 @@
+#  Copyright 2021 Collate
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""
+Validate the REST client connection pooling and the async backend
+"""
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+import pytest
+
+from metadata.generated.schema.entity.services.connections.metadata.openMetadataConnection import (
+    ConnectionPoolConfig,
+    OpenMetadataConnection,
+)
+from metadata.generated.schema.security.client.openMetadataJWTClientConfig import (
+    OpenMetadataJWTClientConfig,
+)
+from metadata.ingestion.ometa.client import REST, APIError, ClientConfig
+from metadata.ingestion.ometa.ometa_api import OpenMetadata
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    """Reply with the request path and the client port"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *_):  # pylint: disable=arguments-differ
+        """Keep the test output clean"""
+
+    def _reply(self, code: int, body: dict) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        if self.path.endswith("/missing"):
+            self._reply(404, {"code": 404, "message": "missing"})
+        else:
+            self.server.client_ports.add(self.client_address[1])
+            self._reply(200, {"path": self.path})
+
+    def do_PUT(self):  # pylint: disable=invalid-name
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self._reply(200, json.loads(body))
+
+
+class OMetaClientTest(TestCase):
+    """Run the client against a local server"""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = ThreadingHTTPServer(("localhost", 0), EchoHandler)
+        cls.server.daemon_threads = True
+        cls.server.client_ports = set()
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+
+    def setUp(self) -> None:
+        self.server.client_ports.clear()
+
+    def _config(self, **kwargs) -> ClientConfig:
+        return ClientConfig(
+            base_url=f"http://localhost:{self.server.server_address[1]}/api",
+            auth_header="Authorization",
+            auth_token=lambda: ("token", 3600),
+            **kwargs,
+        )
+
+    def test_pool_size(self):
+        """The adapters are sized from the config and can grow"""
+        client = REST(self._config(pool_maxsize=4))
+        adapter = client._session.get_adapter("http://localhost")
+        self.assertEqual(adapter._pool_maxsize, 4)
+
+        client.ensure_pool_size(2)
+        self.assertEqual(client._session.get_adapter("http://localhost")._pool_maxsize, 4)
+
+        client.get("/tables")
+        previous = client._session.get_adapter("http://localhost")
+        self.assertEqual(len(previous.poolmanager.pools), 1)
+        client.ensure_pool_size(16)
+        self.assertEqual(client._session.get_adapter("http://localhost")._pool_maxsize, 16)
+        # The connections of the replaced adapters are closed
+        self.assertEqual(len(previous.poolmanager.pools), 0)
+        client.close()
+
+    def test_pool_from_connection(self):
+        """The pool is configured from the OpenMetadata connection"""
+        metadata = OpenMetadata(
+            OpenMetadataConnection(
+                hostPort=f"http://localhost:{self.server.server_address[1]}/api",
+                authProvider="openmetadata",
+                securityConfig=OpenMetadataJWTClientConfig(jwtToken="token"),
+                enableVersionValidation=False,
+                connectionPool=ConnectionPoolConfig(poolMaxsize=32, poolBlock=True),
+            )
+        )
+        adapter = metadata.client._session.get_adapter("http://localhost")
+        self.assertEqual(adapter._pool_maxsize, 32)
+        self.assertTrue(adapter._pool_block)
+        metadata.close()
+
+    def test_async_client_from_metadata(self):
+        """The async client of OpenMetadata invalidates the entity cache on writes"""
+        pytest.importorskip("httpx")
+        metadata = OpenMetadata(
+            OpenMetadataConnection(
+                hostPort=f"http://localhost:{self.server.server_address[1]}/api",
+                authProvider="openmetadata",
+                securityConfig=OpenMetadataJWTClientConfig(jwtToken="token"),
+                enableVersionValidation=False,
+            )
+        )
+        metadata.entity_cache = MagicMock()
+
+        async def run():
+            async with metadata.get_async_client() as client:
+                await client.get("/tables/1")
+                await client.put("/tables", data=json.dumps({"name": "t"}))
+
+        asyncio.run(run())
+        metadata.entity_cache.invalidate_path.assert_called_once_with("/tables")
+        metadata.entity_cache = None
+        metadata.close()
+
+    def test_threads_reuse_connections(self):
+        """Threads sharing the client reuse at most one connection each"""
+        threads = 4
+        client = REST(self._config(pool_maxsize=threads))
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            responses = list(pool.map(lambda i: client.get(f"/tables/{i}"), range(100)))
+
+        self.assertEqual(responses[42], {"path": "/api/v1/tables/42"})
+        self.assertLessEqual(len(self.server.client_ports), threads)
+        client.close()
+
+    def test_async_client(self):
+        """The async backend exposes the same surface and notifies the write listeners"""
+        pytest.importorskip("httpx")
+        # pylint: disable=import-outside-toplevel
+        from metadata.ingestion.ometa.async_client import AsyncREST
+
+        written = []
+
+        async def run():
+            async with AsyncREST(self._config(pool_maxsize=4)) as client:
+                client.add_write_listener(written.append)
+                responses = await asyncio.gather(
+                    *(client.get(f"/tables/{i}") for i in range(20))
+                )
+                put = await client.put("/tables", data=json.dumps({"name": "t"}))
+                with self.assertRaises(APIError) as err:
+                    await client.get("/missing")
+                return responses, put, err.exception
+
+        responses, put, error = asyncio.run(run())
+        self.assertEqual(responses[3], {"path": "/api/v1/tables/3"})
+        self.assertEqual(put, {"name": "t"})
+        self.assertEqual(error.status_code, 404)
+        self.assertLessEqual(len(self.server.client_ports), 4)
+        self.assertEqual(written, ["/tables"])
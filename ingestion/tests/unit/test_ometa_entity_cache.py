@@ -0,0 +1,148 @@
+#  Copyright 2021 Collate
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""
+Validate the OpenMetadata entity cache
+"""
+import tempfile
+import uuid
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from metadata.generated.schema.entity.data.database import Database
+from metadata.generated.schema.entity.data.table import Table
+from metadata.generated.schema.entity.services.connections.metadata.openMetadataConnection import (
+    EntityCacheConfig,
+)
+from metadata.generated.schema.entity.services.databaseService import DatabaseService
+from metadata.ingestion.ometa.entity_cache import EntityCache
+
+DATABASE_ID = str(uuid.uuid4())
+DATABASE_FQN = "service.database"
+SERVICE_ID = str(uuid.uuid4())
+
+
+def _database(version: float = 0.1) -> dict:
+    return {
+        "id": DATABASE_ID,
+        "name": "database",
+        "fullyQualifiedName": DATABASE_FQN,
+        "version": version,
+        "service": {"id": SERVICE_ID, "type": "databaseService"},
+    }
+
+
+class EntityCacheTest(TestCase):
+    """Check the hits, misses and invalidations"""
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = str(Path(self.tmp_dir.name) / "cache.db")
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_memory_hits(self):
+        """Entries are stored by type, path and fields"""
+        cache = EntityCache(max_size=10, entity_types=["Database"])
+        self.assertTrue(cache.is_cacheable(Database))
+        self.assertFalse(cache.is_cacheable(Table))
+
+        path = f"name/{DATABASE_FQN}"
+        self.assertIsNone(cache.get(Database, path))
+        cache.put(Database, path, None, _database())
+
+        self.assertEqual(cache.get(Database, path), _database())
+        self.assertIsNone(cache.get(Database, path, fields=["owner"]))
+        self.assertEqual(cache.stats.hits, 1)
+        self.assertEqual(cache.stats.misses, 2)
+
+    def test_invalidate_path(self):
+        """Writes by id or by name drop every cached fields combination"""
+        cache = EntityCache(max_size=10, entity_types=["Database"])
+        cache.put(Database, f"name/{DATABASE_FQN}", None, _database())
+        cache.put(Database, DATABASE_ID, ["owner"], _database())
+
+        cache.invalidate_path(f"/databases/{DATABASE_ID}/followers")
+        self.assertIsNone(cache.get(Database, f"name/{DATABASE_FQN}"))
+        self.assertIsNone(cache.get(Database, DATABASE_ID, ["owner"]))
+
+        cache.put(Database, f"name/{DATABASE_FQN}", None, _database())
+        cache.invalidate_path(f"/databases/name/{DATABASE_FQN}?hardDelete=true")
+        self.assertIsNone(cache.get(Database, f"name/{DATABASE_FQN}"))
+        self.assertEqual(cache.stats.invalidations, 3)
+
+    def test_newer_version_invalidates(self):
+        """Getting a newer version drops the entries holding the older one"""
+        cache = EntityCache(max_size=10, entity_types=["Database"])
+        cache.put(Database, DATABASE_ID, None, _database(version=0.1))
+        cache.put(Database, DATABASE_ID, ["owner"], _database(version=0.2))
+
+        self.assertIsNone(cache.get(Database, DATABASE_ID))
+        self.assertEqual(cache.get(Database, DATABASE_ID, ["owner"])["version"], 0.2)
+
+    def test_disk_tier(self):
+        """Entries survive a new cache and are dropped on server change events"""
+        cache = EntityCache(10, ["Database"], cache_path=self.cache_path)
+        cache.sync(MagicMock())
+        cache.put(Database, f"name/{DATABASE_FQN}", None, _database())
+        cache.put(Database, "name/service.other", None, {"id": str(uuid.uuid4())})
+        cache.close()
+
+        client = MagicMock()
+        client.get.return_value = {"data": [{"entityId": DATABASE_ID}]}
+        cache = EntityCache(10, ["Database"], cache_path=self.cache_path)
+        cache.sync(client)
+
+        self.assertEqual(client.get.call_args[0][0], "/events")
+        self.assertIsNone(cache.get(Database, f"name/{DATABASE_FQN}"))
+        self.assertIsNotNone(cache.get(Database, "name/service.other"))
+        self.assertEqual(cache.stats.disk_hits, 1)
+        cache.close()
+
+    def test_failed_sync_clears_disk_tier(self):
+        """If we cannot know what changed, nothing from disk is trusted"""
+        cache = EntityCache(10, ["Database"], cache_path=self.cache_path)
+        cache.sync(MagicMock())
+        cache.put(Database, DATABASE_ID, None, _database())
+        cache.close()
+
+        client = MagicMock()
+        client.get.side_effect = RuntimeError("server down")
+        cache = EntityCache(10, ["Database"], cache_path=self.cache_path)
+        cache.sync(client)
+
+        self.assertIsNone(cache.get(Database, DATABASE_ID))
+        cache.close()
+
+    def test_secrets_not_on_disk(self):
+        """Responses with credentials are only kept in memory"""
+        self.assertNotIn("DatabaseService", EntityCacheConfig().entityTypes)
+
+        cache = EntityCache(10, ["DatabaseService"], cache_path=self.cache_path)
+        cache.sync(MagicMock())
+        service = {
+            "id": SERVICE_ID,
+            "name": "service",
+            "fullyQualifiedName": "service",
+            "connection": {"config": {"password": "s3cr3t"}},
+        }
+        cache.put(DatabaseService, "name/service", ["connection"], service)
+        self.assertEqual(
+            cache.get(DatabaseService, "name/service", ["connection"]), service
+        )
+        cache.close()
+
+        self.assertNotIn(b"s3cr3t", Path(self.cache_path).read_bytes())
+        cache = EntityCache(10, ["DatabaseService"], cache_path=self.cache_path)
+        self.assertIsNone(cache.get(DatabaseService, "name/service", ["connection"]))
+        cache.close()
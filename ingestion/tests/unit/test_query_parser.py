@@ -13,13 +13,17 @@
 Validate query parser logic
 """
 
+from datetime import datetime
 from unittest import TestCase
 
 from collate_sqllineage.core.models import Column
 
+from metadata.generated.schema.type.tableQuery import TableQueries, TableQuery
 from metadata.generated.schema.type.tableUsageCount import TableColumn, TableColumnJoin
 from metadata.ingestion.lineage.models import Dialect
 from metadata.ingestion.lineage.parser import LineageParser
+from metadata.ingestion.lineage.parser_cache import get_lineage_parser_cache
+from metadata.ingestion.processor.query_parser import QueryParserProcessor
 
 
 class QueryParserTests(TestCase):
@@ -356,3 +360,47 @@ class QueryParserTests(TestCase):
             parser.column_lineage,
             expected_lineage,
         )
+
+    def test_processor_parsing_processes(self):
+        """
+        Queries parsed in processes come back in order, as in sequential parsing
+        """
+        queries = TableQueries(
+            queries=[
+                TableQuery(
+                    query=f"INSERT INTO db.target_{i} SELECT * FROM db.source_{i}",
+                    serviceName="mysql",
+                    analysisDate=datetime(2024, 1, 1),
+                )
+                for i in range(7)
+            ]
+            + [TableQuery(query="SELECT 1", serviceName="mysql")]
+        )
+
+        sequential = QueryParserProcessor.create({}, None, connection_type="Mysql")
+        parallel = QueryParserProcessor.create(
+            {"parsingProcesses": 2, "parsingChunkSize": 3},
+            None,
+            connection_type="Mysql",
+        )
+        try:
+            expected = sequential.run(queries).parsedData
+            get_lineage_parser_cache().take_stats()
+            parsed = parallel.run(queries).parsedData
+        finally:
+            parallel.close()
+
+        # The cache misses of the worker processes are reported. The last
+        # query fails before being parsed, as it has no analysis date
+        self.assertEqual(parallel.status.metrics["Lineage parser cache misses"], 7)
+
+        self.assertEqual(len(expected), 7)
+        # The tables come from a set, whose order changes between processes
+        self.assertEqual(
+            [data.copy(update={"tables": sorted(data.tables)}) for data in parsed],
+            [data.copy(update={"tables": sorted(data.tables)}) for data in expected],
+        )
+        self.assertEqual(
+            [sorted(data.tables) for data in parsed],
+            [[f"db.source_{i}", f"db.target_{i}"] for i in range(7)],
+        )
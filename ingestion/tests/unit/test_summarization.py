@@ -0,0 +1,171 @@
+#  Copyright 2021 Collate
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""
+Validate the lazy loading and the batching of the summarization model
+"""
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from metadata.ml import summarization
+from metadata.ml.summarization import (
+    Summarization,
+    SummarizationBackend,
+    SummarizationModel,
+    get_summarization_model,
+)
+
+
+class FakeMask(list):
+    """Attention mask of a batch, one token per word"""
+
+    def sum(self):
+        return sum(len(text.split()) for text in self)
+
+
+class FakeTokenizer:
+    """Keep the batches it receives"""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, batch, **kwargs):
+        assert kwargs["padding"] and kwargs["truncation"]
+        self.batches.append(batch)
+        return {"input_ids": batch, "attention_mask": FakeMask(batch)}
+
+    @staticmethod
+    def batch_decode(output, skip_special_tokens):
+        return output
+
+
+class FakeModel:
+    @staticmethod
+    def generate(input_ids, **_):
+        return [f"{text.upper()}. Second sentence." for text in input_ids]
+
+
+@pytest.fixture(autouse=True)
+def reset_models(monkeypatch):
+    monkeypatch.setattr(summarization, "_models", {})
+    monkeypatch.setattr(summarization, "_nltk_ready", True)
+    monkeypatch.setitem(
+        sys.modules, "nltk", SimpleNamespace(sent_tokenize=lambda text: text.split(". "))
+    )
+
+
+@pytest.fixture(name="loads")
+def fixture_loads(monkeypatch):
+    """Count the loads of the torch model"""
+    loads = []
+
+    def load(model_name):
+        time.sleep(0.05)
+        loads.append(model_name)
+        return SummarizationModel(
+            FakeTokenizer(), FakeModel(), SummarizationBackend.TORCH
+        )
+
+    monkeypatch.setattr(summarization, "_load_torch_model", load)
+    return loads
+
+
+def test_lazy_loading(loads):
+    """Nothing is loaded until the first summary"""
+    summarizer = Summarization()
+    assert not loads
+
+    assert summarizer.summarize("text") == "SUMMARIZE: TEXT"
+    Summarization().summarize("other")
+    assert loads == [summarization.MODEL_NAME]
+
+
+def test_shared_across_threads(loads):
+    """Concurrent first uses load the model once"""
+    models = []
+    threads = [
+        threading.Thread(target=lambda: models.append(get_summarization_model()))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(loads) == 1
+    assert all(model is models[0] for model in models)
+
+
+def test_summarize_many_batches(loads):
+    """Texts are padded in batches of at most max_batch_size"""
+    texts = [f"text {i}" for i in range(5)]
+
+    summaries = Summarization(max_batch_size=2).summarize_many(texts)
+
+    assert summaries == [f"SUMMARIZE: TEXT {i}" for i in range(5)]
+    tokenizer = get_summarization_model().tokenizer
+    assert [len(batch) for batch in tokenizer.batches] == [2, 2, 1]
+    assert Summarization().summarize_many([]) == []
+
+
+def test_summarize_many_length_buckets(loads):
+    """Texts of similar length share a batch and the summaries keep the input order"""
+    texts = ["a" * 30, "b", "c" * 20, "d" * 2]
+
+    summarizer = Summarization(max_batch_size=2)
+    summaries = summarizer.summarize_many(texts)
+
+    assert summaries == [f"SUMMARIZE: {text.upper()}" for text in texts]
+    tokenizer = get_summarization_model().tokenizer
+    assert tokenizer.batches == [
+        ["summarize: b", "summarize: dd"],
+        ["summarize: " + "c" * 20, "summarize: " + "a" * 30],
+    ]
+    assert summarizer.documents == 4
+    assert summarizer.input_tokens == 8
+    assert summarizer.seconds > 0
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        ModuleNotFoundError("No module named 'optimum'"),
+        RuntimeError("Exporting the model to ONNX failed"),
+    ],
+)
+def test_onnx_fallback(loads, monkeypatch, error):
+    """Without optimum installed or a model to load, the ONNX backend falls back to torch"""
+
+    def load_onnx(_):
+        raise error
+
+    monkeypatch.setattr(summarization, "_load_onnx_model", load_onnx)
+    monkeypatch.setenv(summarization.SUMMARIZATION_BACKEND_ENV, "ONNX")
+
+    summarizer = Summarization()
+    assert summarizer.backend == SummarizationBackend.ONNX
+    assert summarizer.summarize("text") == "SUMMARIZE: TEXT"
+    assert get_summarization_model(
+        backend=SummarizationBackend.ONNX
+    ) is get_summarization_model(backend=SummarizationBackend.TORCH)
+    assert len(loads) == 1
+
+
+def test_unknown_backend(loads, monkeypatch):
+    """A typo in the backend does not stop the ingestion"""
+    monkeypatch.setenv(summarization.SUMMARIZATION_BACKEND_ENV, "onxx")
+
+    summarizer = Summarization()
+    assert summarizer.backend == SummarizationBackend.TORCH
+    assert summarizer.summarize("text") == "SUMMARIZE: TEXT"
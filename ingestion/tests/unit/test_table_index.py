@@ -0,0 +1,104 @@
+#  Copyright 2021 Collate
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""
+Validate the local resolution of the tables for lineage and usage
+"""
+import uuid
+from unittest.mock import MagicMock, patch
+
+from metadata.generated.schema.entity.data.table import Column, DataType, Table
+from metadata.ingestion.api.status import Status
+from metadata.ingestion.lineage import table_index as table_index_module
+from metadata.ingestion.lineage.sql_lineage import (
+    get_table_entities_from_query,
+    search_cache,
+)
+from metadata.ingestion.lineage.table_index import (
+    TableIndex,
+    get_table_index,
+    load_table_index,
+)
+
+SERVICE = "snowflake_prod"
+
+
+def _table(table_fqn: str) -> Table:
+    return Table(
+        id=uuid.uuid4(),
+        name=table_fqn.rsplit(".", 1)[-1],
+        fullyQualifiedName=table_fqn,
+        columns=[Column(name="id", dataType=DataType.INT)],
+    )
+
+
+ORDERS = _table(f"{SERVICE}.ANALYTICS.PUBLIC.ORDERS")
+RAW_ORDERS = _table(f"{SERVICE}.RAW.PUBLIC.ORDERS")
+EVENTS = _table(f'{SERVICE}."raw.2024".events.clicks')
+
+
+def test_search():
+    table_index = TableIndex(SERVICE, [ORDERS, RAW_ORDERS, EVENTS])
+
+    assert len(table_index) == 3
+    assert table_index.search("analytics", "public", "orders") == [ORDERS]
+    assert table_index.search(None, "Public", "Orders") == [ORDERS, RAW_ORDERS]
+    assert table_index.search("RAW", None, "ORDERS") == [RAW_ORDERS]
+    assert table_index.search(None, None, "orders") == [ORDERS, RAW_ORDERS]
+    assert table_index.search("raw.2024", "events", "clicks") == [EVENTS]
+    assert table_index.search("analytics", "public", "clicks") is None
+    assert (table_index.hits, table_index.misses) == (5, 1)
+
+    status = Status()
+    table_index.report(status)
+    assert status.metrics[f"Table index [{SERVICE}] hits"] == 5
+
+
+def test_load_once():
+    metadata = MagicMock()
+    metadata.list_all_entities.return_value = iter([ORDERS, EVENTS])
+    with patch.dict(table_index_module._table_indexes, clear=True):
+        assert get_table_index(SERVICE) is None
+        table_index = load_table_index(metadata, SERVICE)
+        assert load_table_index(metadata, SERVICE) is table_index
+        assert get_table_index(SERVICE) is table_index
+        metadata.list_all_entities.assert_called_once_with(
+            entity=Table, fields=["columns"], params={"service": SERVICE}
+        )
+
+        # Services we cannot list are not retried
+        metadata.list_all_entities.side_effect = ValueError("boom")
+        assert load_table_index(metadata, "other") is None
+        assert load_table_index(metadata, "other") is None
+        assert metadata.list_all_entities.call_count == 2
+
+
+def test_lineage_resolution_uses_index():
+    """Only the tables missing from the index are searched in ES"""
+    metadata = MagicMock()
+    metadata.es_search_from_fqn.return_value = [RAW_ORDERS]
+    with patch.dict(
+        table_index_module._table_indexes,
+        {SERVICE: TableIndex(SERVICE, [ORDERS])},
+        clear=True,
+    ):
+        search_cache._cache.clear()  # pylint: disable=protected-access
+        assert get_table_entities_from_query(
+            metadata, SERVICE, "analytics", "public", "orders"
+        ) == [ORDERS]
+        assert get_table_entities_from_query(
+            metadata, SERVICE, "analytics", "public", "public.orders"
+        ) == [ORDERS]
+        metadata.es_search_from_fqn.assert_not_called()
+
+        assert get_table_entities_from_query(
+            metadata, SERVICE, "analytics", "public", "raw.public.orders"
+        ) == [RAW_ORDERS]
+        metadata.es_search_from_fqn.assert_called_once()
@@ -0,0 +1,204 @@
+#  Copyright 2021 Collate
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""
+Validate the usage aggregation of the stage and the merge of its runs
+"""
+import json
+import os
+import uuid
+from unittest.mock import MagicMock
+
+from metadata.generated.schema.entity.teams.user import User
+from metadata.generated.schema.type.queryParserData import ParsedData, QueryParserData
+from metadata.generated.schema.type.tableUsageCount import (
+    TableColumn,
+    TableColumnJoin,
+    TableUsageCount,
+)
+from metadata.ingestion.bulksink.metadata_usage import MetadataUsageBulkSink
+from metadata.ingestion.stage.table_usage import TableUsageStage
+from metadata.ingestion.stage.usage_runs import RUN_PREFIX, read_usage
+from metadata.ingestion.stage.user_cache import UserCache
+
+SERVICE = "mysql"
+DATE = "1700000000000"
+
+
+def _parsed_data(tables, sql="SELECT 1", joins=None, user=None) -> ParsedData:
+    return ParsedData(
+        tables=tables,
+        joins=joins or {},
+        sql=sql,
+        serviceName=SERVICE,
+        date=DATE,
+        databaseName="shop",
+        userName=user,
+    )
+
+
+def _user(name: str) -> User:
+    return User(
+        id=uuid.uuid4(),
+        name=name,
+        fullyQualifiedName=name,
+        email=f"{name}@example.com",
+    )
+
+
+def _records():
+    join = TableColumnJoin(
+        tableColumn=TableColumn(table="orders", column="user_id"),
+        joinedWith=[TableColumn(table="users", column="id")],
+    )
+    return [
+        QueryParserData(
+            parsedData=[
+                _parsed_data(["orders", "users"], "q1", {"orders": [join]}),
+                _parsed_data(["orders"], "q2"),
+            ]
+        ),
+        QueryParserData(parsedData=[_parsed_data(["users", "orders"], "q3")]),
+        QueryParserData(parsedData=[_parsed_data(["items"], "q4")]),
+    ]
+
+
+def _stage(tmp_path, memory_budget) -> TableUsageStage:
+    metadata = MagicMock()
+    metadata.get_by_name.return_value = None
+    return TableUsageStage.create(
+        {"filename": str(tmp_path), "memoryBudget": memory_budget}, metadata
+    )
+
+
+def _merged_usage(tmp_path):
+    sink = MetadataUsageBulkSink.create({"filename": str(tmp_path)}, MagicMock())
+    return {
+        usage.table: usage for usages in sink.iterate_usage() for usage in usages
+    }
+
+
+def test_aggregate_in_memory(tmp_path):
+    stage = _stage(tmp_path, memory_budget=10 * 1024 * 1024)
+    for record in _records():
+        stage.run(record)
+    stage.flush()
+
+    directory = tmp_path / f"{SERVICE}_{DATE}"
+    assert os.listdir(directory) == [f"{RUN_PREFIX}000000.jsonl"]
+    assert not stage.table_usage
+    # Flushing again does not write the same usage twice
+    stage.flush()
+    assert os.listdir(directory) == [f"{RUN_PREFIX}000000.jsonl"]
+    usage = _merged_usage(tmp_path)
+    assert {table: value.count for table, value in usage.items()} == {
+        "orders": 3,
+        "users": 2,
+        "items": 1,
+    }
+    with open(directory / f"{RUN_PREFIX}000000.jsonl", encoding="utf-8") as file:
+        lines = [json.loads(line) for line in file]
+    # Single encoded JSON, sorted by table
+    assert [line["table"] for line in lines] == ["items", "orders", "users"]
+
+
+def test_spill_and_merge(tmp_path):
+    """Each record goes over the budget: the runs are merged when read"""
+    stage = _stage(tmp_path, memory_budget=1)
+    for record in _records():
+        stage.run(record)
+        assert not stage.table_usage
+    stage.flush()
+
+    assert len(os.listdir(tmp_path / f"{SERVICE}_{DATE}")) == 3
+    usage = _merged_usage(tmp_path)
+    assert {table: value.count for table, value in usage.items()} == {
+        "items": 1,
+        "orders": 3,
+        "users": 2,
+    }
+    assert [query.query.__root__ for query in usage["orders"].sqlQueries] == [
+        "q1",
+        "q2",
+        "q3",
+    ]
+    assert len(usage["orders"].joins) == 1
+    assert usage["users"].databaseName == "shop"
+
+
+def test_read_previous_format(tmp_path):
+    """Files with JSON encoded strings of previous versions are still read"""
+    usage = TableUsageCount(table="orders", date=DATE, serviceName=SERVICE, joins=[])
+    path = tmp_path / f"{SERVICE}_{DATE}"
+    path.write_text(json.dumps(usage.json()) + "\n", encoding="utf-8")
+
+    assert list(read_usage(str(path))) == [usage]
+
+
+def test_user_resolution(tmp_path):
+    """Users are listed once, and the unknown ones are looked up once"""
+    stage = _stage(tmp_path, memory_budget=10 * 1024 * 1024)
+    stage.metadata.list_all_entities.return_value = iter([_user("etl")])
+    stage.metadata.get_by_name.side_effect = lambda entity, fqn: (
+        _user(fqn) if fqn == "analyst" else None
+    )
+    for _ in range(3):
+        stage.run(
+            QueryParserData(
+                parsedData=[
+                    _parsed_data(["orders"], "q1", user="etl"),
+                    _parsed_data(["orders"], "q2", user="analyst"),
+                    _parsed_data(["orders"], "q3", user="unknown"),
+                ]
+            )
+        )
+    stage.flush()
+
+    stage.metadata.list_all_entities.assert_called_once()
+    assert sorted(
+        call.kwargs["fqn"] for call in stage.metadata.get_by_name.call_args_list
+    ) == ["analyst", "unknown"]
+    queries = _merged_usage(tmp_path)["orders"].sqlQueries
+    assert [
+        ([user.__root__ for user in query.users or []], query.usedBy)
+        for query in queries[:3]
+    ] == [
+        (["etl"], ["etl"]),
+        (["analyst"], ["analyst"]),
+        ([], ["unknown"]),
+    ]
+    assert stage.status.metrics["User cache hits"] == 9
+    assert stage.status.metrics["User lookups"] == 2
+    assert stage.status.metrics["Users not found"] == 1
+
+
+def test_user_cache_names_and_errors():
+    """Users are found by name, and failed lookups are retried"""
+    metadata = MagicMock()
+    metadata.list_all_entities.return_value = iter(
+        [
+            User(
+                id=uuid.uuid4(),
+                name="first.last",
+                fullyQualifiedName='"first.last"',
+                email="first.last@example.com",
+            )
+        ]
+    )
+    metadata.get_by_name.side_effect = ConnectionError("Connection reset")
+    user_cache = UserCache(metadata)
+
+    assert user_cache.get("first.last") == '"first.last"'
+    metadata.get_by_name.assert_not_called()
+
+    assert user_cache.get("analyst") is None
+    metadata.get_by_name.side_effect = lambda entity, fqn: _user(fqn)
+    assert user_cache.get("analyst") == "analyst"
+    assert metadata.get_by_name.call_count == 2
@@ -0,0 +1,675 @@
+#  Copyright 2021 Collate
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""
+Unit tests for the MinIO source directory index
+"""
+import datetime
+import os
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import nullcontext
+from copy import deepcopy
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from metadata.generated.schema.api.data.createContainer import CreateContainerRequest
+from metadata.generated.schema.entity.data.container import Container, Rdf
+from metadata.generated.schema.metadataIngestion.workflow import (
+    OpenMetadataWorkflowConfig,
+)
+from metadata.generated.schema.entity.services.ingestionPipelines.status import (
+    StackTraceError,
+)
+from metadata.generated.schema.type.entityReference import EntityReference
+from metadata.generated.schema.type.filterPattern import FilterPattern
+from metadata.ingestion.api.models import Either
+from metadata.ingestion.api.status import Status
+from metadata.ingestion.source.storage.document_summary import DocumentSummaryStage
+from metadata.ingestion.source.storage.incremental_state import IncrementalState
+from metadata.ingestion.source.storage.storage_service import (
+    DocumentMetadata,
+    Metric,
+)
+from metadata.ingestion.source.storage.minio.metadata import MinioSource
+from metadata.ingestion.source.storage.minio.models import (
+    MinioContainerDetails,
+    MinioObjectInfo,
+)
+from metadata.ingestion.source.storage.minio.prefix_tree import PrefixTree
+from metadata.utils.word.document_cache import DocumentCache
+
+MOCK_MINIO_CONFIG = {
+    "source": {
+        "type": "minio",
+        "serviceName": "minio_test",
+        "serviceConnection": {
+            "config": {
+                "type": "MinIO",
+                "minioConfig": {
+                    "accessKeyId": "key",
+                    "secretKey": "secret",
+                    "endPointURL": "http://localhost:9000",
+                },
+            }
+        },
+        "sourceConfig": {"config": {"type": "StorageMetadata"}},
+    },
+    "sink": {"type": "metadata-rest", "config": {}},
+    "workflowConfig": {
+        "openMetadataServerConfig": {
+            "hostPort": "http://localhost:8585/api",
+            "authProvider": "openmetadata",
+            "securityConfig": {"jwtToken": "token"},
+        }
+    },
+}
+
+MOCK_LAST_MODIFIED = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+MOCK_OBJECTS = [
+    {
+        "Key": key,
+        "Size": size,
+        "LastModified": MOCK_LAST_MODIFIED,
+        "ETag": f'"{key}"',
+        "StorageClass": "STANDARD",
+    }
+    for key, size in [
+        ("root.csv", 1),
+        ("a/b/one.csv", 10),
+        ("c/two.csv", 100),
+        ("a/three.csv", 1000),
+        ("a/b/d/four.csv", 10000),
+    ]
+]
+
+
+class FakeMinioClient:
+    """Return the listing in a single page and count the HEAD requests"""
+
+    def __init__(self, objects):
+        self.objects = objects
+        self.head_requests = 0
+
+    def get_paginator(self, _):
+        return SimpleNamespace(paginate=lambda **_: [{"Contents": self.objects}])
+
+    def head_object(self, Bucket, Key):  # pylint: disable=invalid-name
+        self.head_requests += 1
+        return {
+            "ContentLength": 42,
+            "LastModified": MOCK_LAST_MODIFIED,
+            "ETag": '"head"',
+        }
+
+
+def _container(name: str) -> Container:
+    return Container(
+        id=uuid.uuid4(),
+        name=name,
+        fullyQualifiedName=f"minio_test.{name}",
+        service={"id": uuid.uuid4(), "type": "storageService"},
+    )
+
+
+@patch(
+    "metadata.ingestion.source.storage.storage_service.StorageServiceSource.test_connection"
+)
+def _create_source(objects, test_connection, **source_config) -> MinioSource:
+    test_connection.return_value = False
+    config_dict = deepcopy(MOCK_MINIO_CONFIG)
+    config_dict["source"]["sourceConfig"]["config"].update(source_config)
+    config = OpenMetadataWorkflowConfig.parse_obj(config_dict)
+    source = MinioSource.create(
+        config_dict["source"], config.workflowConfig.openMetadataServerConfig
+    )
+    source.minio_client = FakeMinioClient(objects)
+    source._set_bucket_obj_info("bucket")  # pylint: disable=protected-access
+    return source
+
+
+@pytest.fixture(name="source")
+def fixture_source():
+    return _create_source(MOCK_OBJECTS)
+
+
+def test_prefix_tree():
+    """Files and aggregated stats by directory"""
+    tree = PrefixTree()
+    for obj in MOCK_OBJECTS:
+        tree.add(obj["Key"], obj["Size"])
+
+    assert len(tree) == 4
+    assert tree.root.files == ["root.csv"]
+    assert (tree.root.count, tree.root.size) == (5, 11111)
+    assert tree.get("a").files == ["a/three.csv"]
+    assert (tree.get("a").count, tree.get("a").size) == (3, 11010)
+    assert (tree.get("a/b/").count, tree.get("a/b/").size) == (2, 10010)
+    assert tree.get("a/b/d").parts == ["a", "b", "d"]
+    assert tree.get("missing") is None
+    # parents come before their children
+    assert [node.path for node in tree.directories()] == ["a", "a/b", "a/b/d", "c"]
+
+
+def test_directory_info(source):
+    """Stats cover the objects of the directory and its subdirectories"""
+    assert source.get_directory_info("bucket", "a") == (3, 11010)
+    assert source.get_directory_info("bucket", "a/b/d") == (1, 10000)
+    assert source.get_directory_info("bucket", "missing") == (0, 0)
+
+
+def test_get_directories(source):
+    """One container per directory, plus the root one for the loose files"""
+    context = SimpleNamespace(objectstore_service="minio_test", bucket="bucket")
+    parents = []
+    with patch.object(
+        MinioSource, "context", MagicMock(get=lambda: context)
+    ), patch.object(
+        source, "get_bucket_entity", return_value=_container("bucket")
+    ), patch.object(
+        source,
+        "get_parent_entity",
+        side_effect=lambda parts: parents.append(parts) or _container("parent"),
+    ):
+        directories = [
+            (container.name, container.prefix, container.number_of_objects)
+            for container in source.get_directories()
+        ]
+
+    assert directories == [
+        ("/", "/", 0),
+        ("a", "/", 3),
+        ("b", "a", 2),
+        ("d", "a/b", 1),
+        ("c", "/", 1),
+    ]
+    assert parents == [[], ["a"], ["a", "b"], []]
+    assert source._dir_cache["bucket"] == [  # pylint: disable=protected-access
+        "minio_test",
+        "bucket",
+    ]
+
+
+def test_metrics_from_listing(source):
+    """Container metrics come from the listing, without HEAD requests"""
+    metrics = [
+        source._fetch_metric(  # pylint: disable=protected-access
+            bucket_name="bucket", key="a/b/one.csv", metric=metric
+        )
+        for metric in Metric
+    ]
+
+    assert metrics == [MOCK_LAST_MODIFIED.isoformat(), 1.0, 10.0]
+    assert source.minio_client.head_requests == 0
+
+
+def test_metrics_head_fallback(source):
+    """We only send a HEAD request when the listing misses some field"""
+    # pylint: disable=protected-access
+    source._object_cache["partial.csv"] = MinioObjectInfo.from_response(
+        {"Size": 5}
+    )
+
+    assert (
+        source._fetch_metric(
+            bucket_name="bucket", key="partial.csv", metric=Metric.BUCKET_SIZE_BYTES
+        )
+        == 42.0
+    )
+    assert (
+        source._fetch_metric(
+            bucket_name="bucket", key="partial.csv", metric=Metric.LAST_MODIFIED
+        )
+        == MOCK_LAST_MODIFIED.isoformat()
+    )
+    assert source.minio_client.head_requests == 1
+
+
+@pytest.mark.parametrize("threads", [1, 4])
+def test_object_workers_order(source, threads):
+    """Results follow the order of the objects even if later ones finish first"""
+    source.source_config.objectThreads = threads
+
+    def worker(index):
+        time.sleep(0.05 if index == 0 else 0.01)
+        if index == 3:
+            raise ValueError("Could not parse the object")
+        return index * 10
+
+    start = time.perf_counter()
+    results = []
+    for index, future in source.run_object_workers(range(12), worker):
+        try:
+            results.append((index, future.result()))
+        except ValueError:
+            results.append((index, None))
+    elapsed = time.perf_counter() - start
+
+    assert results == [(i, None if i == 3 else i * 10) for i in range(12)]
+    if threads > 1:
+        assert elapsed < 0.05 + 11 * 0.01
+
+
+def test_object_workers_back_pressure(source):
+    """The workers never run more than twice the threads ahead of the consumer"""
+    source.source_config.objectThreads = 2
+    lock = threading.Lock()
+    started = []
+
+    def worker(index):
+        with lock:
+            started.append(index)
+        return index
+
+    consumed = 0
+    for _, future in source.run_object_workers(range(20), worker):
+        future.result()
+        time.sleep(0.005)
+        with lock:
+            assert len(started) - consumed <= 4
+        consumed += 1
+    assert consumed == 20
+
+
+def test_get_containers_in_parallel(source):
+    """Per-object work runs in the workers and the containers keep the listing order"""
+    source.source_config.objectThreads = 4
+    source._prefix_tree.add("doc.hwp", 1)  # pylint: disable=protected-access
+    source._metadata_cache["doc.hwp"] = source._metadata_cache[  # pylint: disable=protected-access
+        "root.csv"
+    ].copy(update={"dataPath": "doc.hwp", "structureFormat": "hwp"})
+    source._prefix_tree.add("notes.txt", 1)  # pylint: disable=protected-access
+    source._metadata_cache["notes.txt"] = source._metadata_cache[  # pylint: disable=protected-access
+        "root.csv"
+    ].copy(update={"dataPath": "notes.txt", "structureFormat": "txt"})
+    context = SimpleNamespace(
+        objectstore_service="minio_test", bucket="bucket", directory=None
+    )
+    worker_threads = set()
+
+    def container(bucket_name, metadata_entry, parent, **_):
+        worker_threads.add(threading.current_thread().name)
+        return MinioContainerDetails(
+            name=metadata_entry.dataPath,
+            prefix="/",
+            number_of_objects=1,
+            size=1,
+            file_formats=[],
+            data_model=None,
+        )
+
+    with patch.object(
+        MinioSource, "context", MagicMock(get=lambda: context)
+    ), patch.object(
+        source, "metadata", MagicMock(get_by_name=lambda **_: _container("bucket"))
+    ), patch.object(
+        source, "_generate_container_details", side_effect=container
+    ), patch.object(
+        source,
+        "_generate_unstructured_container_details",
+        side_effect=container,
+    ):
+        names = [container.name for container in source.get_containers()]
+
+    assert names == ["root.csv", "doc.hwp"]
+    assert all(name.startswith("StorageObject") for name in worker_threads)
+
+
+def _root_objects(versions: dict):
+    return [
+        {
+            "Key": key,
+            "Size": 1,
+            "LastModified": MOCK_LAST_MODIFIED,
+            "ETag": f'"{version}"',
+        }
+        for key, version in versions.items()
+    ]
+
+
+def _failing_listing(objects):
+    """List the first object, then lose the connection"""
+
+    def list_s3_objects(*_, **__):
+        yield objects[0]
+        raise ConnectionError("Connection reset by peer")
+
+    return list_s3_objects
+
+
+def _run_incremental(objects, state_path, listing_fails=False, sink_fails=()):
+    """
+    List the bucket root and return the processed objects and the source.
+    The sink fails to write the containers of the objects in `sink_fails`.
+    """
+    with patch(
+        "metadata.ingestion.source.storage.minio.metadata.list_s3_objects",
+        side_effect=_failing_listing(objects),
+    ) if listing_fails else nullcontext():
+        source = _create_source(objects, incrementalStatePath=state_path)
+    context = SimpleNamespace(
+        objectstore_service="minio_test", bucket="bucket", directory=None
+    )
+    processed = []
+
+    def container(bucket_name, metadata_entry, parent):
+        processed.append(metadata_entry.dataPath)
+        if metadata_entry.dataPath in sink_fails:
+            source.sink_ack(
+                CreateContainerRequest(
+                    name=metadata_entry.dataPath,
+                    service="minio_test",
+                    parent=EntityReference(
+                        id=uuid.uuid4(),
+                        type="container",
+                        fullyQualifiedName="minio_test.bucket",
+                    ),
+                ),
+                Either(
+                    left=StackTraceError(
+                        name=metadata_entry.dataPath,
+                        error="PUT failed",
+                        stackTrace="",
+                    )
+                ),
+            )
+        return MinioContainerDetails(
+            name=metadata_entry.dataPath,
+            prefix="/",
+            number_of_objects=1,
+            size=1,
+            file_formats=[],
+            data_model=None,
+        )
+
+    metadata = MagicMock(get_by_name=MagicMock(return_value=_container("bucket")))
+    with patch.object(
+        MinioSource, "context", MagicMock(get=lambda: context)
+    ), patch.object(source, "metadata", metadata), patch.object(
+        source, "_generate_container_details", side_effect=container
+    ):
+        list(source.get_containers())
+        deleted = list(source.mark_containers_as_deleted())
+    source.close()
+    return processed, deleted, metadata
+
+
+def test_incremental_ingestion():
+    """Only the changed objects are processed and the deleted ones are removed"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        state_path = os.path.join(tmp_dir, "state", "minio.json")
+        with patch(
+            "metadata.ingestion.source.storage.storage_service.delete_entity_from_source",
+            return_value=[],
+        ) as full_delete:
+            processed, _, _ = _run_incremental(
+                _root_objects({"a.csv": 1, "b.csv": 1, "c.csv": 1}), state_path
+            )
+        # The first run has no state to compare with
+        assert processed == ["a.csv", "b.csv", "c.csv"]
+        full_delete.assert_called_once()
+
+        processed, deleted, metadata = _run_incremental(
+            _root_objects({"a.csv": 2, "b.csv": 1, "d.csv": 1}), state_path
+        )
+        assert processed == ["a.csv", "d.csv"]
+        assert len(deleted) == 1
+        metadata.get_by_name.assert_called_with(
+            entity=Container, fqn='minio_test.bucket."c.csv"'
+        )
+
+        # Nothing changed
+        processed, deleted, _ = _run_incremental(
+            _root_objects({"a.csv": 2, "b.csv": 1, "d.csv": 1}), state_path
+        )
+        assert processed == []
+        assert deleted == []
+
+
+def test_incremental_sink_failure():
+    """An object whose container the sink failed to write is ingested again"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        state_path = os.path.join(tmp_dir, "minio.json")
+        objects = _root_objects({"a.csv": 1, "b.csv": 1})
+        with patch(
+            "metadata.ingestion.source.storage.storage_service.delete_entity_from_source",
+            return_value=[],
+        ):
+            processed, _, _ = _run_incremental(
+                objects, state_path, sink_fails={"b.csv"}
+            )
+        assert processed == ["a.csv", "b.csv"]
+
+        processed, deleted, _ = _run_incremental(objects, state_path)
+        assert processed == ["b.csv"]
+        assert deleted == []
+
+        processed, _, _ = _run_incremental(objects, state_path)
+        assert processed == []
+
+
+def test_incremental_failed_listing():
+    """A bucket listed partially keeps its state and nothing is deleted"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        state_path = os.path.join(tmp_dir, "minio.json")
+        objects = _root_objects({"a.csv": 1, "b.csv": 1, "c.csv": 1})
+        with patch(
+            "metadata.ingestion.source.storage.storage_service.delete_entity_from_source",
+            return_value=[],
+        ):
+            _run_incremental(objects, state_path)
+
+        processed, deleted, _ = _run_incremental(
+            objects, state_path, listing_fails=True
+        )
+        assert processed == []
+        assert deleted == []
+
+        # b.csv and c.csv are still known as unchanged
+        processed, deleted, _ = _run_incremental(objects, state_path)
+        assert processed == []
+        assert deleted == []
+
+
+def test_incremental_removed_bucket(source):
+    """The objects of the buckets gone from the service are deleted"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        state_path = os.path.join(tmp_dir, "minio.json")
+        previous = IncrementalState(state_path)
+        previous.record("bucket", "a.csv", "1", None, "minio_test.bucket.a")
+        previous.record("gone", "b.csv", "1", None, "minio_test.gone.b")
+        previous.record("filtered", "c.csv", "1", None, "minio_test.filtered.c")
+        previous.save()
+
+        source.incremental_state = IncrementalState(state_path)
+        source.source_config.bucketFilterPattern = FilterPattern(
+            excludes=["filtered"]
+        )
+        source.minio_client.list_buckets = lambda: {
+            "Buckets": [{"Name": "bucket"}, {"Name": "filtered"}]
+        }
+        assert [bucket.name for bucket in source.fetch_buckets()] == ["bucket"]
+
+        assert source.incremental_state.get_deleted_fqns() == ["minio_test.gone.b"]
+        source.incremental_state.save()
+        assert set(IncrementalState(state_path).previous) == {
+            "bucket/a.csv",
+            "filtered/c.csv",
+        }
+
+
+class FakeSummarizer:
+    """Summarize with the upper-cased text and keep the batches"""
+
+    def __init__(self):
+        self.batches = []
+        self.documents = 0
+        self.input_tokens = 0
+        self.seconds = 0.0
+
+    def summarize_many(self, texts):
+        self.batches.append(texts)
+        self.documents += len(texts)
+        self.input_tokens += sum(len(text) for text in texts)
+        self.seconds += 0.5
+        return [text.upper() for text in texts]
+
+
+def test_get_containers_summary_batches():
+    """Documents are summarized in batches and the summaries go to their containers"""
+    source = _create_source(
+        _root_objects({"a.hwp": 1, "b.csv": 1, "c.docx": 1, "d.hwpx": 1}),
+        summaryBatchSize=2,
+    )
+    summarizer = FakeSummarizer()
+    source.summary_stage.summarizer = summarizer
+    context = SimpleNamespace(
+        objectstore_service="minio_test", bucket="bucket", directory=None
+    )
+
+    def document_meta(bucket_name, path, metadata_entry, client, summarize, **_):
+        assert not summarize
+        return DocumentMetadata(
+            rdfs=[Rdf(name="title", object=path)], text=f"text of {path}"
+        )
+
+    def container(bucket_name, metadata_entry, parent):
+        return MinioContainerDetails(
+            name=metadata_entry.dataPath,
+            prefix="/",
+            number_of_objects=1,
+            size=1,
+            file_formats=[],
+            data_model=None,
+        )
+
+    with patch.object(
+        MinioSource, "context", MagicMock(get=lambda: context)
+    ), patch.object(
+        source, "metadata", MagicMock(get_by_name=lambda **_: _container("bucket"))
+    ), patch.object(
+        source, "_generate_container_details", side_effect=container
+    ), patch.object(
+        source, "_get_document_meta", side_effect=document_meta
+    ), patch.object(
+        source, "_fetch_metric", return_value=1
+    ):
+        containers = list(source.get_containers())
+
+    # The structured containers don't wait and a full batch
+    # is sent as soon as it is summarized, the rest at the end
+    assert [container.name for container in containers] == [
+        "b.csv",
+        "a.hwp",
+        "c.docx",
+        "d.hwpx",
+    ]
+    assert summarizer.batches == [
+        ["text of a.hwp", "text of c.docx"],
+        ["text of d.hwpx"],
+    ]
+    for container in containers:
+        if container.name == "b.csv":
+            assert container.rdfs is None
+            continue
+        assert container.summary_text is None
+        assert container.rdfs == [
+            Rdf(name="title", object=container.name),
+            Rdf(name="Summary", object=f"TEXT OF {container.name.upper()}"),
+        ]
+    assert source.status.metrics["Summarized documents"] == 3
+    assert source.status.metrics["Summarization docs/sec"] == 3.0
+    assert source.status.metrics["Summarization tokens/sec"] == 41.0
+
+
+def test_summary_stage_cache(tmp_path):
+    """Texts summarized in a previous batch or run are not summarized again"""
+    summarizer = FakeSummarizer()
+    stage = DocumentSummaryStage(
+        summarizer=summarizer,
+        batch_size=2,
+        status=Status(),
+        cache=DocumentCache(str(tmp_path)),
+    )
+    for texts in (["one", "two"], ["two", "three"]):
+        for text in texts:
+            stage.add(SimpleNamespace(rdfs=None, summary_text=text))
+        containers = [container for container, _ in stage.flush()]
+        assert [container.rdfs[0].object for container in containers] == [
+            text.upper() for text in texts
+        ]
+
+    assert summarizer.batches == [["one", "two"], ["three"]]
+
+
+def test_document_meta_cache(source, tmp_path, monkeypatch):
+    """A document version is extracted and summarized once"""
+    monkeypatch.setenv("DOCUMENT_CACHE_DIR", str(tmp_path))
+    extracted = []
+
+    def hwp_meta(document):
+        extracted.append(document)
+        return DocumentMetadata(rdfs=[Rdf(name="title", object="Report")], text="text")
+
+    def document_meta(etag):
+        return source._get_document_meta(  # pylint: disable=protected-access
+            bucket_name="bucket",
+            path="doc.hwp",
+            metadata_entry=None,
+            client=source.minio_client,
+            size=8,
+            etag=etag,
+        )
+
+    source.minio_client.get_object = lambda **_: {"Body": SimpleNamespace(read=lambda: b"hwp data")}
+    with patch.object(source, "_get_hwp_meta", side_effect=hwp_meta), patch.object(
+        source.summarizer, "summarize", side_effect=str.upper
+    ) as summarize:
+        first = document_meta('"v1"')
+        second = document_meta('"v1"')
+        document_meta('"v2"')
+
+    assert first == second == DocumentMetadata(
+        rdfs=[Rdf(name="title", object="Report"), Rdf(name="Summary", object="TEXT")]
+    )
+    # The new version is extracted again, but its text was already summarized
+    assert len(extracted) == 2
+    summarize.assert_called_once_with("text")
+
+
+@pytest.mark.slow
+def test_prefix_tree_benchmark():
+    """Index a bucket of 1M keys and look up every directory"""
+    num_keys = 1_000_000
+    keys = [
+        f"year={i % 10}/month={i % 12}/day={i % 28}/part-{i}.parquet"
+        for i in range(num_keys)
+    ]
+
+    start = time.perf_counter()
+    tree = PrefixTree()
+    for key in keys:
+        tree.add(key, 1)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    total = sum(len(tree.get(node.path).files) for node in tree.directories())
+    lookup = time.perf_counter() - start
+
+    assert total == num_keys
+    assert tree.root.count == num_keys
+    print(
+        f"\nIndexed {num_keys} keys in {len(tree)} directories: "
+        f"build {build:.2f}s, directory lookups {lookup:.3f}s"
+    )
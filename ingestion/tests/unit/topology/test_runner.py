@@ -12,12 +12,16 @@
 """
 Check that we are properly running nodes and stages
 """
+from collections import defaultdict
 from typing import List, Optional
 from unittest import TestCase
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 from pydantic import BaseModel
 
+from metadata.generated.schema.entity.data.databaseSchema import DatabaseSchema
+from metadata.generated.schema.entity.data.storedProcedure import StoredProcedure
+from metadata.generated.schema.entity.data.table import Table
 from metadata.ingestion.api.models import Either
 from metadata.ingestion.api.topology_runner import TopologyRunnerMixin
 from metadata.ingestion.models.topology import (
@@ -75,6 +79,10 @@ class MockTopology(ServiceTopology):
 class MockSource(TopologyRunnerMixin):
     topology = MockTopology()
     context = TopologyContextManager(topology)
+    flushes = 0
+
+    def flush_sink(self):
+        self.flushes += 1
 
     @staticmethod
     def get_schemas():
@@ -173,6 +181,8 @@ class TopologyRunnerTest(TestCase):
         """The step behaves properly"""
         self.source.context = TopologyContextManager(self.source.topology)
         self.source.context.set_threads(2)
+        # The pool of connections to the server is sized to the threads
+        self.source.metadata = MagicMock()
         # Avoid removing the ThreadIds from the TopologyContextManager dict.
         with patch(
             "metadata.ingestion.models.topology.TopologyContextManager.pop",
@@ -230,6 +240,21 @@ class TopologyRunnerTest(TestCase):
         )
         self.assertEqual(self.source._get_child_nodes(self.source.topology.tables), [])
 
+    def test_post_process_flushes_sink(self):
+        """The post process looks up the entities sent, so the sink is flushed first"""
+        source = MockSource()
+        with patch.object(
+            source,
+            "yield_hello",
+            side_effect=lambda: ["flushed" if source.flushes else "buffered"],
+        ):
+            self.assertEqual(
+                list(source._run_node_post_process(source.topology.root)),
+                ["flushed"],
+            )
+        list(source._run_node_post_process(source.topology.tables))
+        self.assertEqual(source.flushes, 1)
+
     def test_run_node_post_process(self):
         """We get the right post_process results"""
 
@@ -274,8 +299,117 @@ class TopologyRunnerTest(TestCase):
             dict(local_source.cache),
             {
                 MockTable: {
-                    "schema1.table1": "c238b14e87fe6d54e35dbca4a97e1e83",
-                    "schema1.table2": "acd38ff1a662adc0c88225f2666ff423",
+                    "schema1.table1": bytes.fromhex("c238b14e87fe6d54e35dbca4a97e1e83"),
+                    "schema1.table2": bytes.fromhex("acd38ff1a662adc0c88225f2666ff423"),
                 }
             },
         )
+
+    def test_prefetch_hash_dict(self):
+        """The source hashes of a service are loaded once, by database"""
+
+        local_source = MockSource()
+        local_source.cache = defaultdict(dict)
+        local_source.prefetch_page_size = 2
+
+        responses = {
+            "/databases?limit=2": {
+                "data": [{"fullyQualifiedName": "service.db1"}],
+                "paging": {"after": "db"},
+            },
+            "/databases?limit=2&after=db": {
+                "data": [{"fullyQualifiedName": "service.db2"}],
+                "paging": {},
+            },
+            "/tables?limit=2&fields=sourceHash": {
+                "data": [
+                    {
+                        "fullyQualifiedName": "service.db1.schema.table1",
+                        "sourceHash": "c238b14e87fe6d54e35dbca4a97e1e83",
+                    },
+                    {"fullyQualifiedName": "service.db1.schema.table2"},
+                ],
+                "paging": {},
+            },
+        }
+        metadata = MagicMock()
+        metadata.get_suffix.side_effect = OpenMetadata.get_suffix
+        metadata.client.get.side_effect = lambda path, data: (
+            responses[path]
+            if data.get("database") != "service.db2"
+            else {
+                "data": [
+                    {
+                        "fullyQualifiedName": "service.db2.schema.table3",
+                        "sourceHash": "acd38ff1a662adc0c88225f2666ff423",
+                    }
+                ],
+                "paging": {},
+            }
+        )
+        local_source.metadata = metadata
+
+        for schema_fqn in ("service.db1.schema", "service.db2.schema"):
+            local_source.prefetch_fqn_source_hash_dict(
+                parent_type=DatabaseSchema, child_type=Table, entity_fqn=schema_fqn
+            )
+
+        self.assertEqual(metadata.client.get.call_count, 4)
+        self.assertEqual(
+            local_source.cache[Table],
+            {
+                "service.db1.schema.table1": bytes.fromhex(
+                    "c238b14e87fe6d54e35dbca4a97e1e83"
+                ),
+                "service.db2.schema.table3": bytes.fromhex(
+                    "acd38ff1a662adc0c88225f2666ff423"
+                ),
+            },
+        )
+
+    def test_prefetch_stored_procedures(self):
+        """Stored procedures are listed by schema, and the schemas by database"""
+
+        local_source = MockSource()
+        local_source.cache = defaultdict(dict)
+        local_source.prefetch_page_size = 2
+
+        def get(path, data):
+            if path.startswith("/databases?"):
+                return {"data": [{"fullyQualifiedName": "service.db1"}]}
+            if path.startswith("/databaseSchemas?"):
+                self.assertEqual(data, {"database": "service.db1"})
+                return {
+                    "data": [
+                        {"fullyQualifiedName": "service.db1.s1"},
+                        {"fullyQualifiedName": "service.db1.s2"},
+                    ]
+                }
+            self.assertTrue(path.startswith("/storedProcedures?"))
+            schema_fqn = data["databaseSchema"]
+            return {
+                "data": [
+                    {
+                        "fullyQualifiedName": f"{schema_fqn}.proc",
+                        "sourceHash": "c238b14e87fe6d54e35dbca4a97e1e83",
+                    }
+                ]
+            }
+
+        metadata = MagicMock()
+        metadata.get_suffix.side_effect = OpenMetadata.get_suffix
+        metadata.client.get.side_effect = get
+        local_source.metadata = metadata
+
+        for schema_fqn in ("service.db1.s1", "service.db1.s2"):
+            local_source.prefetch_fqn_source_hash_dict(
+                parent_type=DatabaseSchema,
+                child_type=StoredProcedure,
+                entity_fqn=schema_fqn,
+            )
+
+        self.assertEqual(metadata.client.get.call_count, 4)
+        self.assertEqual(
+            set(local_source.cache[StoredProcedure]),
+            {"service.db1.s1.proc", "service.db1.s2.proc"},
+        )
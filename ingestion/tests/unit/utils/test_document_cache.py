@@ -0,0 +1,80 @@
+#  Copyright 2021 Collate
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""
+Test the cache of extracted document metadata and summaries
+"""
+import os
+import time
+
+from metadata.utils.word.document_cache import (
+    DOCUMENT_CACHE_DIR_ENV,
+    DocumentCache,
+    document_key,
+    get_document_cache,
+    sample_from_text,
+    text_key,
+)
+
+
+def test_update_and_get(tmp_path):
+    cache = DocumentCache(str(tmp_path))
+    key = document_key('"abc"')
+    assert key == document_key("abc")
+    assert cache.get(key) is None
+
+    cache.update(key, rdfs=[["title", "보고서"]], text="본문")
+    cache.update(key, samples={"1000": "본"})
+
+    assert cache.get(key) == {
+        "rdfs": [["title", "보고서"]],
+        "text": "본문",
+        "samples": {"1000": "본"},
+    }
+    assert (cache.hits, cache.misses) == (1, 1)
+    # A new process sees the entries of the previous runs
+    assert DocumentCache(str(tmp_path)).get(key)["text"] == "본문"
+
+
+def test_lru_eviction(tmp_path):
+    """The least recently used entries go first once the cache is too big"""
+    cache = DocumentCache(str(tmp_path), max_size=100)
+    for name in ("a", "b"):
+        cache.update(text_key(name), summary="x" * 30)
+    # Make `a` the most recently used
+    old = time.time() - 60
+    os.utime(cache._path(text_key("b")), (old, old))  # pylint: disable=protected-access
+
+    cache.update(text_key("c"), summary="x" * 30)
+
+    assert cache.get(text_key("a")) is not None
+    assert cache.get(text_key("b")) is None
+    assert cache.get(text_key("c")) is not None
+    assert cache.size <= 100
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_sample_from_text():
+    text = "".join(f"paragraph {i}\n" for i in range(10))
+
+    assert sample_from_text(text, -1, "hwp") == text
+    assert sample_from_text(text, 15, "hwp") == text[:15]
+    # Same as the extractors: up to the end of the paragraph
+    assert sample_from_text(text, 15, "hwpx") == "paragraph 0\nparagraph 1\n"
+    assert sample_from_text(text, 1000, "docx") == text
+
+
+def test_get_document_cache(tmp_path, monkeypatch):
+    monkeypatch.delenv(DOCUMENT_CACHE_DIR_ENV, raising=False)
+    assert get_document_cache() is None
+
+    monkeypatch.setenv(DOCUMENT_CACHE_DIR_ENV, str(tmp_path))
+    assert get_document_cache() is get_document_cache()
+    assert get_document_cache().directory == str(tmp_path)
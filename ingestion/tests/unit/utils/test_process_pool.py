@@ -0,0 +1,81 @@
+#  Copyright 2021 Collate
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#  http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""
+Test the process pool with a timeout per task
+"""
+import os
+import time
+
+from metadata.utils.process_pool import TaskResult, TimeoutProcessPool
+
+
+_done = 0
+
+
+def _take_done():
+    global _done  # pylint: disable=global-statement
+    done, _done = _done, 0
+    return {"done": done}
+
+
+def _work(item):
+    global _done  # pylint: disable=global-statement
+    _done += 1
+    if item == "hang":
+        time.sleep(60)
+    if item == "crash":
+        os._exit(1)  # pylint: disable=protected-access
+    if item == "fail":
+        raise ValueError("bad item")
+    return item * 2
+
+
+def test_map_keeps_order():
+    pool = TimeoutProcessPool(_work, processes=3, timeout_seconds=10, chunk_size=4)
+    try:
+        assert pool.map(range(50)) == [TaskResult(value=i * 2) for i in range(50)]
+        # The processes are reused by the next calls
+        assert pool.map([1, "fail"]) == [
+            TaskResult(value=2),
+            TaskResult(error="ValueError: bad item"),
+        ]
+        assert pool.map([]) == []
+    finally:
+        pool.close()
+
+
+def test_timeout_and_crash():
+    """Stuck or dead processes are replaced and the rest of their chunk still runs"""
+    pool = TimeoutProcessPool(_work, processes=2, timeout_seconds=1, chunk_size=3)
+    try:
+        start = time.monotonic()
+        results = pool.map([1, "hang", 2, 3, "crash", 4, 5])
+        assert time.monotonic() - start < 10
+    finally:
+        pool.close()
+
+    assert [result.value for result in results] == [2, None, 4, 6, None, 8, 10]
+    assert results[1].error == "Timed out after 1 seconds"
+    assert results[4].error == "The worker process died"
+
+
+def test_worker_stats():
+    """The stats of the workers come back with each chunk"""
+    pool = TimeoutProcessPool(
+        _work, processes=3, timeout_seconds=10, chunk_size=4, worker_stats=_take_done
+    )
+    try:
+        pool.map(range(30))
+        assert pool.take_stats() == {"done": 30}
+        pool.map(range(5))
+        assert pool.take_stats() == {"done": 5}
+    finally:
+        pool.close()